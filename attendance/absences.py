@@ -0,0 +1,116 @@
+from django.db import transaction
+from django.utils import timezone
+from attendance.models import Absentee, AbsenceCount
+from stats import rollups
+
+# Roll calls and excuse reviews.
+#
+# An invigilator submits the students present in a room, the absentees are
+# the students of the room's seating list (see schedule.models.Seat) that
+# are not among them. Only the absentees are stored, and the absence
+# counters of their exams, courses and departments are updated in the same
+# transaction with one UPDATE per counter.
+
+
+class RollCallError(ValueError):
+    """Raised when a roll call cannot be recorded."""
+
+
+def can_take_roll_call(user, room_id, exam_date, exam_time):
+    """The invigilators of the room at that time, the exam committee and the admins."""
+    from schedule.models import Invigilation
+
+    if user.is_staff or user.is_exam_committee_member:
+        return True
+    return Invigilation.objects.filter(invigilator=user, room_id=room_id, exam_date=exam_date,
+                                       exam_time=exam_time).exists()
+
+
+def seating_list(room_id, exam_date, exam_time):
+    """{student no.: (section id, student id, exam id, course id, department id)} of the students seated in a room."""
+    from schedule.models import Seat
+
+    return {
+        username: (section_id, student_id, exam_id, course_id, department_id)
+        for username, section_id, student_id, exam_id, course_id, department_id in Seat.objects.filter(
+            exam__room_id=room_id, exam__exam_date=exam_date, exam__exam_time=exam_time).values_list(
+            'student__username', 'exam__section_id', 'student_id', 'exam_id', 'exam__section__course_id',
+            'exam__section__course__department_id')
+    }
+
+
+def lock_room(room_id, exam_date, exam_time):
+    """Lock the exam rows of a room until the end of the transaction."""
+    from schedule.models import ExamSchedule
+
+    list(ExamSchedule.objects.select_for_update().filter(room_id=room_id, exam_date=exam_date,
+                                                          exam_time=exam_time).order_by('pk').values_list('pk'))
+
+
+def record_roll_call(room_id, exam_date, exam_time, present, user=None):
+    """
+    Record the roll call of a room: present are the student numbers of the
+    students there. Submitting the room again replaces its absentees, the
+    excuses of the students still absent are kept. Returns a summary with
+    the absent student numbers and the numbers not on the seating list.
+    """
+    seated = seating_list(room_id, exam_date, exam_time)
+    if not seated:
+        raise RollCallError("Nobody is seated in this room at that time, run the assignseats command first")
+
+    present = set(present)
+    absent = {seated[username][:2]: username for username in seated.keys() - present}
+
+    keys = {row[:2] for row in seated.values()}
+    with transaction.atomic():
+        # two submissions of the same room take turns: the second one only reads the absentees once the
+        # first committed, so it neither inserts them again (an IntegrityError) nor counts them twice
+        lock_room(room_id, exam_date, exam_time)
+        existing = {
+            (section_id, student_id): pk for pk, section_id, student_id in Absentee.objects.filter(
+                section_id__in={section_id for section_id, _ in keys},
+                student_id__in={student_id for _, student_id in keys}).values_list('pk', 'section_id', 'student_id')
+            # a section split over rooms has students seated (and absent) in the others too
+            if (section_id, student_id) in keys
+        }
+
+        new = [seated[username] for key, username in absent.items() if key not in existing]
+        Absentee.objects.bulk_create(
+            [Absentee(section_id=section_id, student_id=student_id, exam_id=exam_id, exam_date=exam_date,
+                      recorded_by=user) for section_id, student_id, exam_id, _, _ in new],
+            batch_size=1000
+        )
+        # bulk_create sends no signals
+        AbsenceCount.apply(AbsenceCount.deltas(
+            added=[(section_id, course_id, department_id, Absentee.NO_EXCUSE)
+                   for section_id, _, _, course_id, department_id in new]))
+
+        # students marked absent by an earlier submission after all; the delete signals uncount them
+        removed = [pk for key, pk in existing.items() if key not in absent]
+        if removed:
+            Absentee.objects.filter(pk__in=removed).delete()
+
+        # the statistics of the day are rolled up again once the roll call commits
+        rollups.mark_stale(exam_date)
+        rollups.refresh_on_commit()
+
+    return {
+        'seated': len(seated),
+        'absent': sorted(absent.values()),
+        'unknown': sorted(present - seated.keys()),
+        'added': len(new),
+        'removed': len(removed),
+    }
+
+
+def review_excuses(absentee_ids, approve, user):
+    """Approve or reject the pending excuses among the absentees. Returns how many were reviewed."""
+    status = Absentee.APPROVED if approve else Absentee.REJECTED
+    with transaction.atomic():
+        pending = Absentee.objects.select_for_update().filter(pk__in=absentee_ids, excuse_status=Absentee.PENDING)
+        rows = list(pending.values_list('section_id', 'section__course_id', 'section__course__department_id'))
+        pending.update(excuse_status=status, reviewed_by=user, reviewed_at=timezone.now())
+        # the update sends no signals
+        AbsenceCount.apply(AbsenceCount.deltas(added=[row + (status,) for row in rows],
+                                               removed=[row + (Absentee.PENDING,) for row in rows]))
+    return len(rows)
@@ -0,0 +1,42 @@
+from django.contrib import admin, messages
+from attendance import absences
+from attendance.models import Absentee, AbsenceCount
+
+
+@admin.register(Absentee)
+class AbsenteeAdmin(admin.ModelAdmin):
+    list_display = ('student', 'section', 'exam_date', 'excuse_status', 'reviewed_by')
+    list_filter = ('excuse_status', 'exam_date', 'section__course__department')
+    list_select_related = ('student', 'section__course', 'reviewed_by')  # avoid one query per row
+    search_fields = ('student__username', 'section__course__code')
+    autocomplete_fields = ('student', 'section')
+    raw_id_fields = ('exam',)
+    readonly_fields = ('recorded_at', 'recorded_by', 'reviewed_at', 'reviewed_by')
+    date_hierarchy = 'exam_date'
+    actions = ['approve_excuses', 'reject_excuses']
+
+    def has_review_permission(self, request):
+        return request.user.can_approve_absence_excuses
+
+    @admin.action(description='Approve the pending excuses', permissions=['review'])
+    def approve_excuses(self, request, queryset):
+        reviewed = absences.review_excuses(list(queryset.values_list('pk', flat=True)), True, request.user)
+        self.message_user(request, f"Approved {reviewed} excuse(s)", messages.SUCCESS)
+
+    @admin.action(description='Reject the pending excuses', permissions=['review'])
+    def reject_excuses(self, request, queryset):
+        reviewed = absences.review_excuses(list(queryset.values_list('pk', flat=True)), False, request.user)
+        self.message_user(request, f"Rejected {reviewed} excuse(s)", messages.SUCCESS)
+
+
+@admin.register(AbsenceCount)
+class AbsenceCountAdmin(admin.ModelAdmin):
+    list_display = ('scope', 'key', 'absentees', 'pending', 'approved')
+    list_filter = ('scope',)
+
+    # maintained by the absentee changes, recounted by the countabsences command
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class AttendanceConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'attendance'
+
+    def ready(self):
+        # connect the signal receivers
+        from attendance import signals  # noqa: F401
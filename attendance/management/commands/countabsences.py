@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from attendance.models import AbsenceCount
+
+
+class Command(BaseCommand):
+    help = 'Recount the absence counters of every exam, course and department from the absentees'
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write(self.style.SUCCESS(f"Recounted {AbsenceCount.refresh():,} absence counters"))
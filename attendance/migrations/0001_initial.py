@@ -0,0 +1,62 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0008_course_exam_room_type'),
+        ('schedule', '0004_seat_seat_unique_seat_exam_student'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AbsenceCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('exam', 'Exam'), ('course', 'Course'), ('department', 'Department')], max_length=10)),
+                ('key', models.PositiveIntegerField(help_text='Section, course or department id')),
+                ('absentees', models.PositiveIntegerField(default=0)),
+                ('pending', models.PositiveIntegerField(default=0, help_text='Excuses waiting for approval')),
+                ('approved', models.PositiveIntegerField(default=0, help_text='Approved excuses')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Absentee',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('exam_date', models.DateField()),
+                ('reason', models.TextField(blank=True, default='', help_text='Absence reason given by the student')),
+                ('excuse_status', models.CharField(choices=[('none', 'No excuse'), ('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], default='none', max_length=10)),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('exam', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='absentees', to='schedule.examschedule')),
+                ('recorded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='recorded_absences', to=settings.AUTH_USER_MODEL)),
+                ('reviewed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reviewed_absences', to=settings.AUTH_USER_MODEL)),
+                ('section', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='absentees', to='core.section')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='absences', to='core.student')),
+            ],
+            options={
+                'ordering': ['exam_date', 'section'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='absencecount',
+            constraint=models.UniqueConstraint(fields=('scope', 'key'), name='unique_absence_count_scope_key'),
+        ),
+        migrations.AddIndex(
+            model_name='absentee',
+            index=models.Index(fields=['excuse_status', 'exam_date'], name='absentee_excuse_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='absentee',
+            constraint=models.UniqueConstraint(fields=('section', 'student'), name='unique_absentee_section_student'),
+        ),
+    ]
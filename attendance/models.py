@@ -0,0 +1,130 @@
+from collections import Counter
+from django.db import models, transaction
+from django.db.models import F, Count, Q
+from django.utils import timezone
+
+
+class Absentee(models.Model):
+    """
+    A student who missed the exam of a section. Only the absentees are
+    stored, everyone else on the seating list attended. Like the bundles,
+    an absence keeps its section and date when the timetable is rebuilt.
+    """
+    NO_EXCUSE = 'none'
+    PENDING = 'pending'
+    APPROVED = 'approved'
+    REJECTED = 'rejected'
+
+    EXCUSE_STATUS_CHOICES = [
+        (NO_EXCUSE, 'No excuse'),
+        (PENDING, 'Pending'),
+        (APPROVED, 'Approved'),
+        (REJECTED, 'Rejected'),
+    ]
+
+    exam = models.ForeignKey('schedule.ExamSchedule', on_delete=models.SET_NULL, null=True, blank=True,
+                             related_name='absentees')
+    section = models.ForeignKey('core.Section', on_delete=models.CASCADE, related_name='absentees')
+    student = models.ForeignKey('core.Student', on_delete=models.CASCADE, related_name='absences')
+    exam_date = models.DateField()
+    reason = models.TextField(blank=True, default='', help_text='Absence reason given by the student')
+    excuse_status = models.CharField(max_length=10, choices=EXCUSE_STATUS_CHOICES, default=NO_EXCUSE)
+    recorded_at = models.DateTimeField(default=timezone.now)
+    recorded_by = models.ForeignKey('core.User', on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='recorded_absences')
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    reviewed_by = models.ForeignKey('core.User', on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='reviewed_absences')
+
+    class Meta:
+        ordering = ['exam_date', 'section']
+        # one exam per section; the index also serves the roll call of a section
+        constraints = [
+            models.UniqueConstraint(fields=['section', 'student'], name='unique_absentee_section_student')
+        ]
+        indexes = [
+            # the approval queue: pending excuses, oldest exams first
+            models.Index(fields=['excuse_status', 'exam_date'], name='absentee_excuse_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student.username} absent from {self.section.course.code} on {self.exam_date}"
+
+
+class AbsenceCount(models.Model):
+    """
+    Absentees of an exam (per section), a course or a department, kept up to
+    date as absences are recorded and reviewed so the statistics and the
+    approval queue read counters instead of counting Absentee rows.
+    """
+    EXAM = 'exam'
+    COURSE = 'course'
+    DEPARTMENT = 'department'
+
+    SCOPE_CHOICES = [
+        (EXAM, 'Exam'),
+        (COURSE, 'Course'),
+        (DEPARTMENT, 'Department'),
+    ]
+
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    key = models.PositiveIntegerField(help_text='Section, course or department id')
+    absentees = models.PositiveIntegerField(default=0)
+    pending = models.PositiveIntegerField(default=0, help_text='Excuses waiting for approval')
+    approved = models.PositiveIntegerField(default=0, help_text='Approved excuses')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key'], name='unique_absence_count_scope_key')
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.key}: {self.absentees} absentees"
+
+    @staticmethod
+    def deltas(added=(), removed=()):
+        """
+        What adding and removing absentees, given as (section id, course id,
+        department id, excuse status), changes: {(scope, key): Counter of the fields}.
+        """
+        deltas = {}
+        for sign, rows in ((1, added), (-1, removed)):
+            for section_id, course_id, department_id, status in rows:
+                for scope, key in ((AbsenceCount.EXAM, section_id), (AbsenceCount.COURSE, course_id),
+                                   (AbsenceCount.DEPARTMENT, department_id)):
+                    counts = deltas.setdefault((scope, key), Counter())
+                    counts['absentees'] += sign
+                    if status in (Absentee.PENDING, Absentee.APPROVED):
+                        counts[status] += sign
+        return deltas
+
+    @staticmethod
+    def apply(deltas):
+        """Add the deltas to the counters, one UPDATE per counter that changes."""
+        AbsenceCount.objects.bulk_create([AbsenceCount(scope=scope, key=key) for scope, key in deltas],
+                                         ignore_conflicts=True)
+        for (scope, key), counts in deltas.items():
+            changes = {field: F(field) + value for field, value in counts.items() if value}
+            if changes:
+                AbsenceCount.objects.filter(scope=scope, key=key).update(**changes)
+
+    @staticmethod
+    def refresh():
+        """Recount every counter from the Absentee rows with grouped queries."""
+        aggregates = {
+            'absentees': Count('pk'),
+            'pending': Count('pk', filter=Q(excuse_status=Absentee.PENDING)),
+            'approved': Count('pk', filter=Q(excuse_status=Absentee.APPROVED)),
+        }
+        counters = []
+        for scope, field in ((AbsenceCount.EXAM, 'section'), (AbsenceCount.COURSE, 'section__course'),
+                             (AbsenceCount.DEPARTMENT, 'section__course__department')):
+            counters.extend(
+                AbsenceCount(scope=scope, key=row[field], absentees=row['absentees'], pending=row['pending'],
+                             approved=row['approved'])
+                for row in Absentee.objects.values(field).annotate(**aggregates).order_by()
+            )
+        with transaction.atomic():
+            AbsenceCount.objects.all().delete()
+            AbsenceCount.objects.bulk_create(counters, batch_size=1000)
+        return len(counters)
@@ -0,0 +1,36 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from attendance.models import Absentee, AbsenceCount
+from core.models import Section
+
+
+# keep AbsenceCount in step with single absentees (the admin, the excuse
+# reviews); the roll call bulk creates absentees and updates the counters itself
+
+def counter_key(instance):
+    return (instance.section_id,) + Section.objects.filter(pk=instance.section_id).values_list(
+        'course_id', 'course__department_id').get()
+
+
+@receiver(pre_save, sender=Absentee)
+def remember_excuse_status(sender, instance, **kwargs):
+    instance.previous_status = (Absentee.objects.filter(pk=instance.pk).values_list('excuse_status', flat=True)
+                                .first() if instance.pk else None)
+
+
+@receiver(post_save, sender=Absentee)
+def count_absentee(sender, instance, created, **kwargs):
+    if created:
+        AbsenceCount.apply(AbsenceCount.deltas(added=[counter_key(instance) + (instance.excuse_status,)]))
+    elif instance.previous_status != instance.excuse_status:
+        key = counter_key(instance)
+        AbsenceCount.apply(AbsenceCount.deltas(added=[key + (instance.excuse_status,)],
+                                               removed=[key + (instance.previous_status,)]))
+
+
+@receiver(post_delete, sender=Absentee)
+def uncount_absentee(sender, instance, **kwargs):
+    if not Section.objects.filter(pk=instance.section_id).exists():
+        # deleted with its section, the counters of the section go with the next recount
+        return
+    AbsenceCount.apply(AbsenceCount.deltas(removed=[counter_key(instance) + (instance.excuse_status,)]))
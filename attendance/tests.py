@@ -0,0 +1,89 @@
+from datetime import date, time
+from django.test import TestCase
+from django.urls import reverse
+from attendance.models import Absentee, AbsenceCount
+from core.models import User, Student, Department, Course, Section, Room
+from schedule.models import ExamSchedule, Invigilation, Seat
+from stats.models import DailyStatistics
+
+
+class AbsenceTestCase(TestCase):
+    """Three students seated in a room with an invigilator."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Information Technology')
+        course = Course.objects.create(code='IT101', name='Programming', department=cls.department)
+        cls.section = Section.objects.create(course=course, number=1)
+        cls.room = Room.objects.create(label='A101', room_type=Room.CLASS_ROOM, campus=Room.SA, capacity=40, block='A')
+        exam = ExamSchedule.objects.create(section=cls.section, room=cls.room, exam_date=date(2026, 12, 7),
+                                           exam_time=time(8))
+        cls.students = [Student.objects.create(username=f"S{i}", department=cls.department) for i in range(3)]
+        Seat.objects.bulk_create(Seat(exam=exam, student=student, row=1, column=i * 2 + 1)
+                                 for i, student in enumerate(cls.students))
+        cls.invigilator = User.objects.create(username='I1', is_invigilator=True)
+        Invigilation.objects.create(invigilator=cls.invigilator, room=cls.room, exam_date=exam.exam_date,
+                                    exam_time=exam.exam_time)
+
+    def roll_call(self, present):
+        return self.client.post(reverse('attendance:roll_call'),
+                                {'room': self.room.pk, 'date': '2026-12-07', 'time': '08:00', 'present': present},
+                                content_type='application/json')
+
+    def counters(self):
+        return sorted(AbsenceCount.objects.exclude(absentees=0, pending=0, approved=0)
+                      .values_list('scope', 'absentees', 'pending', 'approved'))
+
+
+class RollCallTests(AbsenceTestCase):
+    def setUp(self):
+        self.client.force_login(self.invigilator)
+
+    def test_only_absentees_are_stored(self):
+        response = self.roll_call(['S0', 'S2', 'X9'])
+        self.assertEqual(response.json(), {'seated': 3, 'absent': ['S1'], 'unknown': ['X9'], 'added': 1,
+                                           'removed': 0})
+        self.assertEqual(list(Absentee.objects.values_list('student__username', flat=True)), ['S1'])
+        self.assertEqual(self.counters(), [('course', 1, 0, 0), ('department', 1, 0, 0), ('exam', 1, 0, 0)])
+
+    def test_roll_call_rolls_up_the_statistics(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.roll_call(['S0', 'S2'])
+        self.assertEqual(DailyStatistics.objects.get(department=self.department).absentees, 1)
+
+    def test_resubmission_replaces_the_absentees(self):
+        self.roll_call(['S0'])
+        response = self.roll_call(['S0', 'S1'])
+        self.assertEqual((response.json()['added'], response.json()['removed']), (0, 1))
+        self.assertEqual(self.counters(), [('course', 1, 0, 0), ('department', 1, 0, 0), ('exam', 1, 0, 0)])
+
+    def test_other_staff_cannot_take_the_roll_call(self):
+        self.client.force_login(User.objects.create(username='I2', is_invigilator=True))
+        self.assertEqual(self.roll_call([]).status_code, 403)
+
+
+class ExcuseQueueTests(AbsenceTestCase):
+    def setUp(self):
+        self.approver = User.objects.create(username='C1', can_approve_absence_excuses=True)
+        self.client.force_login(self.invigilator)
+        self.roll_call([])
+        for absentee in Absentee.objects.all()[:2]:
+            absentee.reason = 'Ill'
+            absentee.excuse_status = Absentee.PENDING
+            absentee.save()
+
+    def test_review_updates_the_counters(self):
+        self.assertEqual(self.client.get(reverse('attendance:excuse_queue')).status_code, 403)
+
+        self.client.force_login(self.approver)
+        response = self.client.get(reverse('attendance:excuse_queue'))
+        self.assertEqual(response.context['departments'], [(self.department.pk, 'Information Technology', 2)])
+        self.assertEqual(len(response.context['page'].object_list), 2)
+
+        pending = Absentee.objects.filter(excuse_status=Absentee.PENDING).values_list('pk', flat=True)
+        self.client.post(reverse('attendance:excuse_queue'), {'absentee': [pending[0]], 'decision': 'approve'})
+        self.assertEqual(self.counters(), [('course', 3, 1, 1), ('department', 3, 1, 1), ('exam', 3, 1, 1)])
+
+        # the counters kept up with every change
+        AbsenceCount.refresh()
+        self.assertEqual(self.counters(), [('course', 3, 1, 1), ('department', 3, 1, 1), ('exam', 3, 1, 1)])
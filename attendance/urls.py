@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'attendance'
+
+urlpatterns = [
+    path('roll-call/', views.RollCallView.as_view(), name='roll_call'),
+    path('excuses/', views.ExcuseQueueView.as_view(), name='excuse_queue'),
+]
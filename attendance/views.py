@@ -0,0 +1,74 @@
+import json
+from datetime import date, time
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.core.paginator import Paginator
+from django.http import JsonResponse
+from django.shortcuts import redirect, render
+from django.views import View
+from attendance import absences
+from attendance.models import Absentee, AbsenceCount
+from core.models import Department
+
+
+class RollCallView(LoginRequiredMixin, View):
+    """
+    Roll call of a room, posted as JSON by the invigilators:
+
+        {"room": 12, "date": "2026-12-07", "time": "08:00", "present": ["1200J2000", ...]}
+    """
+
+    def post(self, request):
+        try:
+            data = json.loads(request.body)
+            room_id, present = int(data['room']), data['present']
+            exam_date, exam_time = date.fromisoformat(data['date']), time.fromisoformat(data['time'])
+        except (ValueError, TypeError, KeyError):
+            return JsonResponse({'error': 'Expected a JSON object with a room, date, time and the present '
+                                          'student numbers'}, status=400)
+        if not isinstance(present, list) or not all(isinstance(number, str) for number in present):
+            return JsonResponse({'error': 'present must be a list of student numbers'}, status=400)
+
+        if not absences.can_take_roll_call(request.user, room_id, exam_date, exam_time):
+            return JsonResponse({'error': 'You do not invigilate this room at that time'}, status=403)
+
+        try:
+            summary = absences.record_roll_call(room_id, exam_date, exam_time,
+                                                [number.strip() for number in present], request.user)
+        except absences.RollCallError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        return JsonResponse(summary)
+
+
+class ExcuseQueueView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """The absence excuses waiting for approval, per department."""
+    per_page = 50
+
+    def test_func(self):
+        return self.request.user.can_approve_absence_excuses
+
+    def get(self, request):
+        # the per department totals come from the counters, not from counting absentees
+        counts = list(AbsenceCount.objects.filter(scope=AbsenceCount.DEPARTMENT, pending__gt=0)
+                      .values_list('key', 'pending'))
+        names = dict(Department.objects.filter(pk__in=[key for key, _ in counts]).values_list('pk', 'name'))
+        departments = sorted(((key, names.get(key, key), pending) for key, pending in counts), key=lambda d: d[1])
+
+        pending = (Absentee.objects.filter(excuse_status=Absentee.PENDING)
+                   .select_related('student', 'section__course').order_by('exam_date', 'pk'))
+        department = request.GET.get('department', '')
+        if department.isdigit():
+            pending = pending.filter(section__course__department=department)
+
+        return render(request, 'attendance/excuse_queue.html', {
+            'departments': departments,
+            'department': department,
+            'page': Paginator(pending, self.per_page).get_page(request.GET.get('page')),
+        })
+
+    def post(self, request):
+        ids = [pk for pk in request.POST.getlist('absentee') if pk.isdigit()]
+        approve = request.POST.get('decision') == 'approve'
+        reviewed = absences.review_excuses(ids, approve, request.user)
+        messages.success(request, f"{'Approved' if approve else 'Rejected'} {reviewed} excuse(s)")
+        return redirect(request.get_full_path())
@@ -0,0 +1,53 @@
+from django.contrib import admin
+from bundles.models import ExamBundle, BundleEvent, BundleStatus
+
+
+class BundleEventInline(admin.TabularInline):
+    model = BundleEvent
+    fields = ('status', 'recorded_at', 'recorded_by')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        # events are recorded through bundles.tracking, which keeps the status row in step
+        return False
+
+
+@admin.register(ExamBundle)
+class ExamBundleAdmin(admin.ModelAdmin):
+    list_display = ('code', 'course_code', 'section_number', 'room', 'exam_date', 'status', 'changed_at')
+    list_filter = ('exam_date', 'current__status', 'room__campus')
+    list_select_related = ('room', 'current')  # avoid one query per row
+    search_fields = ('code', 'course_code')
+    autocomplete_fields = ('section', 'room', 'lecturer')
+    raw_id_fields = ('exam',)
+    date_hierarchy = 'exam_date'
+    inlines = [BundleEventInline]
+
+    @admin.display(ordering='current__status')
+    def status(self, obj):
+        return obj.current.get_status_display() or 'Not received'
+
+    @admin.display(ordering='current__changed_at')
+    def changed_at(self, obj):
+        return obj.current.changed_at
+
+
+@admin.register(BundleEvent)
+class BundleEventAdmin(admin.ModelAdmin):
+    list_display = ('bundle', 'status', 'recorded_at', 'recorded_by')
+    list_filter = ('status', 'recorded_at')
+    list_select_related = ('bundle', 'recorded_by')
+    search_fields = ('bundle__code',)
+    date_hierarchy = 'recorded_at'
+
+    # the event log is append only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class BundlesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'bundles'
+
+    def ready(self):
+        # connect the signal receivers
+        from bundles import signals  # noqa: F401
@@ -0,0 +1,55 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from bundles import tracking
+from bundles.models import ExamBundle, BundleStatus
+from schedule.models import ExamSchedule
+
+
+class Command(BaseCommand):
+    help = 'Create the exam bundle of every section and room of the timetable that has none yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, default=None,
+                            help='Only create the bundles of this day (YYYY-MM-DD)')
+
+    def handle(self, *args, **kwargs):
+        exams = ExamSchedule.objects.filter(room__isnull=False)
+        if kwargs['date']:
+            exams = exams.filter(exam_date=kwargs['date'])
+        if not exams.exists():
+            raise CommandError("There are no exams with a room, run the allocaterooms command first")
+
+        # a bundle stays the same (and keeps its printed code) when the timetable is rebuilt, it is
+        # linked to the new exam row of its section and room
+        existing = {(section_id, room_id): (pk, code, exam_id, exam_date, status)
+                    for pk, code, section_id, room_id, exam_id, exam_date, status in ExamBundle.objects.values_list(
+                        'pk', 'code', 'section_id', 'room_id', 'exam_id', 'exam_date', 'current__status')}
+        new_bundles, relinked, moved = [], [], []
+        for exam_id, section_id, course_code, section_number, room_id, lecturer_id, exam_date in exams.values_list(
+                'pk', 'section_id', 'section__course__code', 'section__number', 'room_id', 'section__lecturer_id',
+                'exam_date').iterator():
+            if (section_id, room_id) not in existing:
+                # the separator keeps the codes unique whatever the number of digits of the ids
+                new_bundles.append(ExamBundle(code=f"EB{section_id}-{room_id}", exam_id=exam_id,
+                                              section_id=section_id, course_code=course_code,
+                                              section_number=section_number, room_id=room_id,
+                                              lecturer_id=lecturer_id, exam_date=exam_date))
+                continue
+
+            pk, code, old_exam_id, old_date, status = existing[(section_id, room_id)]
+            if old_date != exam_date and status is not None:
+                self.stdout.write(self.style.WARNING(f"{code} was moved to {exam_date} but is already "
+                                                     f"{status}, its date is kept"))
+                exam_date = old_date
+            if (old_exam_id, old_date) != (exam_id, exam_date):
+                relinked.append(ExamBundle(pk=pk, exam_id=exam_id, exam_date=exam_date))
+                moved.append(BundleStatus(bundle_id=pk, exam_date=exam_date))
+
+        with transaction.atomic():
+            tracking.create_bundles(new_bundles)
+            ExamBundle.objects.bulk_update(relinked, ['exam', 'exam_date'], batch_size=1000)
+            BundleStatus.objects.bulk_update(moved, ['exam_date'], batch_size=1000)
+
+        self.stdout.write(self.style.SUCCESS(f"Created {len(new_bundles):,} bundles, "
+                                             f"{len(relinked):,} linked to their rescheduled exam"))
@@ -0,0 +1,42 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from bundles import tracking
+from bundles.models import BundleStatus
+
+
+class Command(BaseCommand):
+    help = 'Replay the bundle events and check (or rebuild) the current status of every bundle'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true',
+                            help='Overwrite the status rows that differ from the replayed events')
+
+    def handle(self, *args, **kwargs):
+        started = time.monotonic()
+        try:
+            states = tracking.replay()
+        except tracking.TransitionError as e:
+            raise CommandError(f"The event history is not valid: {e}")
+
+        different = []
+        for row in BundleStatus.objects.only('bundle_id', 'status', 'changed_at', 'changed_by_id', 'events').iterator():
+            expected = states.get(row.bundle_id, (None, None, None, 0))
+            if (row.status, row.changed_at, row.changed_by_id, row.events) != expected:
+                row.status, row.changed_at, row.changed_by_id, row.events = expected
+                different.append(row)
+
+        self.stdout.write(f"Replayed the events of {len(states):,} bundles in {time.monotonic() - started:.1f}s")
+        if not different:
+            self.stdout.write(self.style.SUCCESS("Every status matches the events"))
+            return
+
+        for row in different[:20]:
+            self.stdout.write(self.style.WARNING(f"Bundle {row.bundle_id} should be {row.status or 'not received'}"))
+        if not kwargs['fix']:
+            raise CommandError(f"{len(different):,} statuses differ from the events, run with --fix to rebuild them")
+
+        with transaction.atomic():
+            BundleStatus.objects.bulk_update(different, ['status', 'changed_at', 'changed_by', 'events'],
+                                             batch_size=1000)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(different):,} statuses"))
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0008_course_exam_room_type'),
+        ('schedule', '0003_invigilation_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamBundle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(help_text='Code printed (and scanned) on the bundle', max_length=32, unique=True)),
+                ('exam_date', models.DateField()),
+                ('exam', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bundles', to='schedule.examschedule')),
+                ('lecturer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bundles', to='core.lecturer')),
+                ('room', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bundles', to='core.room')),
+                ('section', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bundles', to='core.section')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BundleEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('received', 'Received'), ('released', 'Released'), ('returned', 'Returned'), ('collected', 'Collected')], max_length=10)),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('bundle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='bundles.exambundle')),
+                ('recorded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bundle_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['pk'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BundleStatus',
+            fields=[
+                ('bundle', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='current', serialize=False, to='bundles.exambundle')),
+                ('status', models.CharField(blank=True, choices=[('received', 'Received'), ('released', 'Released'), ('returned', 'Returned'), ('collected', 'Collected')], max_length=10, null=True)),
+                ('exam_date', models.DateField()),
+                ('changed_at', models.DateTimeField(blank=True, null=True)),
+                ('events', models.PositiveIntegerField(default=0, help_text='Number of events applied')),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'bundle statuses',
+                'indexes': [models.Index(fields=['exam_date', 'status'], name='bundle_status_day_idx')],
+            },
+        ),
+    ]
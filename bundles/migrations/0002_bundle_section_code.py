@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_section_codes(apps, schema_editor):
+    ExamBundle = apps.get_model('bundles', 'ExamBundle')
+
+    bundles = []
+    for bundle in ExamBundle.objects.select_related('section__course').iterator(chunk_size=2000):
+        bundle.course_code = bundle.section.course.code
+        bundle.section_number = bundle.section.number
+        bundles.append(bundle)
+
+    ExamBundle.objects.bulk_update(bundles, ['course_code', 'section_number'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_cachegeneration'),
+        ('bundles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exambundle',
+            name='course_code',
+            field=models.CharField(default='', help_text='Course code of the section, kept when it is deleted', max_length=15),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='exambundle',
+            name='section_number',
+            field=models.PositiveIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_section_codes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='exambundle',
+            name='section',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bundles', to='core.section'),
+        ),
+        migrations.AlterField(
+            model_name='bundleevent',
+            name='bundle',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='events', to='bundles.exambundle'),
+        ),
+    ]
@@ -0,0 +1,89 @@
+from django.db import models
+from django.utils import timezone
+
+
+class ExamBundle(models.Model):
+    """
+    The exam papers of one section in one room. The bundle keeps its
+    section and date when the timetable is rebuilt and its exam is gone,
+    and its course code and section number when the section is deleted
+    (a full import recreates them all), so its history is never lost.
+    """
+    code = models.CharField(max_length=32, unique=True, help_text='Code printed (and scanned) on the bundle')
+    exam = models.ForeignKey('schedule.ExamSchedule', on_delete=models.SET_NULL, null=True, blank=True,
+                             related_name='bundles')
+    section = models.ForeignKey('core.Section', on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='bundles')
+    course_code = models.CharField(max_length=15, help_text='Course code of the section, kept when it is deleted')
+    section_number = models.PositiveIntegerField()
+    room = models.ForeignKey('core.Room', on_delete=models.SET_NULL, null=True, blank=True, related_name='bundles')
+    lecturer = models.ForeignKey('core.Lecturer', on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name='bundles')
+    exam_date = models.DateField()
+
+    def __str__(self):
+        return self.code
+
+
+class BundleEvent(models.Model):
+    """
+    One status change of a bundle. Events are only ever added, the history
+    replays into BundleStatus (see bundles.tracking.replay).
+    """
+    RECEIVED = 'received'
+    RELEASED = 'released'
+    RETURNED = 'returned'
+    COLLECTED = 'collected'
+
+    STATUS_CHOICES = [
+        (RECEIVED, 'Received'),
+        (RELEASED, 'Released'),
+        (RETURNED, 'Returned'),
+        (COLLECTED, 'Collected'),
+    ]
+
+    # a bundle with events cannot be deleted, its history is kept
+    bundle = models.ForeignKey('ExamBundle', on_delete=models.PROTECT, related_name='events')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    recorded_at = models.DateTimeField(default=timezone.now)
+    recorded_by = models.ForeignKey('core.User', on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='bundle_events')
+
+    class Meta:
+        ordering = ['pk']
+
+    def __str__(self):
+        return f"{self.bundle} {self.status} at {self.recorded_at:%Y-%m-%d %H:%M}"
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValueError("Bundle events cannot be changed, record a new event instead")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Bundle events cannot be deleted")
+
+
+class BundleStatus(models.Model):
+    """
+    Current status of a bundle, the result of its events. Written in the
+    same transaction as every event so it can be queried directly.
+    """
+    bundle = models.OneToOneField('ExamBundle', on_delete=models.CASCADE, primary_key=True, related_name='current')
+    # null until the bundle is received
+    status = models.CharField(max_length=10, choices=BundleEvent.STATUS_CHOICES, null=True, blank=True)
+    exam_date = models.DateField()  # copy of the bundle's, for the per day queries
+    changed_at = models.DateTimeField(null=True, blank=True)
+    changed_by = models.ForeignKey('core.User', on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='+')
+    events = models.PositiveIntegerField(default=0, help_text='Number of events applied')
+
+    class Meta:
+        verbose_name_plural = 'bundle statuses'
+        indexes = [
+            # "the bundles of a day in a given status", e.g. not returned yet
+            models.Index(fields=['exam_date', 'status'], name='bundle_status_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.bundle_id}: {self.status or 'not received'}"
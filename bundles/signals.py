@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from bundles.models import ExamBundle, BundleStatus
+
+
+@receiver(post_save, sender=ExamBundle)
+def sync_status(sender, instance, created, **kwargs):
+    """Every bundle has a status row, bundles created one at a time (the admin) get it here."""
+    if created:
+        BundleStatus.objects.get_or_create(bundle=instance, defaults={'exam_date': instance.exam_date})
+    else:
+        BundleStatus.objects.filter(bundle=instance).exclude(exam_date=instance.exam_date).update(
+            exam_date=instance.exam_date)
@@ -0,0 +1,140 @@
+import io
+from datetime import date, time
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from bundles import tracking
+from bundles.models import ExamBundle, BundleEvent, BundleStatus
+from core.models import User, Department, Course, Section, Room
+from schedule.models import ExamSchedule
+
+
+class BundleTrackingTests(TestCase):
+    """The status row follows the events in the same transaction and the events replay into it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Information Technology')
+        course = Course.objects.create(code='IT101', name='Programming', department=department)
+        section = Section.objects.create(course=course, number=1)
+        room = Room.objects.create(label='A101', room_type=Room.CLASS_ROOM, campus=Room.SA, capacity=40, block='A')
+        cls.day = date(2026, 12, 7)
+        ExamSchedule.objects.create(section=section, room=room, exam_date=cls.day, exam_time=time(8))
+        out = io.StringIO()
+        call_command('createbundles', stdout=out)
+        cls.bundle = ExamBundle.objects.get()
+        cls.created = out.getvalue()
+
+    def test_code_separates_the_section_and_room(self):
+        self.assertEqual(self.bundle.code, f"EB{self.bundle.section_id}-{self.bundle.room_id}")
+        self.assertIn('Created 1 bundles', self.created)
+
+        # a second run finds the bundle and leaves it alone
+        out = io.StringIO()
+        call_command('createbundles', stdout=out)
+        self.assertIn('Created 0 bundles, 0 linked', out.getvalue())
+
+    def test_status_follows_the_events(self):
+        self.assertEqual(list(tracking.outstanding(self.day)), [self.bundle.current])
+        for status in (BundleEvent.RECEIVED, BundleEvent.RELEASED, BundleEvent.RETURNED):
+            tracking.record(self.bundle.pk, status)
+
+        current = BundleStatus.objects.get(bundle=self.bundle)
+        self.assertEqual((current.status, current.events), (BundleEvent.RETURNED, 3))
+        with self.assertNumQueries(1):
+            self.assertFalse(tracking.outstanding(self.day).exists())
+
+    def test_invalid_transition_records_nothing(self):
+        with self.assertRaises(tracking.TransitionError):
+            tracking.record(self.bundle.pk, BundleEvent.RETURNED)
+        self.assertFalse(BundleEvent.objects.exists())
+        self.assertIsNone(BundleStatus.objects.get(bundle=self.bundle).status)
+
+    def test_events_are_append_only(self):
+        event = tracking.record(self.bundle.pk, BundleEvent.RECEIVED)
+        with self.assertRaises(ValueError):
+            event.save()
+        with self.assertRaises(ValueError):
+            event.delete()
+
+    def test_history_outlives_the_section(self):
+        tracking.record(self.bundle.pk, BundleEvent.RECEIVED)
+        # a full import deletes and recreates every course
+        Course.objects.all().delete()
+
+        bundle = ExamBundle.objects.get()
+        self.assertEqual((bundle.section, bundle.course_code, bundle.section_number), (None, 'IT101', 1))
+        self.assertEqual(list(bundle.events.values_list('status', flat=True)), [BundleEvent.RECEIVED])
+        self.assertEqual(bundle.current.status, BundleEvent.RECEIVED)
+
+    def test_replay_matches_the_status(self):
+        tracking.record(self.bundle.pk, BundleEvent.RECEIVED)
+        event = tracking.record(self.bundle.pk, BundleEvent.RELEASED)
+        self.assertEqual(tracking.replay(), {self.bundle.pk: (BundleEvent.RELEASED, event.recorded_at, None, 2)})
+
+        BundleStatus.objects.update(status=BundleEvent.COLLECTED)
+        out = io.StringIO()
+        with self.assertRaisesMessage(CommandError, '1 statuses differ from the events'):
+            call_command('replaybundles', stdout=out)
+        self.assertIn(f"Bundle {self.bundle.pk} should be released", out.getvalue())
+        self.assertEqual(BundleStatus.objects.get(bundle=self.bundle).status, BundleEvent.COLLECTED)
+
+        out = io.StringIO()
+        call_command('replaybundles', '--fix', stdout=out)
+        self.assertIn('Rebuilt 1 statuses', out.getvalue())
+        self.assertEqual(BundleStatus.objects.get(bundle=self.bundle).status, BundleEvent.RELEASED)
+
+        out = io.StringIO()
+        call_command('replaybundles', stdout=out)
+        self.assertIn('Every status matches the events', out.getvalue())
+
+
+class BundleScanTests(TestCase):
+    """A batch of scans is validated in memory and recorded with a fixed number of queries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Information Technology')
+        course = Course.objects.create(code='IT101', name='Programming', department=department)
+        room = Room.objects.create(label='A101', room_type=Room.CLASS_ROOM, campus=Room.SA, capacity=40, block='A')
+        cls.day = date(2026, 12, 7)
+        for number in range(1, 21):
+            section = Section.objects.create(course=course, number=number)
+            ExamSchedule.objects.create(section=section, room=room, exam_date=cls.day, exam_time=time(8))
+        call_command('createbundles', stdout=io.StringIO())
+        cls.codes = list(ExamBundle.objects.order_by('code').values_list('code', flat=True))
+        cls.invigilator = User.objects.create(username='I1', is_invigilator=True)
+
+    def setUp(self):
+        self.client.force_login(self.invigilator)
+
+    def scan(self, status, codes):
+        return self.client.post(reverse('bundles:scan'), {'status': status, 'codes': codes},
+                                content_type='application/json')
+
+    def test_batch_reports_every_code(self):
+        tracking.record(ExamBundle.objects.get(code=self.codes[0]).pk, BundleEvent.RECEIVED)
+        response = self.scan(BundleEvent.RECEIVED, self.codes + ['UNKNOWN', self.codes[1]])
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['recorded'], len(self.codes) - 1)
+        self.assertEqual([item['recorded'] for item in data['results']],
+                         [False] + [True] * (len(self.codes) - 1) + [False, False])
+        self.assertFalse(tracking.outstanding(self.day).filter(status__isnull=True).exists())
+        self.assertEqual(BundleEvent.objects.filter(recorded_by=self.invigilator).count(), len(self.codes) - 1)
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        with self.assertNumQueries(5):  # bundles, status update, events, and the savepoint and its release
+            tracking.record_scans(self.codes, BundleEvent.RECEIVED, self.invigilator)
+        self.assertEqual(tracking.replay()[ExamBundle.objects.get(code=self.codes[0]).pk][3], 1)
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.scan('lost', self.codes).status_code, 400)
+        self.assertEqual(self.scan(BundleEvent.RECEIVED, 'EB1').status_code, 400)
+        self.assertEqual(self.scan([BundleEvent.RECEIVED], self.codes).status_code, 400)
+        self.assertEqual(self.scan({'status': BundleEvent.RECEIVED}, self.codes).status_code, 400)
+
+        self.client.force_login(User.objects.create(username='S1', user_type=User.STUDENT))
+        self.assertEqual(self.scan(BundleEvent.RECEIVED, self.codes).status_code, 403)
@@ -0,0 +1,172 @@
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from bundles.models import ExamBundle, BundleEvent, BundleStatus
+
+# Bundle status tracking.
+#
+# Every status change is a new BundleEvent (the audit log, never changed)
+# and, in the same transaction, an update of the bundle's BundleStatus row,
+# so the current status is one indexed lookup away. The update is a compare
+# and set on the number of events applied: two scans of the same bundle
+# racing each other cannot both succeed from the same status.
+
+# Scans arrive in bursts at the end of a session, record_scans() applies a
+# whole batch with a handful of queries instead of a transaction per bundle.
+
+# status -> the statuses that may follow it (None: not received yet)
+TRANSITIONS = {
+    None: {BundleEvent.RECEIVED},
+    BundleEvent.RECEIVED: {BundleEvent.RELEASED},
+    BundleEvent.RELEASED: {BundleEvent.RETURNED},
+    BundleEvent.RETURNED: {BundleEvent.COLLECTED},
+    BundleEvent.COLLECTED: set(),
+}
+
+# most codes one call of record_scans() takes
+MAX_SCANS = 1000
+
+# rows per IN (...) lookup, below the SQLite limit of query parameters
+CHUNK_SIZE = 500
+
+
+class TransitionError(ValueError):
+    """Raised when a bundle cannot move to the requested status."""
+
+
+def check_transition(current, status):
+    if status not in TRANSITIONS.get(current, ()):
+        raise TransitionError(f"A bundle cannot go from {current or 'not received'} to {status}")
+
+
+def create_bundles(bundles):
+    """bulk_create the ExamBundle objects together with their (empty) status rows."""
+    with transaction.atomic():
+        bundles = ExamBundle.objects.bulk_create(bundles, batch_size=1000)
+        BundleStatus.objects.bulk_create(
+            [BundleStatus(bundle=bundle, exam_date=bundle.exam_date) for bundle in bundles], batch_size=1000
+        )
+    return bundles
+
+
+def record(bundle_id, status, user=None):
+    """Record a status change of a bundle. Raises TransitionError when it is not allowed."""
+    with transaction.atomic():
+        current = BundleStatus.objects.get(bundle_id=bundle_id)
+        check_transition(current.status, status)
+
+        event = BundleEvent.objects.create(bundle_id=bundle_id, status=status, recorded_by=user)
+        updated = BundleStatus.objects.filter(bundle_id=bundle_id, events=current.events).update(
+            status=status, changed_at=event.recorded_at, changed_by=user, events=current.events + 1
+        )
+        if not updated:
+            # another scan got there first, the event is rolled back with the transaction
+            raise TransitionError(f"Bundle {bundle_id} changed while recording {status}, scan it again")
+
+    return event
+
+
+def record_scans(codes, status, user=None, attempts=3):
+    """
+    Record the same status change for a batch of scanned bundle codes.
+    Returns one (code, recorded, message) per code, in the order given.
+    The valid scans are recorded in one transaction whatever the invalid
+    ones, a code scanned twice counts once.
+    """
+    if status not in dict(BundleEvent.STATUS_CHOICES):
+        raise TransitionError(f"Unknown bundle status {status}")
+    if len(codes) > MAX_SCANS:
+        raise TransitionError(f"At most {MAX_SCANS} bundles can be scanned at once")
+
+    for attempt in range(attempts):
+        try:
+            return _record_scans(codes, status, user)
+        except _Conflict:
+            # another batch changed some of the bundles, validate them again against the new statuses
+            if attempt == attempts - 1:
+                raise TransitionError("The bundles changed while recording the scans, scan them again")
+
+
+class _Conflict(Exception):
+    pass
+
+
+def _record_scans(codes, status, user):
+    unique = list(dict.fromkeys(codes))
+    rows = {}
+    for start in range(0, len(unique), CHUNK_SIZE):
+        rows.update((code, (pk, current)) for code, pk, current in ExamBundle.objects.filter(
+            code__in=unique[start:start + CHUNK_SIZE]).values_list('code', 'pk', 'current__status'))
+
+    results, valid, seen = [], [], set()
+    for code in codes:
+        if code in seen:
+            results.append((code, False, 'Scanned twice in this batch'))
+            continue
+        seen.add(code)
+        if code not in rows:
+            results.append((code, False, 'Unknown bundle'))
+            continue
+        pk, current = rows[code]
+        if current == status:
+            # the same bundle scanned again, e.g. by a second invigilator of the room
+            results.append((code, False, f"Already {status}"))
+            continue
+        try:
+            check_transition(current, status)
+        except TransitionError as e:
+            results.append((code, False, str(e)))
+            continue
+        results.append((code, True, f"{current or 'not received'} -> {status}"))
+        valid.append(pk)
+
+    # every valid bundle was in a status leading to this one, the update only
+    # touches the rows still in it, so a bundle changed by a concurrent batch
+    # shows up as a missing row
+    previous = [current for current, following in TRANSITIONS.items() if status in following]
+    still_previous = Q(status__in=[current for current in previous if current is not None])
+    if None in previous:
+        still_previous |= Q(status__isnull=True)
+
+    now = timezone.now()
+    with transaction.atomic():
+        updated = 0
+        for start in range(0, len(valid), CHUNK_SIZE):
+            chunk = valid[start:start + CHUNK_SIZE]
+            updated += BundleStatus.objects.filter(still_previous, bundle_id__in=chunk).update(
+                status=status, changed_at=now, changed_by=user, events=F('events') + 1
+            )
+        if updated != len(valid):
+            raise _Conflict
+        BundleEvent.objects.bulk_create(
+            [BundleEvent(bundle_id=pk, status=status, recorded_at=now, recorded_by=user) for pk in valid],
+            batch_size=CHUNK_SIZE
+        )
+
+    return results
+
+
+def outstanding(day=None):
+    """Status rows of the bundles of a day (today by default) that are not back from the exam room yet."""
+    return (BundleStatus.objects
+            .filter(exam_date=day or timezone.localdate())
+            .exclude(status__in=[BundleEvent.RETURNED, BundleEvent.COLLECTED]))
+
+
+def replay(bundle_ids=None):
+    """
+    The BundleStatus every bundle (or the given ones) should have according
+    to its events: {bundle id: (status, changed_at, changed_by id, events)}.
+    Raises TransitionError when the history itself is not valid.
+    """
+    events = BundleEvent.objects.order_by('bundle_id', 'pk')
+    if bundle_ids is not None:
+        events = events.filter(bundle_id__in=bundle_ids)
+
+    states = {}
+    for bundle_id, status, recorded_at, recorded_by in events.values_list(
+            'bundle_id', 'status', 'recorded_at', 'recorded_by').iterator():
+        current, _, _, count = states.get(bundle_id, (None, None, None, 0))
+        check_transition(current, status)
+        states[bundle_id] = (status, recorded_at, recorded_by, count + 1)
+    return states
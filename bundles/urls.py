@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+app_name = 'bundles'
+
+urlpatterns = [
+    path('scan/', views.BundleScanView.as_view(), name='scan'),
+]
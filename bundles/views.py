@@ -0,0 +1,48 @@
+import json
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.http import JsonResponse
+from django.views import View
+from bundles import tracking
+
+
+def can_scan_bundles(user):
+    """The exam staff handing bundles over: invigilators, lecturers, the exam committee and the admins."""
+    return user.is_staff or user.is_invigilator or user.is_lecturer or user.is_exam_committee_member
+
+
+class BundleScanView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """
+    Batch of bundle scans, posted as JSON by the scanning clients:
+
+        {"status": "returned", "codes": ["EB12-1", ...]}
+
+    Answers with the result of every code, the valid scans are recorded
+    even when others in the batch are not.
+    """
+    raise_exception = True  # scanning clients get a 403, not the login page
+
+    def test_func(self):
+        return can_scan_bundles(self.request.user)
+
+    def post(self, request):
+        try:
+            data = json.loads(request.body)
+            status, codes = data['status'], data['codes']
+        except (ValueError, TypeError, KeyError):
+            return JsonResponse({'error': 'Expected a JSON object with a status and a list of codes'}, status=400)
+        if not isinstance(status, str):
+            return JsonResponse({'error': 'status must be a string'}, status=400)
+        if not isinstance(codes, list) or not all(isinstance(code, str) for code in codes):
+            return JsonResponse({'error': 'codes must be a list of strings'}, status=400)
+
+        try:
+            results = tracking.record_scans([code.strip() for code in codes], status, request.user)
+        except tracking.TransitionError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        return JsonResponse({
+            'status': status,
+            'recorded': sum(1 for _, recorded, _ in results if recorded),
+            'results': [{'code': code, 'recorded': recorded, 'message': message}
+                        for code, recorded, message in results],
+        })
@@ -1,16 +1,36 @@
 from django.contrib import admin
+from django.db.models import Q
 from django.contrib.auth.admin import UserAdmin as DefaultUserAdmin
 from core.models import User, Department, Lecturer, Student
-from core.models import Course, Section, Room
+from core.models import Course, Section, Room, CourseRegistration
+from core.names import fold_name
 
 # Customizing the UserAdmin for your custom User model
 @admin.register(User)
 class UserAdmin(DefaultUserAdmin):  # Extend DefaultUserAdmin for proper password handling
 
-    list_display = ('username', 'email', 'department', 'user_type', 'is_lecturer', 'is_invigilator', 'is_exam_committee_member')
+    list_display = ('username', 'display_name', 'email', 'department', 'user_type', 'is_lecturer', 'is_invigilator', 'is_exam_committee_member')
     list_filter = ('user_type', 'department', 'is_lecturer', 'is_invigilator', 'is_exam_committee_member')
+    list_select_related = ('department',)
     search_fields = ('username', 'email')
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Match the exact username or email, or the start of the name on the
+        indexed search key. The term is folded like the key, so 'Al Balushi'
+        finds 'AlBalushi'. Only indexable lookups, no LIKE '%...%' scans.
+        """
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+
+        matches = Q(username=search_term) | Q(email=search_term)
+        folded = fold_name(search_term)
+        if folded:
+            matches |= Q(search_key__startswith=folded)
+
+        return queryset.filter(matches), False
+
     # Custom fieldsets for better organization in the admin interface
     fieldsets = (
         (None, {'fields': ('username', 'password')}),  # Basic login fields (username and password)
@@ -41,7 +61,7 @@ class UserAdmin(DefaultUserAdmin):  # Extend DefaultUserAdmin for proper passwor
 # Register Lecturer as a proxy model with custom admin
 @admin.register(Lecturer)
 class LecturerAdmin(UserAdmin):
-    list_display = ('username', 'email', 'department', 'user_type', 'is_lecturer', 'is_invigilator', 'is_exam_committee_member')
+    list_display = ('username', 'display_name', 'email', 'department', 'user_type', 'is_lecturer', 'is_invigilator', 'is_exam_committee_member')
     list_filter = ('user_type', 'department', 'is_lecturer', 'is_invigilator', 'is_exam_committee_member')
     search_fields = ('username', 'email')
 
@@ -60,7 +80,7 @@ class LecturerAdmin(UserAdmin):
 # Register Student as a proxy model with custom admin
 @admin.register(Student)
 class StudentAdmin(UserAdmin):
-    list_display = ('username', 'email', 'department', 'user_type')
+    list_display = ('username', 'display_name', 'email', 'department', 'user_type')
     list_filter = ('user_type', 'department')
     search_fields = ('username', 'email')
 
@@ -86,13 +106,15 @@ class DepartmentAdmin(admin.ModelAdmin):
 class CourseAdmin(admin.ModelAdmin):
     # Fields to display in the course list view
     list_display = ('code', 'name', 'coordinator', 'department')
-    list_filter = ('department',)  # Add filter by department
+    list_filter = ('department', 'exam_room_type')  # Add filter by department and exam room type
+    list_select_related = ('coordinator', 'department')  # avoid one query per row
     search_fields = ('code', 'name')  # Enable searching by course code and name
+    autocomplete_fields = ('coordinator', 'department')  # instead of loading every user in a dropdown
 
     # Optional: Customize the form layout in the admin
     fieldsets = (
         (None, {
-            'fields': ('code', 'name', 'coordinator', 'department'),
+            'fields': ('code', 'name', 'coordinator', 'department', 'exam_room_type'),
         }),
     )
 
@@ -105,9 +127,13 @@ class CourseAdmin(admin.ModelAdmin):
 @admin.register(Section)
 class SectionAdmin(admin.ModelAdmin):
     # Fields to display in the section list view
-    list_display = ('course', 'number', 'lecturer')
-    list_filter = ('course__department', 'lecturer')  # Filter by department and lecturer
-    search_fields = ('course__code', 'course__name')  # Enable search by course code and name
+    list_display = ('course', 'number', 'lecturer', 'student_count')
+    # Filter by department and lecturer, only the lecturers that teach a section are listed
+    list_filter = ('course__department', ('lecturer', admin.RelatedOnlyFieldListFilter))
+    list_select_related = ('course', 'lecturer')  # avoid one query per row
+    # Enable search by course code and name, and lecturer id
+    search_fields = ('course__code', 'course__name', 'lecturer__username')
+    autocomplete_fields = ('course', 'lecturer')  # instead of loading every course and user in a dropdown
 
     # Optional: Customize the form layout in the admin
     fieldsets = (
@@ -122,6 +148,14 @@ class SectionAdmin(admin.ModelAdmin):
             kwargs["queryset"] = User.objects.filter(user_type=User.ACADEMIC_STAFF)
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
+@admin.register(CourseRegistration)
+class CourseRegistrationAdmin(admin.ModelAdmin):
+    list_display = ('student', 'section')
+    list_filter = ('section__course__department',)
+    list_select_related = ('student', 'section__course')  # avoid one query per row
+    search_fields = ('student__username', 'section__course__code', 'section__course__name')
+    autocomplete_fields = ('student', 'section')
+
 @admin.register(Room)
 class RoomAdmin(admin.ModelAdmin):
     # Fields to display in the list view
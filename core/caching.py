@@ -0,0 +1,124 @@
+import time
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+# Cache namespaces with explicit invalidation.
+#
+# Every namespace has a generation counter that is part of its keys. Bumping
+# the counter makes all the entries of the namespace unreachable at once
+# without having to know or delete them, which also works for backends
+# shared with other applications (no clear()).
+#
+# The counters are rows of CacheGeneration, not cache entries: a per process
+# cache (locmem) would keep a bump by a management command or another web
+# worker from ever reaching the other processes. Reading a counter costs one
+# primary key lookup.
+#
+# The counters are bumped by the save/delete signals of the core models
+# (see core.signals) once the transaction commits, a single time however
+# many rows it changed, and by bulk operations that bypass the signals. The
+# time of the last bump is kept next to them for Last-Modified headers.
+
+SCHEDULES = 'schedules'
+FRAGMENTS = 'template_fragments'
+
+NAMESPACES = (SCHEDULES, FRAGMENTS)
+
+
+def first_generation():
+    # a recreated or restored database starts past any generation still cached
+    return time.time_ns() // 1000
+
+
+def get_stamp(namespace):
+    """(generation, time of the last invalidation to the second) of the namespace."""
+    from core.models import CacheGeneration
+
+    stamp = CacheGeneration.objects.filter(pk=namespace).values_list('generation', 'modified').first()
+    if stamp is None:
+        CacheGeneration.objects.bulk_create(
+            [CacheGeneration(namespace=namespace, generation=first_generation(),
+                             modified=timezone.now().replace(microsecond=0))],
+            ignore_conflicts=True
+        )
+        stamp = CacheGeneration.objects.filter(pk=namespace).values_list('generation', 'modified').get()
+    return stamp
+
+
+def get_generation(namespace):
+    return get_stamp(namespace)[0]
+
+
+def get_last_modified(namespace):
+    """When the namespace was last invalidated (or first used), to the second."""
+    return get_stamp(namespace)[1]
+
+
+def make_key(namespace, *parts):
+    """Key of an entry in the namespace, e.g. make_key(SCHEDULES, 'student', 42)."""
+    return ':'.join([namespace, str(get_generation(namespace))] + [str(part) for part in parts])
+
+
+def get_or_set(namespace, parts, compute, timeout=None):
+    """
+    Cached value of compute() for the key parts, e.g.
+    get_or_set(SCHEDULES, ('student', 42), lambda: build_timetable(42)).
+    A timeout of None uses the TIMEOUT of the named cache.
+    """
+    cache = caches[namespace]
+    key = make_key(namespace, *parts)
+
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        if timeout is None:
+            cache.set(key, value)
+        else:
+            cache.set(key, value, timeout)
+
+    return value
+
+
+def invalidate(*namespaces):
+    """Drop every entry of the given namespaces (all of them by default)."""
+    from core.models import CacheGeneration
+
+    namespaces = namespaces or NAMESPACES
+    now = timezone.now().replace(microsecond=0)
+    CacheGeneration.objects.bulk_create(
+        [CacheGeneration(namespace=namespace, generation=first_generation(), modified=now)
+         for namespace in namespaces],
+        ignore_conflicts=True
+    )
+    CacheGeneration.objects.filter(namespace__in=namespaces).update(generation=F('generation') + 1, modified=now)
+
+
+class _PendingInvalidation:
+    """The on_commit callback of a transaction, collecting the namespaces to invalidate."""
+
+    def __init__(self, namespaces):
+        self.namespaces = set(namespaces)
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        invalidate(*self.namespaces)
+
+
+def invalidate_on_commit(*namespaces):
+    """
+    invalidate() when the current transaction commits (right away outside of
+    one). The calls of a transaction are collected into one invalidation.
+    """
+    namespaces = namespaces or NAMESPACES
+    connection = transaction.get_connection()
+    # one callback per transaction or savepoint: the callbacks of a rolled back savepoint are dropped
+    savepoints = set(connection.savepoint_ids)
+    for callback_savepoints, callback, *_ in connection.run_on_commit:
+        if (callback_savepoints == savepoints and isinstance(callback, _PendingInvalidation)
+                and not callback.done):
+            callback.namespaces.update(namespaces)
+            return
+    transaction.on_commit(_PendingInvalidation(namespaces))
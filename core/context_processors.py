@@ -0,0 +1,14 @@
+from django.utils.functional import SimpleLazyObject
+from core import caching
+
+
+def cache_generation(request):
+    """
+    Generation of the template fragment cache, to be used as the last vary_on
+    argument of the cache tag so that fragments expire when the data changes:
+
+        {% cache 600 dashboard request.user.pk cache_generation %}
+
+    Lazy, only the templates that use it look the generation up.
+    """
+    return {'cache_generation': SimpleLazyObject(lambda: caching.get_generation(caching.FRAGMENTS))}
@@ -0,0 +1,101 @@
+from contextvars import ContextVar
+from django.core.cache import caches
+
+# Display names shown by the `displayname` template filter.
+#
+# Names are resolved through two layers: a dict that lives for the duration
+# of one request (see DisplayNameCacheMiddleware) and the shared Django
+# cache, whose entries are dropped whenever a User is saved or deleted
+# (see core.signals). Missing names are loaded with a single query.
+
+CACHE_ALIAS = 'default'
+CACHE_PREFIX = 'displayname'
+CACHE_TIMEOUT = 60 * 60 * 24
+
+UNKNOWN_USER = "Unknown User"
+
+NAME_FIELDS = ('username', 'display_name')
+
+_request_cache = ContextVar('displayname_request_cache', default=None)
+
+
+def format_display_name(user):
+    # If no detailed name is available, fall back to the username (ID)
+    return user.display_name or user.username
+
+
+def cache_key(username):
+    return f"{CACHE_PREFIX}:{username}"
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def start_request():
+    """Open a request scoped cache, returns the token for end_request."""
+    return _request_cache.set({})
+
+
+def end_request(token):
+    _request_cache.reset(token)
+
+
+def remember(user):
+    """Store the display name of an already loaded user."""
+    name = format_display_name(user)
+    request_cache = _request_cache.get()
+    if request_cache is not None:
+        request_cache[user.username] = name
+    return name
+
+
+def resolve(usernames):
+    """
+    Return a username -> display name dict for the given usernames.
+    Whatever is neither in the request nor in the shared cache is loaded
+    with one query. Unknown usernames map to UNKNOWN_USER.
+    """
+    from core.models import User
+
+    usernames = {str(username) for username in usernames if username}
+    request_cache = _request_cache.get()
+    if request_cache is None:
+        request_cache = {}
+
+    names = {username: request_cache[username] for username in usernames if username in request_cache}
+    missing = usernames - names.keys()
+
+    if missing:
+        cache = get_cache()
+        cached = cache.get_many([cache_key(username) for username in missing])
+        for username in list(missing):
+            key = cache_key(username)
+            if key in cached:
+                names[username] = cached[key]
+                missing.discard(username)
+
+    if missing:
+        loaded = {
+            user.username: format_display_name(user)
+            for user in User.objects.filter(username__in=missing).only(*NAME_FIELDS)
+        }
+        if loaded:
+            get_cache().set_many({cache_key(username): name for username, name in loaded.items()},
+                                 CACHE_TIMEOUT)
+        for username in missing:
+            names[username] = loaded.get(username, UNKNOWN_USER)
+
+    request_cache.update(names)
+    return names
+
+
+def invalidate(usernames):
+    """Drop the cached names, e.g. after the users were saved or bulk updated."""
+    usernames = [str(username) for username in usernames]
+    get_cache().delete_many([cache_key(username) for username in usernames])
+
+    request_cache = _request_cache.get()
+    if request_cache is not None:
+        for username in usernames:
+            request_cache.pop(username, None)
@@ -0,0 +1,13 @@
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TemporaryPasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2 with a low iteration count for the generated first-login passwords
+    of bulk imported accounts (see `loadusers --hasher`).
+
+    Because it is not the first entry of PASSWORD_HASHERS, Django re-hashes the
+    password with the default hasher the first time the user logs in.
+    """
+    algorithm = 'pbkdf2_sha256_temp'
+    iterations = 10000
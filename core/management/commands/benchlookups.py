@@ -0,0 +1,132 @@
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from core.models import User, Department, Course, Section
+
+# Prefix of the synthetic rows, they are removed again at the end of a run
+PREFIX = 'bench-'
+
+
+class RollBack(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Seed synthetic users and courses and time the hot lookup paths of core.models'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50000, help='Number of synthetic users')
+        parser.add_argument('--courses', type=int, default=2000, help='Number of synthetic courses')
+        parser.add_argument('--repeat', type=int, default=200, help='Executions per lookup (median is reported)')
+        parser.add_argument('--compare', action='store_true',
+                            help='Also time the lookups without the indexes of the models, dropped in a '
+                                 'transaction that is rolled back')
+
+    def handle(self, *args, **kwargs):
+        self.repeat = kwargs['repeat']
+        if kwargs['compare'] and not connection.features.can_rollback_ddl:
+            raise CommandError(f"--compare needs a database that rolls back DROP INDEX, {connection.vendor} "
+                               "does not")
+        self.seed(kwargs['users'], kwargs['courses'])
+
+        try:
+            if kwargs['compare']:
+                self.report_without_indexes()
+                self.report('after (indexed)')
+            else:
+                self.report('current schema')
+        finally:
+            self.cleanup()
+
+    def report_without_indexes(self):
+        """
+        Time the lookups with the Meta.indexes of the models dropped. The
+        schema is never migrated: the DROP INDEX statements are rolled back
+        with the transaction. The unique constraints stay, dropping them
+        means rebuilding the tables on SQLite.
+        """
+        names = [index.name for model in (User, Course, Section) for index in model._meta.indexes]
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    for name in names:
+                        cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+                self.report(f"before (without {', '.join(names)})")
+                raise RollBack
+        except RollBack:
+            pass
+
+    def seed(self, users, courses):
+        self.cleanup()
+        rng = random.Random(0)
+
+        departments = [Department(name=f"{PREFIX}department {i}") for i in range(10)]
+        Department.objects.bulk_create(departments)
+        departments = list(Department.objects.filter(name__startswith=PREFIX))
+
+        user_types = [User.STUDENT] * 8 + [User.ACADEMIC_STAFF, User.NON_ACADEMIC_STAFF]
+        new_users = []
+        for i in range(users):
+            user_type = rng.choice(user_types)
+            is_lecturer = user_type == User.ACADEMIC_STAFF
+            new_users.append(User(
+                username=f"{PREFIX}{i}", password='!', first_name='Bench', last_name=str(i),
+                user_type=user_type, department=rng.choice(departments),
+                is_lecturer=is_lecturer, is_invigilator=is_lecturer,
+            ))
+        User.objects.bulk_create(new_users, batch_size=2000)
+        lecturer_ids = list(User.objects.filter(username__startswith=PREFIX, is_lecturer=True)
+                            .values_list('pk', flat=True))
+
+        Course.objects.bulk_create(
+            [Course(code=f"B{i:05d}", name=f"{PREFIX}course {i}", department=rng.choice(departments))
+             for i in range(courses)],
+            batch_size=2000
+        )
+        course_ids = list(Course.objects.filter(name__startswith=PREFIX).values_list('pk', flat=True))
+
+        Section.objects.bulk_create(
+            [Section(course_id=course_id, number=number, lecturer_id=rng.choice(lecturer_ids))
+             for course_id in course_ids for number in range(1, 4)],
+            batch_size=2000
+        )
+
+        self.departments = [department.pk for department in departments]
+        self.course_codes = [f"B{i:05d}" for i in range(courses)]
+        self.course_ids = course_ids
+        self.stdout.write(f"Seeded {users:,} users, {courses:,} courses and {3 * courses:,} sections")
+
+    @staticmethod
+    def cleanup():
+        Section.objects.filter(course__name__startswith=PREFIX).delete()
+        Course.objects.filter(name__startswith=PREFIX).delete()
+        User.objects.filter(username__startswith=PREFIX).delete()
+        Department.objects.filter(name__startswith=PREFIX).delete()
+
+    def lookups(self):
+        rng = random.Random(1)
+        return [
+            ('lecturers changelist page', lambda: list(
+                User.objects.filter(user_type=User.ACADEMIC_STAFF).order_by('username')[:100])),
+            ('students count', lambda: User.objects.filter(user_type=User.STUDENT).count()),
+            ('invigilators of a department', lambda: list(
+                User.objects.filter(is_invigilator=True, department_id=rng.choice(self.departments))
+                .values_list('pk', flat=True))),
+            ('lecturers of a department', lambda: User.objects.filter(
+                is_lecturer=True, department_id=rng.choice(self.departments)).count()),
+            ('course by code', lambda: Course.objects.get(code=rng.choice(self.course_codes))),
+            ('section by (course, number)', lambda: Section.objects.get(
+                course_id=rng.choice(self.course_ids), number=rng.randint(1, 3))),
+        ]
+
+    def report(self, label):
+        self.stdout.write(f"\n{label} [{connection.vendor}]")
+        for name, lookup in self.lookups():
+            timings = []
+            for _ in range(self.repeat):
+                start = time.perf_counter()
+                lookup()
+                timings.append(time.perf_counter() - start)
+            self.stdout.write(f"  {name:<32} {statistics.median(timings) * 1000:8.3f} ms")
@@ -0,0 +1,50 @@
+import random
+import timeit
+from django.core.management.base import BaseCommand
+from core import names
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark of the name normalization used by loadusers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000, help='Number of report rows to simulate')
+        parser.add_argument('--distinct', type=int, default=500,
+                            help='Number of distinct names among the rows')
+        parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions (best is reported)')
+
+    @staticmethod
+    def synthetic_column(rows, distinct, seed=0):
+        """Report-like columns where a limited set of names repeats on many rows."""
+        rng = random.Random(seed)
+        parts = ['Ahmed', 'Al', 'Balushi', 'Said', 'Sara', 'al-Hinai', 'Mohammed', 'Fatma', 'Salim', 'Al Habsi']
+        students = [' '.join(rng.choice(parts) for _ in range(rng.randint(2, 5))) for _ in range(distinct)]
+        lecturers = [f"{2000 + i} - {rng.choice(['Dr.', 'Mr', 'Ms.', ''])} {student}"
+                     for i, student in enumerate(students)]
+        return [rng.choice(students) for _ in range(rows)], [rng.choice(lecturers) for _ in range(rows)]
+
+    def handle(self, *args, **kwargs):
+        rows, repeat = kwargs['rows'], kwargs['repeat']
+        students, lecturers = self.synthetic_column(rows, kwargs['distinct'])
+
+        def uncached():
+            for name in students:
+                names.clean_omani_name.__wrapped__(name)
+            for entry in lecturers:
+                names._clean_lecturer_name.__wrapped__(entry)
+
+        def cached():
+            for name in students:
+                names.clean_omani_name(name)
+            for entry in lecturers:
+                names.clean_lecturer_name(entry)
+
+        def batch():
+            names.clean_omani_names(students)
+            names.clean_lecturer_names(lecturers)
+
+        self.stdout.write(f"{rows:,} rows, {kwargs['distinct']:,} distinct names (student + lecturer column)")
+        for label, func in (('uncached', uncached), ('cached', cached), ('batch', batch)):
+            names.cache_clear()
+            best = min(timeit.repeat(func, number=1, repeat=repeat))
+            self.stdout.write(f"{label:>9}: {best * 1000:8.1f} ms total, {best / rows * 1e6:6.2f} us/row")
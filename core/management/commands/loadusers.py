@@ -1,18 +1,51 @@
 import csv
 import random
 import string
-from django.core.management.base import BaseCommand
-from core.models import Lecturer, Student, Department
-from core.models import Course, Section
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.hashers import make_password, get_hasher
+from django.db import transaction
+from core.models import User, Lecturer, Student, Department
+from core.models import Course, Section, CourseRegistration
+from core.reports import ReportReader, ReportError, Progress
+from core import names, displaynames, caching
 from django.conf import settings
 import os
-import re
+
+
+def hash_password(password, hasher='default'):
+    # module level so that it can be pickled to the worker processes
+    return make_password(password, hasher=hasher)
+
+
+def parse_report_file(file_path, chunk_size=1000):
+    # runs in a worker process, returns the deduplicated content of one report
+    with ReportReader(file_path, chunk_size=chunk_size) as reader:
+        return Command.parse_report(reader)
+
 
 class Command(BaseCommand):
     help = 'Load users from Examination List Report'
 
     def add_arguments(self, parser):
-        parser.add_argument('file_path', type=str, help='Path to the CSV file')
+        parser.add_argument('file_path', type=str, nargs='+',
+                            help='Path(s) to the CSV report(s), or a directory of reports')
+        parser.add_argument('--bulk', action='store_true',
+                            help='Parse the whole report first and write it with bulk queries')
+        parser.add_argument('--delta', action='store_true',
+                            help='Apply only the differences against the existing records instead of '
+                                 'deleting and reloading everything')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Processes used to parse the reports and hash the passwords '
+                                 'of new users in --bulk/--delta mode')
+        parser.add_argument('--hasher', type=str, default='default',
+                            help='Algorithm of a configured hasher for the generated passwords, '
+                                 'e.g. pbkdf2_sha256_temp (upgraded on first login)')
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Number of report rows read at a time')
+        parser.add_argument('--progress-interval', type=float, default=5.0,
+                            help='Seconds between progress reports (0 disables them)')
         # return super().add_arguments(parser)
     
     @staticmethod
@@ -22,112 +55,572 @@ class Command(BaseCommand):
         return ''.join(random.choice(characters) for _ in range(length))
     
     def handle(self, *args, **kwargs):
-        file_path = kwargs['file_path']
-
-        # delete all the objects
-        Lecturer.objects.all().delete()
-        Student.objects.all().delete()
-        Course.objects.all().delete()
-        Section.objects.all().delete()
-
-        with open(file_path, newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-
-            output_file_path = os.path.join(settings.BASE_DIR, 'created_users_log.csv')
-            with open(output_file_path, mode='a', newline='') as outfile:
-
-                fieldnames = ['username', 'password', 'user_type', 'department']
-                writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-
-                # write the header
-                if outfile.tell() == 0:
-                    writer.writeheader()
-
-                for row in reader:
-
-                    # load or create the department
-                    department_name = row['Department Name']
-                    department, _ = Department.objects.get_or_create(name=department_name)
-
-                    # load or create student
-                    student_id = row['Student No']
-                    student_name = row['Student Name']
-                    student_fn, student_mn, student_ln = self.clean_omani_name(student_name)
-                    student_email = f"{student_id}@utas.edu.om"
-                    student_password = self.generate_password()
-
-                    # check if student exists
-                    student, created_student = Student.objects.get_or_create(
-                        username=student_id,
-                        defaults={
-                            'first_name': student_fn,
-                            'middle_name': student_mn,
-                            'last_name': student_ln,
-                            'email': student_email,
-                            'user_type': Student.STUDENT,
-                            'department': department
-                        }
-                    )
-
-                    # add to the log and set the password
-                    if created_student:
-                        student.set_password(student_password)
-                        student.save()
-                        # 'username', 'password', 'user_type', 'department'
-                        writer.writerow({'username': student.username, 'password': student_password, 
-                                         'user_type': 'Student', 'department': department_name})
-                    
-
-                    # course department for both lecturer and course
-                    course_department = row['Department Courses']
-                    department, _ = Department.objects.get_or_create(name=course_department)
-                    
-                    # load or create lecturer
-                    lecturer_entry = row['Lecturer Name']
-                    lecturer_data = self.clean_lecturer_name(lecturer_entry)
-                    lecturer_password = self.generate_password()
-
-                    # check if lecturer exists
-                    lecturer, created_lecturer = Lecturer.objects.get_or_create(
-                        username = lecturer_data['username'],
-                        defaults={
-                            'prefix': lecturer_data['prefix'],
-                            'first_name': lecturer_data['first_name'],
-                            'middle_name': lecturer_data['middle_name'],
-                            'last_name': lecturer_data['last_name'],
-                            'department': department,
-                            'user_type': Lecturer.ACADEMIC_STAFF
-                        }
-                    )
-
-                    if created_lecturer:
-                        lecturer.set_password(lecturer_password)
-                        lecturer.save()
-                        writer.writerow({'username': lecturer.username, 'password': lecturer_password, 
-                                         'user_type': 'Lecturer', 'department': course_department})
-                    
-                    # load or create course
-                    course_id = row['Course No']
-                    course_name = row['Course Name']
-
-                    course, _ = Course.objects.get_or_create(
-                        code = course_id,
-                        defaults={
-                            'name': course_name,
-                            'department': department
-                        }
-                    )
-
-                    # load or create section
-                    section_no = int(row['Section No'].strip())
-                    Section.objects.get_or_create(
-                        course=course, 
-                        number=section_no,
-                        defaults={'lecturer': lecturer}
-                    )
-
-                    # Provide feedback in the command line output
-                    self.stdout.write(f"Processed: Student {student.username}, Lecturer {lecturer.username}, Course {course.name}")
+        file_paths = self.collect_files(kwargs['file_path'])
+        chunk_size = kwargs.get('chunk_size', 1000)
+        self.workers = max(kwargs.get('workers') or 1, 1)
+        self.hasher = kwargs.get('hasher') or 'default'
+        self.verbosity = kwargs.get('verbosity', 1)
+
+        try:
+            get_hasher(self.hasher)
+        except ValueError as e:
+            raise CommandError(e)
+
+        # the headers are validated before anything gets deleted
+        for file_path in file_paths:
+            try:
+                with ReportReader(file_path):
+                    pass
+            except (OSError, ReportError) as e:
+                raise CommandError(e)
+
+        progress = Progress(self.stdout, kwargs.get('progress_interval', 5.0))
+
+        # delete all the objects (a delta import keeps them and diffs instead)
+        if not kwargs.get('delta'):
+            # one transaction, the delete signals invalidate the caches once
+            with transaction.atomic():
+                Lecturer.objects.all().delete()
+                Student.objects.all().delete()
+                Course.objects.all().delete()
+                Section.objects.all().delete()
+
+        output_file_path = os.path.join(settings.BASE_DIR, 'created_users_log.csv')
+        with open(output_file_path, mode='a', newline='') as outfile:
+
+            fieldnames = ['username', 'password', 'user_type', 'department']
+            writer = csv.DictWriter(outfile, fieldnames=fieldnames)
+
+            # write the header
+            if outfile.tell() == 0:
+                writer.writeheader()
+
+            if kwargs.get('delta') or kwargs.get('bulk'):
+                # parse everything (in parallel), then write from this process only
+                report = self.parse_reports(file_paths, chunk_size, progress)
+                if kwargs.get('delta'):
+                    self.import_delta(report, writer)
+                else:
+                    self.import_bulk(report, writer)
+                rows_read = report['rows']
+            else:
+                rows_read = 0
+                for file_path in file_paths:
+                    # a transaction per report, the save signals invalidate the caches once it commits
+                    with ReportReader(file_path, chunk_size=chunk_size, on_chunk=progress) as reader, \
+                            transaction.atomic():
+                        self.import_rows(reader, writer)
+                        rows_read += reader.rows_read
+
+        # the bulk queries send no signals
+        caching.invalidate()
+
+        progress.finish(rows_read)
+
+    @staticmethod
+    def collect_files(paths):
+        """Expand directories to the CSV reports (plain or gzip) they contain."""
+        file_paths = []
+        for path in paths:
+            if os.path.isdir(path):
+                file_paths.extend(sorted(
+                    os.path.join(path, name) for name in os.listdir(path)
+                    if name.lower().endswith(('.csv', '.csv.gz'))
+                ))
+            else:
+                file_paths.append(path)
+
+        if not file_paths:
+            raise CommandError(f"No report files found in {', '.join(paths)}")
+
+        return file_paths
+
+    def parse_reports(self, file_paths, chunk_size, progress):
+        """
+        Parse and normalize the reports, one worker process per file, and
+        merge the results in the order the files were given.
+        """
+        workers = min(self.workers, len(file_paths))
+
+        if workers <= 1:
+            reports = []
+            for file_path in file_paths:
+                with ReportReader(file_path, chunk_size=chunk_size, on_chunk=progress) as reader:
+                    reports.append(self.parse_report(reader))
+            return self.merge_reports(reports)
+
+        # reseed so that forked workers do not generate the same passwords
+        with ProcessPoolExecutor(max_workers=workers, initializer=random.seed) as executor:
+            reports = []
+            parsed = executor.map(parse_report_file, file_paths, [chunk_size] * len(file_paths))
+            for file_path, report in zip(file_paths, parsed):
+                self.stdout.write(f"Parsed {file_path}: {report['rows']:,} rows")
+                reports.append(report)
+
+        return self.merge_reports(reports)
+
+    @staticmethod
+    def merge_reports(reports):
+        """
+        Merge parsed reports. Like a sequential import, the first report that
+        mentions a department, user, course or section wins.
+        """
+        merged = {'rows': 0, 'departments': {}, 'users': {}, 'courses': {}, 'sections': {}, 'registrations': {}}
+        for report in reports:
+            merged['rows'] += report['rows']
+            for key in ('departments', 'users', 'courses', 'sections', 'registrations'):
+                for item, value in report[key].items():
+                    merged[key].setdefault(item, value)
+        return merged
+
+    def import_rows(self, reader, writer):
+        """The original row by row import, one set of get_or_create queries per row."""
+        for row in reader:
+
+            # load or create the department
+            department_name = row['Department Name']
+            department, _ = Department.objects.get_or_create(name=department_name)
+
+            # load or create student
+            student_id = row['Student No']
+            student_name = row['Student Name']
+            student_fn, student_mn, student_ln = self.clean_omani_name(student_name)
+            student_email = f"{student_id}@utas.edu.om"
+            student_password = self.generate_password()
+
+            # check if student exists
+            student, created_student = Student.objects.get_or_create(
+                username=student_id,
+                defaults={
+                    'first_name': student_fn,
+                    'middle_name': student_mn,
+                    'last_name': student_ln,
+                    'email': student_email,
+                    'user_type': Student.STUDENT,
+                    'department': department
+                }
+            )
+
+            # add to the log and set the password
+            if created_student:
+                student.password = hash_password(student_password, self.hasher)
+                student.save()
+                # 'username', 'password', 'user_type', 'department'
+                writer.writerow({'username': student.username, 'password': student_password, 
+                                 'user_type': 'Student', 'department': department_name})
+            
+
+            # course department for both lecturer and course
+            course_department = row['Department Courses']
+            department, _ = Department.objects.get_or_create(name=course_department)
+            
+            # load or create lecturer
+            lecturer_entry = row['Lecturer Name']
+            lecturer_data = self.clean_lecturer_name(lecturer_entry)
+            lecturer_password = self.generate_password()
+
+            # check if lecturer exists
+            lecturer, created_lecturer = Lecturer.objects.get_or_create(
+                username = lecturer_data['username'],
+                defaults={
+                    'prefix': lecturer_data['prefix'],
+                    'first_name': lecturer_data['first_name'],
+                    'middle_name': lecturer_data['middle_name'],
+                    'last_name': lecturer_data['last_name'],
+                    'department': department,
+                    'user_type': Lecturer.ACADEMIC_STAFF
+                }
+            )
+
+            if created_lecturer:
+                lecturer.password = hash_password(lecturer_password, self.hasher)
+                lecturer.save()
+                writer.writerow({'username': lecturer.username, 'password': lecturer_password, 
+                                 'user_type': 'Lecturer', 'department': course_department})
+            
+            # load or create course
+            course_id = row['Course No']
+            course_name = row['Course Name']
+
+            course, _ = Course.objects.get_or_create(
+                code = course_id,
+                defaults={
+                    'name': course_name,
+                    'department': department
+                }
+            )
+
+            # load or create section
+            section_no = int(row['Section No'].strip())
+            section, _ = Section.objects.get_or_create(
+                course=course, 
+                number=section_no,
+                defaults={'lecturer': lecturer}
+            )
+
+            # register the student in the section (the signals update the section's student count)
+            CourseRegistration.objects.get_or_create(student=student, section=section)
+
+            # Provide per row feedback only when asked for, progress is reported per chunk
+            if self.verbosity > 1:
+                self.stdout.write(f"Processed: Student {student.username}, Lecturer {lecturer.username}, Course {course.name}")
+
+    def import_bulk(self, report, writer):
+        """
+        Set-based import: the parsed report (see parse_report) is written with a
+        handful of bulk queries inside one transaction.
+        Produces the same rows and log entries as the row-by-row path.
+        """
+
+        with transaction.atomic():
+            departments = self.bulk_departments(report['departments'])
+            users, created = self.bulk_users(report['users'], departments)
+            courses = self.bulk_courses(report['courses'], departments)
+            self.bulk_sections(report['sections'], courses, users)
+            registrations_diff = self.sync_registrations(report['registrations'], courses, users)
+
+        for username, user_data in report['users'].items():
+            if username in created:
+                writer.writerow({'username': username, 'password': user_data['password'],
+                                 'user_type': user_data['kind'], 'department': user_data['department']})
+
+        self.stdout.write(
+            f"Processed {report['rows']} rows: {len(created)} new users, "
+            f"{len(report['courses'])} courses, {len(report['sections'])} sections, "
+            f"{registrations_diff['added']} registrations"
+        )
+
+    def import_delta(self, report, writer):
+        """
+        Incremental import: the parsed rows are matched to the existing records by
+        their natural keys (username, course code and (course, section number)).
+        Only new records are inserted, changed ones updated and the ones that
+        disappeared from the report(s) retired. Only the users and courses of the
+        departments whose courses the reports list are retired, so the report of
+        one department leaves the others alone. Existing users keep their passwords.
+        """
+
+        with transaction.atomic():
+            departments = self.bulk_departments(report['departments'])
+            users, created = self.bulk_users(report['users'], departments)
+            updated_users = self.update_users(report['users'], users, created, departments)
+            # the departments whose courses the reports list, one report per department
+            reported = list({departments[course['department']].pk for course in report['courses'].values()})
+            retired_users = self.retire_users(report['users'], reported)
+
+            known_courses = Course.objects.filter(code__in=list(report['courses'])).count()
+            courses = self.bulk_courses(report['courses'], departments)
+            added_courses = len(courses) - known_courses
+            updated_courses = self.update_courses(report['courses'], courses, departments)
+            sections_diff = self.sync_sections(report['sections'], courses, users)
+            registrations_diff = self.sync_registrations(report['registrations'], courses, users,
+                                                         remove_stale=True)
+            retired_courses = self.retire_courses(report['courses'], reported)
+
+        for username, user_data in report['users'].items():
+            if username in created:
+                writer.writerow({'username': username, 'password': user_data['password'],
+                                 'user_type': user_data['kind'], 'department': user_data['department']})
+
+        self.stdout.write(f"Processed {report['rows']} rows")
+        self.stdout.write(f"Users:    {len(created)} added, {updated_users} updated, {retired_users} retired")
+        self.stdout.write(f"Courses:  {added_courses} added, {updated_courses} updated, {retired_courses} removed")
+        self.stdout.write("Sections: {added} added, {updated} updated, {removed} removed".format(**sections_diff))
+        self.stdout.write("Registrations: {added} added, {removed} removed".format(**registrations_diff))
+
+    @staticmethod
+    def update_users(users_data, users, created, departments):
+        """Update the existing users whose report data changed. Returns the update count."""
+        changed = []
+        for username, user_data in users_data.items():
+            if username in created:
+                continue
+
+            user = users[username]
+            values = dict(user_data['fields'], department_id=departments[user_data['department']].pk,
+                          is_active=True)
+            if any(getattr(user, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(user, field, value)
+                user.update_name_fields()
+                changed.append(user)
+
+        if changed:
+            fields = sorted({field for data in users_data.values() for field in data['fields']})
+            fields += ['department', 'is_active', *User.NAME_FIELDS]
+            User.objects.bulk_update(changed, fields, batch_size=500)
+            # bulk_update sends no signals, drop the cached display names by hand
+            displaynames.invalidate([user.username for user in changed])
+
+        return len(changed)
+
+    @staticmethod
+    def retire_users(users_data, department_ids):
+        """Deactivate the imported students and lecturers of the departments that are not in the report anymore."""
+        return (User.objects
+                .filter(user_type__in=[User.STUDENT, User.ACADEMIC_STAFF], is_active=True,
+                        is_staff=False, is_superuser=False, department_id__in=department_ids)
+                .exclude(username__in=list(users_data))
+                .update(is_active=False))
+
+    @staticmethod
+    def update_courses(courses_data, courses, departments):
+        """Update the existing courses whose name or department changed. Returns the update count."""
+        changed = []
+        for code, course_data in courses_data.items():
+            course = courses[code]
+            department = departments[course_data['department']]
+            if course.name != course_data['name'] or course.department_id != department.pk:
+                course.name = course_data['name']
+                course.department = department
+                changed.append(course)
+
+        if changed:
+            Course.objects.bulk_update(changed, ['name', 'department'], batch_size=500)
+
+        return len(changed)
+
+    @staticmethod
+    def retire_courses(courses_data, department_ids):
+        """Remove the courses (and their sections) of the departments that are not in the report anymore."""
+        stale = Course.objects.filter(department_id__in=department_ids).exclude(code__in=list(courses_data))
+        count = stale.count()
+        stale.delete()
+        return count
+
+    @staticmethod
+    def sync_sections(sections_data, courses, users):
+        """
+        Bring the sections of the reported courses in line with the report.
+        Returns the number of added, updated and removed sections.
+        """
+        wanted = {
+            (courses[code].pk, number): users[lecturer_id].pk
+            for (code, number), lecturer_id in sections_data.items()
+        }
+        existing = Section.objects.filter(course_id__in=[course.pk for course in courses.values()])
+
+        changed, stale = [], []
+        for section in existing:
+            key = (section.course_id, section.number)
+            if key not in wanted:
+                stale.append(section.pk)
+                continue
+
+            lecturer_pk = wanted.pop(key)
+            if section.lecturer_id != lecturer_pk:
+                section.lecturer_id = lecturer_pk
+                changed.append(section)
+
+        # whatever is left in wanted does not exist yet
+        Section.objects.bulk_create(
+            [Section(course_id=course_pk, number=number, lecturer_id=lecturer_pk)
+             for (course_pk, number), lecturer_pk in wanted.items()],
+            batch_size=500
+        )
+        if changed:
+            Section.objects.bulk_update(changed, ['lecturer'], batch_size=500)
+        if stale:
+            Section.objects.filter(pk__in=stale).delete()
+
+        return {'added': len(wanted), 'updated': len(changed), 'removed': len(stale)}
+
+    @classmethod
+    def parse_report(cls, reader):
+        """
+        Reduce the report rows to unique departments, users, courses and sections.
+        The first row that mentions a key wins, exactly like get_or_create.
+        """
+        report = {'rows': 0, 'departments': {}, 'users': {}, 'courses': {}, 'sections': {}, 'registrations': {}}
+
+        for row in reader:
+            report['rows'] += 1
+
+            # both department columns are loaded in the order they are met
+            department_name = row['Department Name']
+            course_department = row['Department Courses']
+            report['departments'].setdefault(department_name, None)
+            report['departments'].setdefault(course_department, None)
+
+            # student (usernames are shared between students and lecturers)
+            student_id = row['Student No']
+            if student_id not in report['users']:
+                student_fn, student_mn, student_ln = cls.clean_omani_name(row['Student Name'])
+                report['users'][student_id] = {
+                    'kind': 'Student',
+                    'department': department_name,
+                    'password': cls.generate_password(),
+                    'fields': {
+                        'first_name': student_fn,
+                        'middle_name': student_mn,
+                        'last_name': student_ln,
+                        'email': f"{student_id}@utas.edu.om",
+                        'user_type': User.STUDENT,
+                    },
+                }
+
+            # lecturer
+            lecturer_data = cls.clean_lecturer_name(row['Lecturer Name'])
+            lecturer_id = lecturer_data['username']
+            if lecturer_id not in report['users']:
+                report['users'][lecturer_id] = {
+                    'kind': 'Lecturer',
+                    'department': course_department,
+                    'password': cls.generate_password(),
+                    'fields': {
+                        'prefix': lecturer_data['prefix'],
+                        'first_name': lecturer_data['first_name'],
+                        'middle_name': lecturer_data['middle_name'],
+                        'last_name': lecturer_data['last_name'],
+                        'user_type': User.ACADEMIC_STAFF,
+                        'is_lecturer': True,
+                        'is_invigilator': True,
+                    },
+                }
+
+            # course and section
+            course_id = row['Course No']
+            report['courses'].setdefault(course_id, {
+                'name': row['Course Name'],
+                'department': course_department,
+            })
+
+            section_no = int(row['Section No'].strip())
+            report['sections'].setdefault((course_id, section_no), lecturer_id)
+
+            # every row registers its student in the section (a dict keeps the order)
+            report['registrations'].setdefault((student_id, course_id, section_no), None)
+
+        return report
+
+    @staticmethod
+    def bulk_departments(names):
+        """Return a name -> Department map, creating the missing ones."""
+        departments = {}
+        for department in Department.objects.filter(name__in=names).order_by('pk'):
+            departments.setdefault(department.name, department)
+
+        missing = [Department(name=name) for name in names if name not in departments]
+        if missing:
+            Department.objects.bulk_create(missing)
+            for department in Department.objects.filter(name__in=[d.name for d in missing]).order_by('pk'):
+                departments.setdefault(department.name, department)
+
+        return departments
+
+    def hash_passwords(self, passwords):
+        """
+        Hash the passwords with the selected hasher. Large batches are spread
+        over a process pool since PBKDF2 is CPU bound.
+        """
+        workers = min(self.workers, len(passwords) // 50 or 1)
+
+        if workers <= 1:
+            return [hash_password(password, self.hasher) for password in passwords]
+
+        chunksize = -(-len(passwords) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(partial(hash_password, hasher=self.hasher), passwords, chunksize=chunksize))
+
+    def bulk_users(self, users, departments):
+        """
+        Create the users that do not exist yet. Returns a username -> User map
+        and the set of usernames that were created.
+        """
+        existing = User.objects.in_bulk(list(users), field_name='username')
+
+        new_usernames = [username for username in users if username not in existing]
+        hashes = self.hash_passwords([users[username]['password'] for username in new_usernames])
+
+        new_users = []
+        for username, password in zip(new_usernames, hashes):
+            user_data = users[username]
+            user = User(
+                username=username,
+                password=password,
+                department=departments[user_data['department']],
+                **user_data['fields']
+            )
+            # bulk_create does not call save()
+            user.update_name_fields()
+            new_users.append(user)
+
+        User.objects.bulk_create(new_users, batch_size=500)
+
+        created = {user.username for user in new_users}
+        return User.objects.in_bulk(list(users), field_name='username'), created
+
+    @staticmethod
+    def bulk_courses(courses, departments):
+        """Return a code -> Course map, creating the missing ones."""
+        result = Course.objects.in_bulk(list(courses), field_name='code')
+
+        new_courses = [
+            Course(code=code, name=course_data['name'], department=departments[course_data['department']])
+            for code, course_data in courses.items() if code not in result
+        ]
+        if new_courses:
+            Course.objects.bulk_create(new_courses, batch_size=500)
+            result.update(Course.objects.in_bulk([course.code for course in new_courses], field_name='code'))
+
+        return result
+
+    @staticmethod
+    def bulk_sections(sections, courses, users):
+        """Create the (course, number) sections that do not exist yet."""
+        course_ids = [course.pk for course in courses.values()]
+        existing = set(Section.objects.filter(course_id__in=course_ids).values_list('course_id', 'number'))
+
+        new_sections = []
+        for (code, number), lecturer_id in sections.items():
+            course = courses[code]
+            if (course.pk, number) in existing:
+                continue
+            new_sections.append(Section(course=course, number=number, lecturer_id=users[lecturer_id].pk))
+
+        Section.objects.bulk_create(new_sections, batch_size=500)
+
+    @staticmethod
+    def sync_registrations(registrations, courses, users, remove_stale=False):
+        """
+        Create the missing (student, section) registrations of the report and, with
+        remove_stale, delete the registrations of the reported courses that are no
+        longer in it. The student counts of the touched sections are recounted.
+        """
+        sections = {
+            (course_id, number): pk
+            for pk, course_id, number in Section.objects
+            .filter(course_id__in=[course.pk for course in courses.values()])
+            .values_list('pk', 'course_id', 'number')
+        }
+        existing = {
+            (student_id, section_id): pk
+            for pk, student_id, section_id in CourseRegistration.objects
+            .filter(section_id__in=list(sections.values()))
+            .values_list('pk', 'student_id', 'section_id')
+        }
+
+        wanted = {
+            (users[student_id].pk, sections[(courses[code].pk, number)]): None
+            for student_id, code, number in registrations
+        }
+        new_registrations = [
+            CourseRegistration(student_id=student_pk, section_id=section_pk)
+            for student_pk, section_pk in wanted if (student_pk, section_pk) not in existing
+        ]
+        CourseRegistration.objects.bulk_create(new_registrations, batch_size=1000)
+
+        stale = {key: pk for key, pk in existing.items() if key not in wanted} if remove_stale else {}
+        if stale:
+            CourseRegistration.objects.filter(pk__in=list(stale.values())).delete()
+
+        # bulk_create sends no signals, recount the sections that changed
+        touched = {registration.section_id for registration in new_registrations}
+        touched.update(section_pk for _, section_pk in stale)
+        if touched:
+            Section.refresh_student_counts(touched)
+
+        return {'added': len(new_registrations), 'removed': len(stale)}
 
     def format_lecturer_info(user_info):
         """
@@ -150,88 +643,8 @@ class Command(BaseCommand):
     
     @staticmethod
     def clean_lecturer_name(lecturer_entry):
-        # Split the entry by ' - ' to separate ID and Name
-        try:
-            user_id, name = lecturer_entry.split(' - ', 1)
-        except ValueError:
-            raise ValueError("The entry is not in the expected format: 'ID - Name'")
-
-        # Set the username from the ID
-        username = user_id.strip()
-
-        # Define possible prefixes with optional trailing period and no space requirement afterward
-        prefix_pattern = r'^(Mr\.?|Ms\.?|Mrs\.?|Dr\.?|Prof\.?)'
-        prefix = None
-
-        # Use regex to detect and remove prefix from the name
-        match = re.match(prefix_pattern, name, re.IGNORECASE)
-        if match:
-            # Extract and clean the prefix
-            prefix = match.group(0).replace('.', '').strip()
-            # Remove the prefix from the name
-            name = name[match.end():].strip()
-
-        # Split the remaining name into parts and capitalize each part
-        name_parts = name.split()
-        name_parts = [part.capitalize() for part in name_parts]
-
-        # Assign first, middle, and last names
-        first_name = name_parts[0] if name_parts else ""
-        last_name = name_parts[-1] if len(name_parts) > 1 else ""
-        middle_name = " ".join(name_parts[1:-1]) if len(name_parts) > 2 else ""
-
-        # Return the cleaned data as a dictionary for easy insertion
-        return {
-            "username": username,
-            "prefix": prefix,
-            "first_name": first_name,
-            "middle_name": middle_name,
-            "last_name": last_name
-        }
-    
+        return names.clean_lecturer_name(lecturer_entry)
+
     @staticmethod
     def clean_omani_name(full_name):
-        # Step 1: Replace hyphen with space
-        cleaned_name = full_name.replace('-', ' ')
-
-        # Step 2: Move 'Al' to the beginning of the next word
-        words = cleaned_name.split()
-        cleaned_words = []
-        skip_next = False
-
-        for i in range(len(words)):
-            if skip_next:
-                skip_next = False
-                continue
-
-            if words[i].lower() == 'al' and i < len(words) - 1:
-                # Prepend 'Al' to the next word without capitalizing yet
-                cleaned_words.append(f"Al{words[i + 1]}")
-                skip_next = True
-            else:
-                cleaned_words.append(words[i])
-        
-        # Step 3: Join the cleaned words back into a string
-        cleaned_name = ' '.join(cleaned_words)
-
-        # Step 4: Capitalize the entire cleaned name at once
-        cleaned_name = cleaned_name.title()
-
-        # Step 5: Extract first name, middle name, and last name
-        name_parts = cleaned_name.split()
-
-        # First name is the first part
-        first_name = name_parts[0]
-
-        # Middle name is everything between the first and last parts (if present)
-        if len(name_parts) > 2:
-            middle_name = ' '.join(name_parts[1:-1])
-        else:
-            middle_name = ''
-        
-        # Last name is the last part
-        last_name = name_parts[-1] if len(name_parts) > 1 else ''
-
-        return first_name, middle_name, last_name
-
-
+        return names.clean_omani_name(full_name)
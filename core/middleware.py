@@ -0,0 +1,18 @@
+from core import displaynames
+
+
+class DisplayNameCacheMiddleware:
+    """
+    Gives every request its own display name cache, so a name is looked up
+    at most once per request whatever the number of templates using it.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = displaynames.start_request()
+        try:
+            return self.get_response(request)
+        finally:
+            displaynames.end_request(token)
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:56
+
+from django.db import migrations, models
+from core.names import fold_name
+
+
+def fill_name_fields(apps, schema_editor):
+    # same computation as User.update_name_fields, the historical model has no methods
+    User = apps.get_model('core', 'User')
+
+    users = []
+    for user in User.objects.only('prefix', 'first_name', 'middle_name', 'last_name').iterator(chunk_size=2000):
+        parts = [part for part in (user.prefix, user.first_name, user.middle_name, user.last_name) if part]
+        user.display_name = ' '.join(parts)
+        user.search_key = fold_name(' '.join(parts[1:] if user.prefix else parts))
+        users.append(user)
+
+    User.objects.bulk_update(users, ['display_name', 'search_key'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_room_alter_department_email_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='display_name',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=500, verbose_name='Display Name'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='search_key',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, help_text='Folded name used by the name searches', max_length=500),
+        ),
+        migrations.RunPython(fill_name_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:57
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_user_display_name_user_search_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='course',
+            name='code',
+            field=models.CharField(max_length=15, unique=True, validators=[django.core.validators.MinLengthValidator(2)]),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['user_type', 'username'], name='user_type_username_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_lecturer', 'department'], name='user_lecturer_dept_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_invigilator', 'department'], name='user_invigilator_dept_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='section',
+            constraint=models.UniqueConstraint(fields=('course', 'number'), name='unique_section_course_number'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_alter_course_code_user_user_type_username_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='section',
+            name='student_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='CourseRegistration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='registrations', to='core.section')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='registrations', to='core.student')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='section',
+            name='students',
+            field=models.ManyToManyField(blank=True, related_name='sections', through='core.CourseRegistration', to='core.student'),
+        ),
+        migrations.AddConstraint(
+            model_name='courseregistration',
+            constraint=models.UniqueConstraint(fields=('student', 'section'), name='unique_registration_student_section'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_section_student_count_courseregistration_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='exam_room_type',
+            field=models.PositiveIntegerField(blank=True, choices=[(10, 'Classroom'), (20, 'Computer Lab'), (30, 'Physics Lab'), (40, 'Chemistry Lab'), (50, 'CAD Workshop'), (60, 'Lecture Hall')], help_text='Room type the exam must be sat in (e.g. a computer lab for practical exams), blank for a classroom or lecture hall', null=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_course_exam_room_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheGeneration',
+            fields=[
+                ('namespace', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('generation', models.PositiveBigIntegerField()),
+                ('modified', models.DateTimeField()),
+            ],
+        ),
+    ]
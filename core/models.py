@@ -1,6 +1,9 @@
+from collections import defaultdict
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.core.validators import MinLengthValidator, MinValueValidator, MaxValueValidator
+from core import caching
+from core.names import fold_name
 
 
 class Department(models.Model):
@@ -101,6 +104,12 @@ class User(AbstractUser):
     # Department foreign key
     department = models.ForeignKey('Department', on_delete=models.SET_NULL, null=True, blank=True)
 
+    # Denormalized name fields, maintained by save() (see update_name_fields)
+    display_name = models.CharField(max_length=500, blank=True, default='', db_index=True, editable=False,
+                                    verbose_name="Display Name")
+    search_key = models.CharField(max_length=500, blank=True, default='', db_index=True, editable=False,
+                                  help_text='Folded name used by the name searches')
+
     # Lecturer-specific fields
     is_lecturer = models.BooleanField(default=False)
     is_invigilator = models.BooleanField(default=False)
@@ -111,23 +120,40 @@ class User(AbstractUser):
     can_approve_absence_excuses = models.BooleanField(default=False)
     can_view_all_statistics = models.BooleanField(default=False)
 
-    def __str__(self):
-        # Construct the display name with prefix, first name, last name, and username (if available)
-        parts = []
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Lecturer/Student admins and the FK dropdowns filter on user_type, ordered by username
+            models.Index(fields=['user_type', 'username'], name='user_type_username_idx'),
+            # lecturers and invigilators of a department
+            models.Index(fields=['is_lecturer', 'department'], name='user_lecturer_dept_idx'),
+            models.Index(fields=['is_invigilator', 'department'], name='user_invigilator_dept_idx'),
+        ]
+
+    NAME_FIELDS = ('display_name', 'search_key')
+
+    def update_name_fields(self):
+        """
+        Recompute the stored display name and search key from the name parts.
+        Called by save(); bulk_create/bulk_update callers have to call it themselves.
+        """
+        parts = [part for part in (self.prefix, self.first_name, self.middle_name, self.last_name) if part]
+        self.display_name = ' '.join(parts)
+        self.search_key = fold_name(' '.join(parts[1:] if self.prefix else parts))
 
-        if self.prefix:
-            parts.append(self.prefix)
-        if self.first_name:
-            parts.append(self.first_name)
-        if self.last_name:
-            parts.append(self.last_name)
+    def save(self, *args, **kwargs):
+        self.update_name_fields()
+
+        # keep the stored names in sync when only some fields are saved
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'prefix', 'first_name', 'middle_name', 'last_name'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | set(self.NAME_FIELDS)
 
-        # Join the available parts with spaces
-        display_name = ' '.join(parts)
+        super().save(*args, **kwargs)
 
+    def __str__(self):
         # If no meaningful name parts are available, just return the username
-        if display_name:
-            return f"{display_name} ({self.username})"
+        if self.display_name:
+            return f"{self.display_name} ({self.username})"
         else:
             return self.username
 
@@ -146,16 +172,44 @@ class Lecturer(User):
         super(Lecturer, self).save(*args, **kwargs)
     
     def get_lecturer_schedule(self):
-        # Logic to fetch and return the lecturer's teaching schedule
-        # Example: Return all exams where the lecturer is involved as a course instructor
-        pass
-        # return Exam.objects.filter(course__lecturer=self)
+        """
+        Exams of the sections the lecturer teaches, in chronological order,
+        with their room, section and course. One query, the list is cached
+        until the timetable changes (see core.caching).
+        """
+        from schedule.models import ExamSchedule
+
+        return caching.get_or_set(caching.SCHEDULES, ('lecturer', self.pk), lambda: list(
+            ExamSchedule.objects.filter(section__lecturer=self.pk)
+            .select_related('room', 'section__course__department')
+        ))
 
     def get_invigilator_schedule(self):
-        # Logic to fetch and return the invigilator schedule
-        # Example: Return all exams where the lecturer is an invigilator
-        pass
-        # return Exam.objects.filter(invigilator=self)
+        """
+        The rooms and slots the lecturer invigilates, in chronological order,
+        each with the exams sat there as `exams`. Two queries, the list is
+        cached until the timetable changes.
+        """
+        from schedule.models import ExamSchedule
+
+        def invigilations():
+            duties = list(self.invigilations.select_related('room'))
+            if not duties:
+                return duties
+
+            # the exams of all the rooms at once, matched to the slots here
+            exams = defaultdict(list)
+            for exam in (ExamSchedule.objects
+                         .filter(room__in={duty.room_id for duty in duties},
+                                 exam_date__in={duty.exam_date for duty in duties})
+                         .select_related('section__course')):
+                exams[(exam.room_id, exam.exam_date, exam.exam_time)].append(exam)
+
+            for duty in duties:
+                duty.exams = exams[(duty.room_id, duty.exam_date, duty.exam_time)]
+            return duties
+
+        return caching.get_or_set(caching.SCHEDULES, ('invigilator', self.pk), invigilations)
 
 class Student(User):
     class Meta:
@@ -168,31 +222,6 @@ class Student(User):
         self.user_type = User.STUDENT
         super(Student, self).save(*args, **kwargs)
 
-class Course(models.Model):
-    code = models.CharField(max_length=15,
-                            validators=[MinLengthValidator(2)])
-    name = models.CharField(max_length=255, 
-                            validators=[MinLengthValidator(2)])
-    coordinator = models.ForeignKey('Lecturer', on_delete=models.SET_NULL, null=True, blank=True)
-    department  = models.ForeignKey('Department', on_delete=models.CASCADE)
-
-
-    def __str__(self):
-        # Return a string combining the course code and name
-        return f"{self.code} - {self.name}"
-
-class Section(models.Model):
-    number = models.PositiveIntegerField(
-        validators=[MinValueValidator(1), MaxValueValidator(200)],
-        help_text='Section or group number for the course '
-    )
-    course = models.ForeignKey('Course', on_delete=models.CASCADE)
-    lecturer = models.ForeignKey('Lecturer', on_delete=models.SET_NULL, null=True)
-
-    def __str__(self):
-        # Return a string combining course info and section number
-        return f"{self.course.code} - {self.course.name} <S{self.number}>"
-
 class Room(models.Model):
     # Room types
     CLASS_ROOM = 10
@@ -211,6 +240,9 @@ class Room(models.Model):
         (LECTURE_HALL, 'Lecture Hall'),
     ]
 
+    # Rooms any written exam can be sat in
+    EXAM_HALL_TYPES = (CLASS_ROOM, LECTURE_HALL)
+
     # Campuses
     SA = 'SA'
     AK = 'AK'
@@ -244,6 +276,94 @@ class Room(models.Model):
         campus_name = dict(self.CAMPUS_CHOICES).get(self.campus, 'Unknown Campus')
         return f"{self.label} ({campus_name})"
 
+
+class Course(models.Model):
+    code = models.CharField(max_length=15, unique=True,
+                            validators=[MinLengthValidator(2)])
+    name = models.CharField(max_length=255, 
+                            validators=[MinLengthValidator(2)])
+    coordinator = models.ForeignKey('Lecturer', on_delete=models.SET_NULL, null=True, blank=True)
+    department  = models.ForeignKey('Department', on_delete=models.CASCADE)
+    exam_room_type = models.PositiveIntegerField(
+        choices=Room.ROOM_TYPE_CHOICES, null=True, blank=True,
+        help_text='Room type the exam must be sat in (e.g. a computer lab for practical exams), '
+                  'blank for a classroom or lecture hall'
+    )
+
+
+    def __str__(self):
+        # Return a string combining the course code and name
+        return f"{self.code} - {self.name}"
+
+class Section(models.Model):
+    number = models.PositiveIntegerField(
+        validators=[MinValueValidator(1), MaxValueValidator(200)],
+        help_text='Section or group number for the course '
+    )
+    course = models.ForeignKey('Course', on_delete=models.CASCADE)
+    lecturer = models.ForeignKey('Lecturer', on_delete=models.SET_NULL, null=True)
+    students = models.ManyToManyField('Student', through='CourseRegistration', related_name='sections', blank=True)
+
+    # Number of registered students, kept up to date by the CourseRegistration
+    # signals and recounted by the bulk import (see refresh_student_counts)
+    student_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        # a course has one section per number, the importer matches sections on this pair
+        constraints = [
+            models.UniqueConstraint(fields=['course', 'number'], name='unique_section_course_number')
+        ]
+
+    def __str__(self):
+        # Return a string combining course info and section number
+        return f"{self.course.code} - {self.course.name} <S{self.number}>"
+
+    @staticmethod
+    def refresh_student_counts(section_ids=None):
+        """Recount student_count with one grouped query, for all or the given sections."""
+        sections = Section.objects.all() if section_ids is None else Section.objects.filter(pk__in=section_ids)
+        counts = dict(CourseRegistration.objects.filter(section__in=sections)
+                      .values_list('section').annotate(models.Count('pk')))
+
+        changed = []
+        for section in sections.only('pk', 'student_count'):
+            count = counts.get(section.pk, 0)
+            if section.student_count != count:
+                section.student_count = count
+                changed.append(section)
+
+        Section.objects.bulk_update(changed, ['student_count'], batch_size=500)
+        return len(changed)
+
+
+class CourseRegistration(models.Model):
+    student = models.ForeignKey('Student', on_delete=models.CASCADE, related_name='registrations')
+    section = models.ForeignKey('Section', on_delete=models.CASCADE, related_name='registrations')
+
+    class Meta:
+        # a student registers once per section; the index also serves the per-student lookups
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'section'], name='unique_registration_student_section')
+        ]
+
+    def __str__(self):
+        return f"{self.student.username} in {self.section}"
+
+
+class CacheGeneration(models.Model):
+    """
+    Generation counter of a cache namespace (see core.caching). It lives in
+    the database so that every process, web worker or management command,
+    sees the same generation whatever the cache backend.
+    """
+    namespace = models.CharField(max_length=50, primary_key=True)
+    generation = models.PositiveBigIntegerField()
+    modified = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.namespace} {self.generation}"
+
+
    
 
 
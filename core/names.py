@@ -0,0 +1,124 @@
+import re
+from functools import lru_cache
+
+# Name normalization used by the report importer (loadusers) and any bulk
+# editing tool. The same raw strings repeat on hundreds of report rows, so
+# results are cached on the raw string.
+
+CACHE_SIZE = 65536
+
+# Possible prefixes with optional trailing period and no space requirement afterward
+PREFIX_RE = re.compile(r'^(Mr\.?|Ms\.?|Mrs\.?|Dr\.?|Prof\.?)', re.IGNORECASE)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _clean_lecturer_name(lecturer_entry):
+    # Split the entry by ' - ' to separate ID and Name
+    try:
+        user_id, name = lecturer_entry.split(' - ', 1)
+    except ValueError:
+        raise ValueError("The entry is not in the expected format: 'ID - Name'")
+
+    # Set the username from the ID
+    username = user_id.strip()
+
+    # Use regex to detect and remove prefix from the name
+    prefix = None
+    match = PREFIX_RE.match(name)
+    if match:
+        # Extract and clean the prefix
+        prefix = match.group(0).replace('.', '').strip()
+        # Remove the prefix from the name
+        name = name[match.end():].strip()
+
+    # Split the remaining name into parts and capitalize each part
+    name_parts = [part.capitalize() for part in name.split()]
+
+    # Assign first, middle, and last names
+    first_name = name_parts[0] if name_parts else ""
+    last_name = name_parts[-1] if len(name_parts) > 1 else ""
+    middle_name = " ".join(name_parts[1:-1]) if len(name_parts) > 2 else ""
+
+    return (username, prefix, first_name, middle_name, last_name)
+
+
+def clean_lecturer_name(lecturer_entry):
+    """
+    Split a report entry like '2497 - Dr. John Smith' into a dict with the
+    username, prefix, first, middle and last name.
+    """
+    username, prefix, first_name, middle_name, last_name = _clean_lecturer_name(lecturer_entry)
+
+    # a new dict every time, the cached tuple must not be mutated by callers
+    return {
+        "username": username,
+        "prefix": prefix,
+        "first_name": first_name,
+        "middle_name": middle_name,
+        "last_name": last_name
+    }
+
+
+def _join_al(words):
+    """Join every standalone 'Al' (any case) to the word after it: ['Al', 'Balushi'] gives ['AlBalushi']."""
+    joined = []
+    skip_next = False
+    for i, word in enumerate(words):
+        if skip_next:
+            skip_next = False
+            continue
+
+        if word.lower() == 'al' and i < len(words) - 1:
+            # Prepend 'Al' to the next word without capitalizing yet
+            joined.append(f"{word}{words[i + 1]}")
+            skip_next = True
+        else:
+            joined.append(word)
+
+    return joined
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def clean_omani_name(full_name):
+    """
+    Split a student name into (first, middle, last) name. Hyphens become
+    spaces and a standalone 'Al' is joined to the following word, so
+    'Ahmed Al-Balushi' gives ('Ahmed', '', 'Albalushi').
+    """
+    # Replace hyphen with space, and move 'Al' to the beginning of the next word
+    cleaned_words = _join_al(full_name.replace('-', ' ').split())
+
+    # Capitalize the entire cleaned name at once and split it again
+    name_parts = ' '.join(cleaned_words).title().split()
+
+    first_name = name_parts[0]
+    middle_name = ' '.join(name_parts[1:-1]) if len(name_parts) > 2 else ''
+    last_name = name_parts[-1] if len(name_parts) > 1 else ''
+
+    return first_name, middle_name, last_name
+
+
+def fold_name(name):
+    """
+    Search key of a name: lower case, hyphens as spaces and a standalone 'Al'
+    joined to the next word like clean_omani_name does, so 'Al Balushi',
+    'Al-Balushi' and 'AlBalushi' all give 'albalushi'.
+    """
+    return ' '.join(_join_al((name or '').replace('-', ' ').lower().split()))
+
+
+def clean_omani_names(column):
+    """Normalize a whole column of student names, each distinct value once."""
+    cleaned = {name: clean_omani_name(name) for name in set(column)}
+    return [cleaned[name] for name in column]
+
+
+def clean_lecturer_names(column):
+    """Normalize a whole column of lecturer entries, each distinct value once."""
+    cleaned = {entry: clean_lecturer_name(entry) for entry in set(column)}
+    return [dict(cleaned[entry]) for entry in column]
+
+
+def cache_clear():
+    _clean_lecturer_name.cache_clear()
+    clean_omani_name.cache_clear()
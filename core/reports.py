@@ -0,0 +1,159 @@
+import csv
+import gzip
+import io
+import os
+import time
+from datetime import timedelta
+from itertools import islice
+
+# Columns of the Examination List Report that the importer relies on
+REPORT_COLUMNS = (
+    'Department Name',
+    'Student No',
+    'Student Name',
+    'Department Courses',
+    'Lecturer Name',
+    'Course No',
+    'Course Name',
+    'Section No',
+)
+
+
+class ReportError(ValueError):
+    """Raised when a report file does not have the expected layout."""
+
+
+class ReportReader:
+    """
+    Streams the rows of an Examination List Report in fixed-size chunks.
+
+    Plain and gzip compressed (.gz) CSV files are supported. The header is
+    validated once and every row is returned as a dict holding only the
+    REPORT_COLUMNS, so memory use does not depend on the size of the file.
+
+        with ReportReader('report.csv.gz', chunk_size=1000) as reader:
+            for row in reader:
+                ...
+    """
+
+    def __init__(self, file_path, chunk_size=1000, on_chunk=None):
+        self.file_path = str(file_path)
+        self.chunk_size = max(int(chunk_size), 1)
+        self.on_chunk = on_chunk  # called with (rows_read, fraction_read) after every chunk
+        self.rows_read = 0
+        self._raw = None
+        self._text = None
+        self._records = None
+        self._columns = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def open(self):
+        self._raw = open(self.file_path, 'rb')
+        if self.is_gzip():
+            stream = gzip.GzipFile(fileobj=self._raw, mode='rb')
+        else:
+            stream = self._raw
+        self._text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        self._records = csv.reader(self._text)
+        self._columns = self.validate_header(next(self._records, None))
+
+    def close(self):
+        if self._text is not None:
+            self._text.close()
+        if self._raw is not None and not self._raw.closed:
+            self._raw.close()
+
+    def is_gzip(self):
+        # check the magic number rather than trusting the file extension
+        magic = self._raw.read(2)
+        self._raw.seek(0)
+        return magic == b'\x1f\x8b'
+
+    def validate_header(self, header):
+        if not header:
+            raise ReportError(f"{self.file_path} is empty")
+
+        header = [column.strip() for column in header]
+        missing = [column for column in REPORT_COLUMNS if column not in header]
+        if missing:
+            raise ReportError(f"{self.file_path} is missing the column(s): {', '.join(missing)}")
+
+        return [(column, header.index(column)) for column in REPORT_COLUMNS]
+
+    @property
+    def fraction_read(self):
+        """Share of the (compressed) file consumed so far, between 0 and 1."""
+        try:
+            size = os.fstat(self._raw.fileno()).st_size
+            return min(self._raw.tell() / size, 1.0) if size else 1.0
+        except (OSError, ValueError):
+            return None
+
+    def chunks(self):
+        """Yield lists of at most chunk_size rows."""
+        width = max(index for _, index in self._columns) + 1
+
+        while True:
+            records = list(islice(self._records, self.chunk_size))
+            if not records:
+                break
+
+            chunk = []
+            for record in records:
+                # skip blank lines, pad short ones like csv.DictReader does
+                if not any(record):
+                    continue
+                if len(record) < width:
+                    record = record + [''] * (width - len(record))
+                chunk.append({column: record[index] for column, index in self._columns})
+
+            self.rows_read += len(chunk)
+            if self.on_chunk is not None:
+                self.on_chunk(self.rows_read, self.fraction_read)
+
+            yield chunk
+
+    def __iter__(self):
+        for chunk in self.chunks():
+            yield from chunk
+
+
+class Progress:
+    """
+    Prints the import throughput (rows/s and ETA) at most every `interval`
+    seconds instead of one line per row. An interval of 0 disables it.
+    """
+
+    def __init__(self, stdout, interval=5.0):
+        self.stdout = stdout
+        self.interval = interval
+        self.started = time.monotonic()
+        self.last_report = self.started
+
+    def __call__(self, rows, fraction=None):
+        now = time.monotonic()
+        if not self.interval or now - self.last_report < self.interval:
+            return
+        self.last_report = now
+        self.stdout.write(self.format(rows, fraction, now))
+
+    def format(self, rows, fraction, now):
+        elapsed = max(now - self.started, 1e-9)
+        message = f"{rows:,} rows read ({rows / elapsed:,.0f} rows/s)"
+
+        if fraction:
+            remaining = elapsed * (1 - fraction) / fraction
+            message += f", {fraction:.0%} of the file, ETA {timedelta(seconds=round(remaining))}"
+
+        return message
+
+    def finish(self, rows):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        self.stdout.write(f"Read {rows:,} rows in {timedelta(seconds=round(elapsed))} "
+                          f"({rows / elapsed:,.0f} rows/s)")
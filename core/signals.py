@@ -0,0 +1,63 @@
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core import caching, displaynames
+from core.models import User, Lecturer, Student, Department, Course, Section, Room, CourseRegistration
+
+
+# a login saves only these, and so does the upgrade of a temporary password
+# hash on the first login; none of them changes anything that is cached
+LOGIN_FIELDS = {'last_login', 'password'}
+
+
+def login_only(update_fields):
+    return update_fields is not None and set(update_fields) <= LOGIN_FIELDS
+
+
+# the proxies send their own signals, so they are listed next to User
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Lecturer)
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Lecturer)
+@receiver(post_delete, sender=Student)
+def invalidate_display_name(sender, instance, update_fields=None, **kwargs):
+    if login_only(update_fields):
+        return
+    displaynames.invalidate([instance.username])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Lecturer)
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Department)
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Section)
+@receiver(post_save, sender=Room)
+@receiver(post_save, sender=CourseRegistration)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Lecturer)
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Department)
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=Section)
+@receiver(post_delete, sender=Room)
+@receiver(post_delete, sender=CourseRegistration)
+def invalidate_caches(sender, instance, update_fields=None, **kwargs):
+    if login_only(update_fields):
+        return
+    # once per transaction, not once per row it saves
+    caching.invalidate_on_commit()
+
+
+# keep Section.student_count in step with single registrations; the bulk
+# import skips the signals and recounts with Section.refresh_student_counts
+@receiver(post_save, sender=CourseRegistration)
+def count_registration(sender, instance, created, **kwargs):
+    if created:
+        Section.objects.filter(pk=instance.section_id).update(student_count=F('student_count') + 1)
+
+
+@receiver(post_delete, sender=CourseRegistration)
+def uncount_registration(sender, instance, **kwargs):
+    Section.objects.filter(pk=instance.section_id, student_count__gt=0).update(student_count=F('student_count') - 1)
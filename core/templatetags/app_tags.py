@@ -1,4 +1,5 @@
 from django import template
+from core import displaynames
 from core.models import User
 
 # To use the displayname filter in a template include
@@ -7,28 +8,17 @@ from core.models import User
 register = template.Library()
 
 @register.filter(name='displayname')
-def display_name(username):
+def display_name(value):
+    """
+    Readable name of a user, given the User object or its username.
+    A User object is formatted directly; a username is resolved through the
+    request/shared cache (see core.displaynames).
+    """
+    if isinstance(value, User):
+        return displaynames.remember(value)
 
-    try:
-        # Attempt to get the user from the database
-        user = User.objects.get(username=username)
+    if not value:
+        return displaynames.UNKNOWN_USER
 
-        # prepare name part if they exist
-        name_parts = []
+    return displaynames.resolve([value])[str(value)]
 
-        if user.prefix:       name_parts.append(user.prefix)
-        if user.first_name:   name_parts.append(user.first_name)
-        if user.middle_name:  name_parts.append(user.middle_name)
-        if user.last_name:    name_parts.append(user.last_name)
-
-        # If any name part exists, join them into a readable name
-        if name_parts:
-            return " ".join(name_parts)
-        else:
-            # If no detailed name is available, fall back to the username (ID)
-            return user.username
-    except User.DoesNotExist:
-
-        # If the user is not found in the database, return "Unknown User"
-        return "Unknown User"
-        
\ No newline at end of file
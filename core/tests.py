@@ -1,3 +1,499 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import os
+import tempfile
+from datetime import date, time, timedelta
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.template import Context, Template
+from django.urls import reverse
+from core import caching, displaynames, names
+from core.context_processors import cache_generation
+from core.reports import REPORT_COLUMNS, Progress, ReportError, ReportReader
+from core.models import User, Lecturer, Student, Department, Course, Section, Room, CourseRegistration
+from schedule.models import ExamSchedule, Invigilation
 
-# Create your tests here.
+
+class AdminChangelistQueryTests(TestCase):
+    """The admin changelists must run a fixed number of queries, whatever the number of rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser('admin', 'admin@utas.edu.om', 'password')
+        cls.department = Department.objects.create(name='Information Technology')
+        cls.rows = 0
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+
+    def add_rows(self, count):
+        for _ in range(count):
+            self.rows += 1
+            lecturer = Lecturer.objects.create(username=f'L{self.rows}', first_name='Lecturer', last_name=str(self.rows),
+                                               department=self.department)
+            Student.objects.create(username=f'S{self.rows}', first_name='Student', last_name=str(self.rows),
+                                   department=self.department)
+            course = Course.objects.create(code=f'IT{self.rows}', name=f'Course {self.rows}',
+                                           department=self.department, coordinator=lecturer)
+            Section.objects.create(course=course, number=1, lecturer=lecturer)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_query_count_is_constant(self):
+        for name in ('section', 'course', 'user', 'lecturer', 'student'):
+            url = reverse(f'admin:core_{name}_changelist')
+            with self.subTest(changelist=name):
+                self.add_rows(2)
+                few = self.count_queries(url)
+                self.add_rows(20)
+                many = self.count_queries(url)
+                self.assertEqual(few, many)
+
+
+class UserSearchTests(TestCase):
+    """The spellings of an 'Al' name share one search key, the admin search finds them all."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser('admin', 'admin@utas.edu.om', 'password')
+        for username, last_name in (('S1', 'Al Balushi'), ('S2', 'Al-Balushi'), ('S3', 'AlBalushi'),
+                                    ('S4', 'Al Harthi')):
+            Student.objects.create(username=username, first_name='Ahmed', last_name=last_name,
+                                   user_type=User.STUDENT)
+
+    def search(self, name, term):
+        self.client.force_login(self.admin_user)
+        response = self.client.get(reverse(f'admin:core_{name}_changelist'), {'q': term})
+        return sorted(user.username for user in response.context['cl'].result_list)
+
+    def test_spellings_fold_to_one_search_key(self):
+        self.assertEqual(set(User.objects.filter(username__in=['S1', 'S2', 'S3']).values_list('search_key', flat=True)),
+                         {'ahmed albalushi'})
+
+    def test_admin_search_finds_every_spelling(self):
+        for term in ('Ahmed Al Balushi', 'ahmed al-bal', 'Ahmed AlBalushi'):
+            with self.subTest(term=term):
+                self.assertEqual(self.search('user', term), ['S1', 'S2', 'S3'])
+                self.assertEqual(self.search('student', term), ['S1', 'S2', 'S3'])
+        self.assertEqual(self.search('user', 'S4'), ['S4'])
+
+
+class LecturerDashboardQueryTests(TestCase):
+    """The exam duties on the dashboard must cost a fixed number of queries, whatever their number."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Information Technology')
+        cls.lecturer = Lecturer.objects.create(username='L1', first_name='Lecturer', last_name='One',
+                                               department=cls.department)
+        cls.room = Room.objects.create(label='A101', room_type=Room.CLASS_ROOM, campus=Room.SA,
+                                       capacity=40, block='A')
+        cls.duties = 0
+
+    def setUp(self):
+        self.client.force_login(self.lecturer)
+
+    def add_duties(self, count):
+        # the signals invalidate the cached schedules once the changes are committed
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_duties(count)
+
+    def create_duties(self, count):
+        for _ in range(count):
+            self.duties += 1
+            course = Course.objects.create(code=f'IT{self.duties}', name=f'Course {self.duties}',
+                                           department=self.department)
+            section = Section.objects.create(course=course, number=1, lecturer=self.lecturer)
+            exam_date = date(2026, 1, 1) + timedelta(days=self.duties)
+            ExamSchedule.objects.create(section=section, room=self.room, exam_date=exam_date, exam_time=time(8))
+            Invigilation.objects.create(invigilator=self.lecturer, room=self.room, exam_date=exam_date,
+                                        exam_time=time(8))
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('core:dashboard'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_dashboard_query_count_is_constant(self):
+        # creating the duties invalidates the cached schedules, both counts are uncached
+        self.add_duties(3)
+        few = self.count_queries()
+        self.add_duties(27)
+        many = self.count_queries()
+        self.assertEqual(few, many)
+        self.assertContains(self.client.get(reverse('core:dashboard')), 'IT30', count=2)
+
+    def test_schedules_are_cached_until_the_timetable_changes(self):
+        self.add_duties(2)
+        lecturer = Lecturer.objects.get(pk=self.lecturer.pk)
+        self.assertEqual(len(lecturer.get_lecturer_schedule()), 2)
+        self.assertEqual(len(lecturer.get_invigilator_schedule()), 2)
+        with self.assertNumQueries(2):  # the cache generation of each, no schedule query
+            lecturer.get_lecturer_schedule()
+            lecturer.get_invigilator_schedule()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ExamSchedule.objects.filter(section__course__code='IT1').first().delete()
+        self.assertEqual(len(lecturer.get_lecturer_schedule()), 1)
+        self.assertEqual([len(duty.exams) for duty in lecturer.get_invigilator_schedule()], [0, 1])
+
+
+class CacheGenerationTests(TestCase):
+    """The generations are shared through the database, not kept in a (possibly per process) cache."""
+
+    def test_invalidation_survives_the_cache(self):
+        generation = caching.get_generation(caching.SCHEDULES)
+        caches['default'].clear()  # what another process sees of a locmem cache
+        self.assertEqual(caching.get_generation(caching.SCHEDULES), generation)
+
+        caching.invalidate(caching.SCHEDULES)
+        self.assertEqual(caching.get_generation(caching.SCHEDULES), generation + 1)
+        self.assertEqual(caching.make_key(caching.SCHEDULES, 'student', 1), f"schedules:{generation + 1}:student:1")
+
+    def test_signals_invalidate_once_per_transaction(self):
+        generation = caching.get_generation(caching.SCHEDULES)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            department = Department.objects.create(name='Information Technology')
+            for number in range(5):
+                Course.objects.create(code=f'IT{number}', name='Course', department=department)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(caching.get_generation(caching.SCHEDULES), generation + 1)
+
+    def test_logins_do_not_invalidate(self):
+        user = User.objects.create(username='S1')
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            user.set_password('secret')
+            user.save(update_fields=['password'])
+            self.client.force_login(user)
+        self.assertEqual(callbacks, [])
+
+    def test_context_reads_the_generation_only_when_used(self):
+        generation = caching.get_generation(caching.FRAGMENTS)
+        with self.assertNumQueries(0):
+            context = cache_generation(RequestFactory().get('/'))
+        with self.assertNumQueries(1):
+            self.assertEqual(str(context['cache_generation']), str(generation))
+
+
+class LoadUsersTests(TestCase):
+    """An imported report gives working logins, and a delta import retires only the users that left it."""
+
+    ROWS = [
+        ('Information Technology', '72J2040', 'Ahmed Al-Balushi', 'Information Technology',
+         '2497 - Dr. John Smith', 'IT101', 'Programming', '1'),
+        ('Information Technology', '72J2041', 'Salim Said Al Harthi', 'Information Technology',
+         '2497 - Dr. John Smith', 'IT101', 'Programming', '1'),
+        ('Information Technology', '72J2042', 'Maryam Khalfan', 'Information Technology',
+         '2497 - Dr. John Smith', 'IT102', 'Databases', '2'),
+    ]
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        # the command appends the generated passwords to BASE_DIR/created_users_log.csv
+        settings = override_settings(BASE_DIR=self.directory)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def load(self, rows, *options):
+        path = os.path.join(self.directory, 'report.csv')
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Department Name', 'Student No', 'Student Name', 'Department Courses',
+                             'Lecturer Name', 'Course No', 'Course Name', 'Section No'])
+            writer.writerows(rows)
+        call_command('loadusers', path, '--workers', '1', '--progress-interval', '0', *options, stdout=io.StringIO())
+
+    def passwords(self):
+        with open(os.path.join(self.directory, 'created_users_log.csv'), newline='') as f:
+            return {row['username']: row['password'] for row in csv.DictReader(f)}
+
+    def test_import_creates_users_that_can_log_in(self):
+        self.load(self.ROWS, '--bulk', '--hasher', 'pbkdf2_sha256_temp')
+
+        self.assertEqual(sorted(User.objects.filter(user_type=User.STUDENT).values_list('username', 'last_name')),
+                         [('72J2040', 'Albalushi'), ('72J2041', 'Alharthi'), ('72J2042', 'Khalfan')])
+        self.assertEqual(User.objects.get(is_lecturer=True).username, '2497')
+        self.assertEqual(sorted(CourseRegistration.objects.values_list('student__username', 'section__course__code')),
+                         [('72J2040', 'IT101'), ('72J2041', 'IT101'), ('72J2042', 'IT102')])
+        self.assertEqual(Section.objects.get(course__code='IT101').student_count, 2)
+
+        passwords = self.passwords()
+        self.assertEqual(sorted(passwords), ['2497', '72J2040', '72J2041', '72J2042'])
+        student = User.objects.get(username='72J2040')
+        self.assertTrue(student.password.startswith('pbkdf2_sha256_temp$'))
+
+        # the first login upgrades the temporary hash to the default hasher
+        self.assertTrue(self.client.login(username='72J2040', password=passwords['72J2040']))
+        student.refresh_from_db()
+        self.assertTrue(student.password.startswith('pbkdf2_sha256$'))
+        self.assertTrue(self.client.login(username='72J2040', password=passwords['72J2040']))
+
+    def test_delta_import_retires_only_the_missing_user(self):
+        self.load(self.ROWS, '--bulk')
+        passwords = {user.username: user.password for user in User.objects.all()}
+
+        self.load(self.ROWS[:2], '--delta')
+
+        self.assertEqual(sorted(User.objects.filter(is_active=False).values_list('username', flat=True)),
+                         ['72J2042'])
+        self.assertEqual(sorted(User.objects.filter(is_active=True).values_list('username', flat=True)),
+                         ['2497', '72J2040', '72J2041'])
+        # nobody got a new password, the removed course took its registrations along
+        self.assertEqual({user.username: user.password for user in User.objects.all()}, passwords)
+        self.assertEqual(sorted(CourseRegistration.objects.values_list('student__username', flat=True)),
+                         ['72J2040', '72J2041'])
+        self.assertEqual(sorted(self.passwords()), ['2497', '72J2040', '72J2041', '72J2042'])
+
+    def test_delta_import_of_one_department_leaves_the_others(self):
+        engineering = [('Engineering', '72J2050', 'Khalid Nasser', 'Engineering', '3100 - Mr. Ali Hamad',
+                        'EN101', 'Statics', '1')]
+        self.load(self.ROWS + engineering, '--bulk')
+
+        # the next report of information technology drops a student and a course
+        self.load(self.ROWS[:2], '--delta')
+
+        self.assertEqual(sorted(Course.objects.values_list('code', flat=True)), ['EN101', 'IT101'])
+        self.assertEqual(sorted(User.objects.filter(is_active=False).values_list('username', flat=True)),
+                         ['72J2042'])
+        self.assertTrue(CourseRegistration.objects.filter(student__username='72J2050',
+                                                          section__course__code='EN101').exists())
+
+    def test_bad_header_deletes_nothing(self):
+        self.load(self.ROWS, '--bulk')
+        path = os.path.join(self.directory, 'bad.csv')
+        with open(path, 'w', newline='') as f:
+            csv.writer(f).writerow(REPORT_COLUMNS[:-1])
+
+        with self.assertRaisesMessage(CommandError, 'missing the column(s): Section No'):
+            call_command('loadusers', path, stdout=io.StringIO())
+        self.assertEqual(User.objects.count(), 4)
+        self.assertEqual(CourseRegistration.objects.count(), 3)
+
+    def test_directory_of_reports_is_merged(self):
+        reports = os.path.join(self.directory, 'reports')
+        os.mkdir(reports)
+        # the second report names a student and a course differently, the first mention wins
+        renamed = self.ROWS[1][:2] + ('Salim Harthi',) + self.ROWS[1][3:6] + ('Programming I',) + self.ROWS[1][7:]
+        for name, rows in (('a.csv', self.ROWS[:2]), ('b.csv.gz', [renamed, self.ROWS[2]]), ('notes.txt', [])):
+            with (gzip.open if name.endswith('.gz') else open)(os.path.join(reports, name), 'wt', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(REPORT_COLUMNS)
+                writer.writerows(rows)
+
+        for options in (['--bulk'], []):
+            call_command('loadusers', reports, '--workers', '1', '--progress-interval', '0', *options,
+                         stdout=io.StringIO())
+            self.assertEqual(sorted(User.objects.filter(user_type=User.STUDENT).values_list('username', 'last_name')),
+                             [('72J2040', 'Albalushi'), ('72J2041', 'Alharthi'), ('72J2042', 'Khalfan')])
+            self.assertEqual(sorted(Course.objects.values_list('code', 'name')),
+                             [('IT101', 'Programming'), ('IT102', 'Databases')])
+            self.assertEqual(CourseRegistration.objects.count(), 3)
+
+        # every header is checked before the single wipe, a bad report deletes nothing
+        with open(os.path.join(reports, 'c.csv'), 'w', newline='') as f:
+            csv.writer(f).writerow(REPORT_COLUMNS[1:])
+        with self.assertRaisesMessage(CommandError, 'c.csv is missing the column(s): Department Name'):
+            call_command('loadusers', reports, stdout=io.StringIO())
+        self.assertEqual(User.objects.count(), 4)
+
+    def test_bulk_and_row_by_row_imports_agree(self):
+        rows = self.ROWS + [
+            ('Information Technology', '72J2040', 'Ahmed Al-Balushi', 'Information Technology',
+             '2497 - Dr. John Smith', 'IT102', 'Databases', '2'),
+            ('Engineering', '72J2050', 'Khalid Bin Nasser', 'Engineering', '3100 - Mr. Ali Hamad',
+             'EN101', 'Statics', '1'),
+        ]
+
+        def imported():
+            with open(os.path.join(self.directory, 'created_users_log.csv'), newline='') as f:
+                logged = sorted(row['username'] for row in csv.DictReader(f))
+            return (
+                sorted(User.objects.values_list('username', 'first_name', 'middle_name', 'last_name',
+                                                'department__name', 'user_type', 'is_lecturer', 'is_invigilator')),
+                sorted(Course.objects.values_list('code', 'name', 'department__name')),
+                sorted(Section.objects.values_list('course__code', 'number', 'lecturer__username', 'student_count')),
+                sorted(CourseRegistration.objects.values_list('student__username', 'section__course__code',
+                                                              'section__number')),
+                logged,
+            )
+
+        self.load(rows, '--bulk')
+        bulk = imported()
+
+        User.objects.all().delete()
+        Course.objects.all().delete()
+        Department.objects.all().delete()
+        os.remove(os.path.join(self.directory, 'created_users_log.csv'))
+
+        self.load(rows)
+        self.assertEqual(imported(), bulk)
+        self.assertEqual(bulk[4], ['2497', '3100', '72J2040', '72J2041', '72J2042', '72J2050'])
+
+
+class ReportReaderTests(SimpleTestCase):
+    """Reports are read in chunks whatever their compression, the progress is reported with an ETA."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, rows, header=REPORT_COLUMNS, compress=False):
+        path = os.path.join(self.directory, name)
+        with (gzip.open if compress else open)(path, 'wt', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        return path
+
+    def rows(self, count):
+        return [('Information Technology', f'72J{i:04}', f'Student {i}', 'Information Technology',
+                 '2497 - Dr. John Smith', 'IT101', 'Programming', '1') for i in range(count)]
+
+    def test_gzip_is_detected_by_its_content(self):
+        # a compressed report without the .gz extension
+        path = self.write('report.csv', self.rows(3), compress=True)
+        with ReportReader(path) as reader:
+            self.assertEqual([row['Student No'] for row in reader], ['72J0000', '72J0001', '72J0002'])
+
+    def test_chunks_hold_at_most_chunk_size_rows(self):
+        reported = []
+        # blank lines are skipped, short lines padded, the other columns dropped
+        rows = self.rows(4) + [(), ('Engineering', '72J2050')]
+        path = self.write('report.csv', [('ignored',) + row if row else row for row in rows],
+                          header=('Extra',) + REPORT_COLUMNS)
+
+        with ReportReader(path, chunk_size=2, on_chunk=lambda *args: reported.append(args)) as reader:
+            chunks = list(reader.chunks())
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(chunks[2][0], {**dict.fromkeys(REPORT_COLUMNS, ''), 'Department Name': 'Engineering',
+                                        'Student No': '72J2050'})
+        self.assertEqual([rows for rows, _ in reported], [2, 4, 5])
+        self.assertEqual(reported[-1][1], 1.0)
+
+    def test_header_is_validated_on_open(self):
+        path = self.write('report.csv', self.rows(1), header=REPORT_COLUMNS[1:])
+        with self.assertRaisesMessage(ReportError, 'missing the column(s): Department Name'):
+            ReportReader(path).open()
+
+        path = os.path.join(self.directory, 'empty.csv')
+        open(path, 'w').close()
+        with self.assertRaisesMessage(ReportError, 'is empty'):
+            ReportReader(path).open()
+
+    def test_progress_reports_the_rate_and_eta(self):
+        out = io.StringIO()
+        progress = Progress(out, interval=5)
+        self.assertEqual(progress.format(1000, 0.25, progress.started + 10),
+                         '1,000 rows read (100 rows/s), 25% of the file, ETA 0:00:30')
+        self.assertEqual(progress.format(1000, None, progress.started + 10), '1,000 rows read (100 rows/s)')
+
+        # at most one line per interval
+        progress(1000, 0.5)
+        self.assertEqual(out.getvalue(), '')
+        progress.last_report -= 5
+        progress(1000, 0.5)
+        self.assertIn('1,000 rows read', out.getvalue())
+
+        silent = io.StringIO()
+        Progress(silent, interval=0)(1000, 0.5)
+        self.assertEqual(silent.getvalue(), '')
+
+
+class NameTests(SimpleTestCase):
+    """Report names are split and capitalized once per distinct value, the cached results stay intact."""
+
+    def test_omani_name_joins_al_to_the_next_word(self):
+        self.assertEqual(names.clean_omani_name('Ahmed Al-Balushi'), ('Ahmed', '', 'Albalushi'))
+        self.assertEqual(names.clean_omani_name('salim said AL harthi'), ('Salim', 'Said', 'Alharthi'))
+        self.assertEqual(names.clean_omani_name('Maryam'), ('Maryam', '', ''))
+        self.assertEqual(names.clean_omani_name('Ahmed Al'), ('Ahmed', '', 'Al'))  # nothing to join to
+
+    def test_lecturer_name_is_split_from_its_id_and_prefix(self):
+        self.assertEqual(names.clean_lecturer_name('2497 - Dr. John Smith'),
+                         {'username': '2497', 'prefix': 'Dr', 'first_name': 'John', 'middle_name': '',
+                          'last_name': 'Smith'})
+        self.assertEqual(names.clean_lecturer_name(' 3100 - prof.jane mary doe'),
+                         {'username': '3100', 'prefix': 'prof', 'first_name': 'Jane', 'middle_name': 'Mary',
+                          'last_name': 'Doe'})
+        with self.assertRaises(ValueError):
+            names.clean_lecturer_name('John Smith')
+
+    def test_columns_match_the_single_values(self):
+        column = ['Ahmed Al-Balushi', 'Maryam Khalfan', 'Ahmed Al-Balushi']
+        self.assertEqual(names.clean_omani_names(column), [names.clean_omani_name(name) for name in column])
+
+        column = ['2497 - Dr. John Smith', '3100 - Mr. Ali Hamad', '2497 - Dr. John Smith']
+        self.assertEqual(names.clean_lecturer_names(column), [names.clean_lecturer_name(entry) for entry in column])
+
+    def test_changing_a_result_leaves_the_cache_intact(self):
+        entry = '2497 - Dr. John Smith'
+        cleaned = names.clean_lecturer_name(entry)
+        cleaned['first_name'] = 'Changed'
+        self.assertEqual(names.clean_lecturer_name(entry)['first_name'], 'John')
+
+        # the rows of a repeated entry are separate dicts too
+        column = names.clean_lecturer_names([entry, entry])
+        column[0]['last_name'] = 'Changed'
+        self.assertEqual(column[1]['last_name'], 'Smith')
+        self.assertEqual(names.clean_lecturer_names([entry])[0]['last_name'], 'Smith')
+
+
+class DisplayNameTests(TestCase):
+    """Names are looked up once per request, then in the shared cache, the missing ones with one query."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(5):
+            User.objects.create(username=f'L{i}', prefix='Dr', first_name='Lecturer', last_name=str(i))
+
+    def setUp(self):
+        displaynames.get_cache().clear()
+
+    def test_missing_names_are_loaded_with_one_query(self):
+        with self.assertNumQueries(1):
+            names = displaynames.resolve([f'L{i}' for i in range(5)] + ['nobody', None])
+        self.assertEqual(names, {**{f'L{i}': f'Dr Lecturer {i}' for i in range(5)},
+                                 'nobody': displaynames.UNKNOWN_USER})
+
+    def test_shared_cache_serves_the_next_lookup(self):
+        displaynames.resolve(['L0', 'L1'])
+        with self.assertNumQueries(1):  # only L2
+            self.assertEqual(displaynames.resolve(['L0', 'L1', 'L2'])['L2'], 'Dr Lecturer 2')
+
+        # a saved user is dropped from the shared cache
+        User.objects.get(username='L0').save()
+        with self.assertNumQueries(1):
+            displaynames.resolve(['L0', 'L1'])
+
+    def test_request_cache_outlives_the_shared_cache(self):
+        token = displaynames.start_request()
+        try:
+            displaynames.resolve(['L0'])
+            displaynames.get_cache().clear()
+            with self.assertNumQueries(0):
+                self.assertEqual(displaynames.resolve(['L0'])['L0'], 'Dr Lecturer 0')
+        finally:
+            displaynames.end_request(token)
+
+        # the request cache ends with its request
+        with self.assertNumQueries(1):
+            displaynames.resolve(['L0'])
+
+    def test_filter_takes_users_and_usernames(self):
+        template = Template('{% load app_tags %}{{ user|displayname }}, {{ username|displayname }}')
+        user = User.objects.get(username='L1')
+        with self.assertNumQueries(1):
+            self.assertEqual(template.render(Context({'user': user, 'username': 'L2'})),
+                             'Dr Lecturer 1, Dr Lecturer 2')
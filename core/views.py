@@ -3,6 +3,7 @@ from django.shortcuts import render
 from django.views.generic import TemplateView
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from core.models import Lecturer
 
 # Create your views here.
 class HomeView(View):
@@ -31,4 +32,10 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['user'] = self.request.user
+
+        # exam duties of the staff, a fixed number of queries whatever their number
+        if self.request.user.is_lecturer or self.request.user.is_invigilator:
+            lecturer = Lecturer.objects.get(pk=self.request.user.pk)
+            context['teaching_exams'] = lecturer.get_lecturer_schedule()
+            context['invigilations'] = lecturer.get_invigilator_schedule()
         return context
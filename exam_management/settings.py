@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -39,7 +40,10 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
 
     'core.apps.CoreConfig',
-    'schedule.apps.ScheduleConfig'
+    'schedule.apps.ScheduleConfig',
+    'bundles.apps.BundlesConfig',
+    'attendance.apps.AttendanceConfig',
+    'stats.apps.StatsConfig',
 ]
 
 AUTH_USER_MODEL = 'core.User'
@@ -54,6 +58,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.DisplayNameCacheMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -71,6 +76,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.cache_generation',
             ],
         },
     },
@@ -90,6 +96,61 @@ DATABASES = {
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# CACHE_BACKEND selects the backend of all named caches: 'locmem' (default,
+# per process), 'file' (shared by the processes of one machine) or 'redis'
+# (shared by all machines, needs the redis package and REDIS_URL). The
+# invalidation counters are kept in the database (see core.caching), so every
+# backend sees the changes made by the other processes.
+# Raising CACHE_VERSION invalidates every cached entry at once.
+
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+CACHE_VERSION = int(os.environ.get('CACHE_VERSION', 1))
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1')
+CACHE_DIR = BASE_DIR / 'cache'
+
+
+def cache_config(name, timeout):
+    config = {'TIMEOUT': timeout, 'VERSION': CACHE_VERSION, 'KEY_PREFIX': name}
+
+    if CACHE_BACKEND == 'redis':
+        config.update(BACKEND='django.core.cache.backends.redis.RedisCache', LOCATION=REDIS_URL)
+    elif CACHE_BACKEND == 'file':
+        config.update(BACKEND='django.core.cache.backends.filebased.FileBasedCache',
+                      LOCATION=str(CACHE_DIR / name))
+    else:
+        config.update(BACKEND='django.core.cache.backends.locmem.LocMemCache', LOCATION=name)
+
+    return config
+
+
+CACHES = {
+    'default': cache_config('default', 300),
+    'sessions': cache_config('sessions', 60 * 60 * 24),
+    'template_fragments': cache_config('fragments', 600),  # used by the {% cache %} tag
+    'schedules': cache_config('schedules', 60 * 60),  # computed timetables
+}
+
+# sessions are read from the cache and written through to the database
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+
+
+# Student conflict matrix of the exam scheduler (see schedule.conflicts)
+
+CONFLICT_MATRIX_PATH = BASE_DIR / 'var' / 'conflicts.bin'
+
+# Published timetable snapshots (see schedule.snapshots)
+
+TIMETABLE_SNAPSHOT_ROOT = BASE_DIR / 'var' / 'timetable'
+
+# Static iCalendar feeds written by the writecalendars command, laid out like
+# the /schedule/calendar/ URLs so the web server can serve that path from here
+
+CALENDAR_FEED_ROOT = BASE_DIR / 'var' / 'calendars'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -109,6 +170,22 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/4.2/topics/auth/passwords/
+# The first entry is used for every new password. The temporary hasher is only
+# used for first-login passwords of bulk imported accounts and gets upgraded
+# on the first successful login.
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'core.hashers.TemporaryPasswordHasher',
+]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
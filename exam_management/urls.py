@@ -22,5 +22,9 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('accounts/', include('django.contrib.auth.urls')),  # Including auth URLs
     path('', include('core.urls')),
+    path('schedule/', include('schedule.urls')),
+    path('bundles/', include('bundles.urls')),
+    path('attendance/', include('attendance.urls')),
+    path('statistics/', include('stats.urls')),
 
 ]
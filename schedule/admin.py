@@ -1,3 +1,62 @@
-from django.contrib import admin
+from collections import defaultdict
+from django.contrib import admin, messages
+from schedule.conflicts import get_matrix
+from schedule.models import ExamSchedule, Invigilation, Seat
 
-# Register your models here.
+
+@admin.register(ExamSchedule)
+class ExamScheduleAdmin(admin.ModelAdmin):
+    list_display = ('section', 'exam_date', 'exam_time', 'duration', 'room', 'seats')
+    list_filter = ('exam_date', 'exam_time', 'room__campus', 'section__course__department')
+    list_select_related = ('section__course', 'room')  # avoid one query per row
+    search_fields = ('section__course__code', 'section__course__name')
+    autocomplete_fields = ('section', 'room')
+    date_hierarchy = 'exam_date'
+    actions = ['check_clashes']
+
+    @admin.action(description='Check clashes of the selected exams')
+    def check_clashes(self, request, queryset):
+        """Report the courses sitting in the same slot as a selected exam that share students with it."""
+        selected = set(queryset.values_list('section__course_id', 'exam_date', 'exam_time'))
+        slots = {(exam_date, exam_time) for _, exam_date, exam_time in selected}
+
+        # every course sitting in the slots of the selection
+        courses_in_slot = defaultdict(set)
+        codes = {}
+        for course_id, code, exam_date, exam_time in (ExamSchedule.objects
+                                                       .filter(exam_date__in={slot[0] for slot in slots})
+                                                       .values_list('section__course_id', 'section__course__code',
+                                                                    'exam_date', 'exam_time')):
+            if (exam_date, exam_time) in slots:
+                courses_in_slot[(exam_date, exam_time)].add(course_id)
+                codes[course_id] = code
+
+        matrix = get_matrix()
+        found = 0
+        for course_id, exam_date, exam_time in sorted(selected, key=lambda item: (item[1], item[2], item[0])):
+            for other, shared in matrix.clashes(course_id, courses_in_slot[(exam_date, exam_time)]).items():
+                found += 1
+                self.message_user(request, f"{codes[course_id]} and {codes[other]} share {shared} student(s) "
+                                           f"on {exam_date} {exam_time:%H:%M}", messages.WARNING)
+
+        if not found:
+            self.message_user(request, "No clashes found for the selected exams", messages.SUCCESS)
+
+
+@admin.register(Invigilation)
+class InvigilationAdmin(admin.ModelAdmin):
+    list_display = ('invigilator', 'room', 'exam_date', 'exam_time', 'duration')
+    list_filter = ('exam_date', 'exam_time', 'room__campus', 'invigilator__department')
+    list_select_related = ('invigilator', 'room')  # avoid one query per row
+    search_fields = ('invigilator__username', 'room__label')
+    autocomplete_fields = ('invigilator', 'room')
+    date_hierarchy = 'exam_date'
+
+
+@admin.register(Seat)
+class SeatAdmin(admin.ModelAdmin):
+    list_display = ('student', 'exam', 'label')
+    list_filter = ('exam__exam_date', 'exam__room__campus')
+    list_select_related = ('student', 'exam__section__course', 'exam__room')  # avoid one query per row
+    search_fields = ('student__username', 'exam__section__course__code', 'exam__room__label')
+    raw_id_fields = ('exam', 'student')
@@ -0,0 +1,127 @@
+import json
+from datetime import datetime, timedelta
+from django.core import signing
+from django.utils.crypto import constant_time_compare
+from schedule import snapshots
+
+# iCalendar (RFC 5545) feeds of the published timetable.
+#
+# The feeds are rendered from the snapshot files (see schedule.snapshots),
+# never from the database, so a calendar client polling a feed costs a
+# file read. Calendar clients cannot log in, a feed URL carries a
+# signature of its kind and key instead. The times are floating local
+# times: the exams are sat where the campuses are, whatever the time zone
+# of the device.
+
+FEED_KINDS = ('students', 'lecturers', 'rooms')
+
+PRODID = '-//Exam Management System//Exam Timetable//EN'
+UID_DOMAIN = 'exam-management'
+SALT = 'schedule.calendars'
+
+
+def feed_signature(kind, key):
+    return signing.Signer(salt=SALT).signature(f"{kind}:{key}")
+
+
+def feed_kind(user):
+    """The feed of a user: staff get their teaching and invigilation duties."""
+    return 'lecturers' if user.is_lecturer or user.is_invigilator else 'students'
+
+
+def check_signature(kind, key, signature):
+    return kind in FEED_KINDS and constant_time_compare(feed_signature(kind, key), signature)
+
+
+def escape(text):
+    return (str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def fold(line):
+    """Split a content line into lines of at most 75 octets, continuation lines start with a space."""
+    if len(line.encode()) <= 75:
+        return line + '\r\n'
+
+    parts, part, size = [], '', 0
+    for char in line:
+        width = len(char.encode())
+        if size + width > 75:
+            parts.append(part)
+            # the leading space of the continuation counts towards its 75 octets
+            part, size = ' ', 1
+        part += char
+        size += width
+    parts.append(part)
+    return '\r\n'.join(parts) + '\r\n'
+
+
+def local_time(exam_date, exam_time, minutes=0):
+    start = datetime.strptime(f"{exam_date} {exam_time}", '%Y-%m-%d %H:%M') + timedelta(minutes=minutes)
+    return start.strftime('%Y%m%dT%H%M%S')
+
+
+def location(rooms):
+    return ', '.join(f"{room['room']} (block {room['block']}, {room['campus']})" for room in rooms)
+
+
+def events(kind, key, payload):
+    """(uid, summary, location, description, date, time, duration) of the events of a feed."""
+    for exam in payload['exams']:
+        rooms = exam['rooms']
+        if kind == 'rooms':
+            rooms = [room for room in rooms if str(room['id']) == str(key)]
+        description = [f"Section {exam['section']}"]
+        if kind != 'students':
+            description += [f"{room['room']}: {room['seats']} students" for room in rooms if room['seats'] is not None]
+        yield (f"exam-{exam['section_id']}-{key if kind == 'rooms' else 'all'}",
+               f"Exam {exam['course']} {exam['name']}", location(rooms) or 'To be announced',
+               ', '.join(description), exam['date'], exam['time'], exam['duration'])
+
+    for invigilation in payload.get('invigilations', ()):
+        if kind == 'rooms':
+            summary = f"Invigilation by {invigilation['invigilator']}"
+        else:
+            summary = f"Invigilation in {invigilation['room']['room']}"
+        yield (f"invigilation-{invigilation['invigilator_id']}-{invigilation['room']['id']}-"
+               f"{invigilation['date']}-{invigilation['time']}",
+               summary, location([invigilation['room']]), '',
+               invigilation['date'], invigilation['time'], invigilation['duration'])
+
+
+def feed_lines(kind, key, payload, stamp):
+    """
+    The lines of the feed, one event at a time. stamp is the UTC time the
+    slice last changed, so the same content always gives the same bytes.
+    """
+    stamp = stamp.strftime('%Y%m%dT%H%M%SZ')
+    yield 'BEGIN:VCALENDAR\r\nVERSION:2.0\r\n'
+    yield fold(f"PRODID:{PRODID}")
+    yield 'CALSCALE:GREGORIAN\r\nMETHOD:PUBLISH\r\n'
+    yield fold(f"X-WR-CALNAME:{escape('Exam timetable')}")
+
+    for uid, summary, where, description, exam_date, exam_time, duration in events(kind, key, payload):
+        lines = [
+            'BEGIN:VEVENT',
+            f"UID:{uid}@{UID_DOMAIN}",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{local_time(exam_date, exam_time)}",
+            f"DTEND:{local_time(exam_date, exam_time, duration)}",
+            f"SUMMARY:{escape(summary)}",
+            f"LOCATION:{escape(where)}",
+        ]
+        if description:
+            lines.append(f"DESCRIPTION:{escape(description)}")
+        lines.append('END:VEVENT')
+        yield ''.join(fold(line) for line in lines)
+
+    yield 'END:VCALENDAR\r\n'
+
+
+def read_feed(kind, key, root=None):
+    """(line generator, Snapshot) of a feed of the published timetable, None when there is no such feed."""
+    snapshot = snapshots.read(kind, key, root) if kind in FEED_KINDS else None
+    if snapshot is None:
+        return None
+    payload = json.loads(snapshot.path.read_bytes())
+    return feed_lines(kind, key, payload, snapshot.modified), snapshot
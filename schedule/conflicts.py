@@ -0,0 +1,207 @@
+import os
+import struct
+import tempfile
+from array import array
+from django.conf import settings
+from django.db.models import Count, F, Sum
+from schedule.timetabling import build_conflict_graph
+
+# In-memory student conflict matrix.
+#
+# Every course holds a bitset (a Python int) with one bit per enrolled
+# student, so the number of students two courses share is the popcount of
+# the AND of their bitsets. The matrix is persisted to a compact binary file
+# together with a fingerprint of the registrations of every course (their
+# count and the sum of a hash of their student ids). get_matrix() compares
+# the fingerprints with one grouped query and reloads only the courses that
+# changed. The hash covers what the bitset is made of, so a registration
+# edited in place to another student changes the fingerprint as well.
+
+MAGIC = b'CMX3'
+HEADER = struct.Struct('<4sII')  # magic, number of students, number of courses
+COURSE = struct.Struct('<qqqI')  # course id, registrations, sum of student hashes, bitset bytes
+
+# multiplicative hash of a student id, computed by the database: (id * HASH_FACTOR) % HASH_MODULUS
+HASH_FACTOR = 2654435761
+HASH_MODULUS = 2 ** 32
+
+
+def bit_positions(bits):
+    """The positions of the set bits of an int, lowest first."""
+    digits = bin(bits)[:1:-1]  # lowest bit first, without the '0b'
+    position = digits.find('1')
+    while position != -1:
+        yield position
+        position = digits.find('1', position + 1)
+
+
+class ConflictMatrix:
+
+    def __init__(self, students=(), courses=None, fingerprints=None):
+        self.students = array('q', students)  # bit index -> student id
+        self.index = {student: i for i, student in enumerate(self.students)}
+        self.courses = dict(courses or {})  # course id -> bitset
+        self.fingerprints = dict(fingerprints or {})  # course id -> (registrations, sum of student hashes)
+
+    # queries
+
+    def shared(self, course, other):
+        """Number of students registered in both courses."""
+        return (self.courses.get(course, 0) & self.courses.get(other, 0)).bit_count()
+
+    def size(self, course):
+        return self.courses.get(course, 0).bit_count()
+
+    def clashes(self, course, candidates=None):
+        """{other course: shared students} for the courses sharing students with `course`."""
+        bits = self.courses.get(course, 0)
+        result = {}
+        for other in (self.courses if candidates is None else candidates):
+            if other != course:
+                shared = (bits & self.courses.get(other, 0)).bit_count()
+                if shared:
+                    result[other] = shared
+        return result
+
+    def graph(self):
+        """The conflict graph and course sizes in the format of build_conflict_graph."""
+        # the edges come from the course list of every student, ANDing every pair of full width bitsets
+        # would cost courses squared times students
+        graph, sizes = build_conflict_graph((student, course) for course, bits in self.courses.items()
+                                            for student in bit_positions(bits))
+        for course in self.courses:
+            graph.setdefault(course, {})
+        return graph, sizes
+
+    # building
+
+    def position(self, student):
+        i = self.index.get(student)
+        if i is None:
+            i = self.index[student] = len(self.students)
+            self.students.append(student)
+        return i
+
+    def load_courses(self, enrolments, course_ids=None):
+        """
+        (Re)build the bitsets from (student, course) pairs. With course_ids only
+        those courses are replaced, the others are kept as they are.
+        """
+        if course_ids is None:
+            self.courses = {}
+        else:
+            for course in course_ids:
+                self.courses.pop(course, None)
+
+        # collect the bit positions per course and set them in a byte buffer, the int of each course is
+        # built once from it: ORing full width ints row by row copies the whole bitset every time
+        positions = {} if course_ids is None else {course: [] for course in course_ids}
+        for student, course in enrolments:
+            positions.setdefault(course, []).append(self.position(student))
+
+        for course, course_positions in positions.items():
+            if not course_positions:
+                continue
+            data = bytearray(max(course_positions) // 8 + 1)
+            for i in course_positions:
+                data[i >> 3] |= 1 << (i & 7)
+            self.courses[course] = int.from_bytes(data, 'little')
+
+    @staticmethod
+    def current_fingerprints():
+        """(count, sum of student hashes) of the registrations of every course, one grouped query."""
+        from core.models import CourseRegistration
+
+        rows = (CourseRegistration.objects.values('section__course_id')
+                .annotate(registrations=Count('pk'), student_hash=Sum(F('student_id') * HASH_FACTOR % HASH_MODULUS))
+                .order_by().values_list('section__course_id', 'registrations', 'student_hash'))
+        return {course: (registrations, student_hash) for course, registrations, student_hash in rows}
+
+    @classmethod
+    def build(cls):
+        from core.models import CourseRegistration
+
+        matrix = cls()
+        matrix.fingerprints = cls.current_fingerprints()
+        matrix.load_courses(CourseRegistration.objects.values_list('student_id', 'section__course_id').iterator())
+        return matrix
+
+    def refresh(self):
+        """Reload the courses whose registrations changed. Returns them."""
+        from core.models import CourseRegistration
+
+        fingerprints = self.current_fingerprints()
+        changed = {course for course in fingerprints.keys() | self.fingerprints.keys()
+                   if fingerprints.get(course) != self.fingerprints.get(course)}
+
+        if changed:
+            self.load_courses(CourseRegistration.objects.filter(section__course_id__in=changed)
+                              .values_list('student_id', 'section__course_id').iterator(), changed)
+        self.fingerprints = fingerprints
+        return changed
+
+    # persistence
+
+    def save(self, path):
+        """Write the matrix atomically (the new file replaces the old one in one step)."""
+        directory = os.path.dirname(os.fspath(path)) or '.'
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.conflicts-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, len(self.students), len(self.courses.keys() | self.fingerprints.keys())))
+                f.write(self.students.tobytes())
+                for course in self.courses.keys() | self.fingerprints.keys():
+                    bits = self.courses.get(course, 0)
+                    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+                    f.write(COURSE.pack(course, *self.fingerprints.get(course, (0, 0)), len(data)))
+                    f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            magic, num_students, num_courses = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a conflict matrix file")
+
+            students = array('q')
+            students.frombytes(f.read(num_students * students.itemsize))
+
+            courses, fingerprints = {}, {}
+            for _ in range(num_courses):
+                course, registrations, student_hash, length = COURSE.unpack(f.read(COURSE.size))
+                fingerprints[course] = (registrations, student_hash)
+                bits = int.from_bytes(f.read(length), 'little')
+                if bits:
+                    courses[course] = bits
+
+        return cls(students, courses, fingerprints)
+
+
+def get_matrix(rebuild=False):
+    """
+    The up to date conflict matrix: loaded from CONFLICT_MATRIX_PATH with the
+    changed courses reloaded, or built from scratch when there is no file yet.
+    The file is rewritten whenever something changed.
+    """
+    path = settings.CONFLICT_MATRIX_PATH
+
+    if rebuild or not os.path.exists(path):
+        matrix = ConflictMatrix.build()
+    else:
+        try:
+            matrix = ConflictMatrix.load(path)
+        except (ValueError, struct.error):
+            # unreadable or older format, start over
+            matrix = ConflictMatrix.build()
+        else:
+            if not matrix.refresh():
+                return matrix
+
+    matrix.save(path)
+    return matrix
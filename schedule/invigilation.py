@@ -0,0 +1,160 @@
+from collections import defaultdict, deque
+from datetime import timedelta
+
+# Invigilator assignment: staff every room of an exam slot with the
+# required number of invigilators.
+#
+# The slots are solved in chronological order, each as a min cost flow
+#
+#   source -> department -> room -> sink
+#
+# A department offers its available invigilators as unit arcs costing their
+# minutes of invigilation so far. The arcs are sorted, so the flow takes the
+# least loaded staff first and the loads even out over the exam period. A
+# room takes its invigilators from any department, with a penalty when none
+# of the courses sat in it belongs to that department. Staff teaching a
+# section that sits the slot, or already busy at that time, are not offered.
+#
+# Grouping the staff by department keeps the network at a few hundred arcs
+# per slot whatever the number of staff. This module does not touch the
+# database, see the `assigninvigilators` command.
+
+
+class MinCostFlow:
+    """Successive shortest paths (Bellman-Ford with a queue) on a small network."""
+
+    def __init__(self, nodes):
+        self.edges = [[] for _ in range(nodes)]  # node -> [[to, capacity, cost, index of the reverse edge]]
+
+    def add_edge(self, u, v, capacity, cost):
+        edge = [v, capacity, cost, len(self.edges[v])]
+        self.edges[u].append(edge)
+        self.edges[v].append([u, 0, -cost, len(self.edges[u]) - 1])
+        return edge
+
+    def flow(self, edge):
+        """Flow sent over an edge returned by add_edge."""
+        v, _, _, reverse = edge
+        return self.edges[v][reverse][1]
+
+    def solve(self, source, sink):
+        """Send as much flow as possible at the least cost. Returns (flow, cost)."""
+        total_flow = total_cost = 0
+        nodes = len(self.edges)
+
+        while True:
+            distance = [None] * nodes
+            previous = [None] * nodes  # node -> (node, edge index) it was reached by
+            distance[source] = 0
+            queue, queued = deque([source]), [False] * nodes
+            queued[source] = True
+
+            while queue:
+                u = queue.popleft()
+                queued[u] = False
+                for i, (v, capacity, cost, _) in enumerate(self.edges[u]):
+                    if capacity > 0 and (distance[v] is None or distance[u] + cost < distance[v]):
+                        distance[v] = distance[u] + cost
+                        previous[v] = (u, i)
+                        if not queued[v]:
+                            queued[v] = True
+                            queue.append(v)
+
+            if distance[sink] is None:
+                return total_flow, total_cost
+
+            # bottleneck of the path, then push it
+            push, v = None, sink
+            while v != source:
+                u, i = previous[v]
+                push = self.edges[u][i][1] if push is None else min(push, self.edges[u][i][1])
+                v = u
+
+            v = sink
+            while v != source:
+                u, i = previous[v]
+                edge = self.edges[u][i]
+                edge[1] -= push
+                self.edges[v][edge[3]][1] += push
+                v = u
+
+            total_flow += push
+            total_cost += push * distance[sink]
+
+
+class InvigilationPlanner:
+    """
+    staff maps every invigilator to their department. The planner keeps the
+    minutes and busy times of every invigilator from slot to slot.
+
+        planner = InvigilationPlanner(staff)
+        assigned, missing = planner.assign(start, 120, {room: (2, {department})}, excluded=lecturers)
+    """
+
+    def __init__(self, staff, department_penalty=240, loads=None):
+        self.staff = dict(staff)
+        self.department_penalty = department_penalty  # minutes of imbalance worth a department match
+        self.loads = defaultdict(int, loads or {})  # invigilator -> minutes
+        self.busy = defaultdict(list)  # invigilator -> [(start, end)]
+
+    def mark_busy(self, invigilator, start, end):
+        self.busy[invigilator].append((start, end))
+
+    def available(self, invigilator, start, end):
+        return all(end <= busy_start or busy_end <= start for busy_start, busy_end in self.busy[invigilator])
+
+    def assign(self, start, duration, rooms, excluded=()):
+        """
+        Staff the rooms of the slot starting at `start` (a datetime). rooms
+        maps a room to (invigilators required, departments of its courses).
+        Returns ({room: [invigilators]}, invigilators missing).
+        """
+        end = start + timedelta(minutes=duration)
+        excluded = set(excluded)
+
+        # available invigilators per department, least loaded first
+        offered = defaultdict(list)
+        for invigilator, department in self.staff.items():
+            if invigilator not in excluded and self.available(invigilator, start, end):
+                offered[department].append(invigilator)
+        for invigilators in offered.values():
+            invigilators.sort(key=lambda invigilator: (self.loads[invigilator], invigilator))
+
+        departments = list(offered)
+        room_ids = list(rooms)
+        source, sink = 0, 1
+        node_of_department = {department: 2 + i for i, department in enumerate(departments)}
+        node_of_room = {room: 2 + len(departments) + i for i, room in enumerate(room_ids)}
+        network = MinCostFlow(2 + len(departments) + len(room_ids))
+
+        required = 0
+        for room, (count, _) in rooms.items():
+            network.add_edge(node_of_room[room], sink, count, 0)
+            required += count
+
+        for department, invigilators in offered.items():
+            # no department needs to offer more staff than the slot requires
+            for invigilator in invigilators[:required]:
+                network.add_edge(source, node_of_department[department], 1, self.loads[invigilator])
+
+        arcs = {}
+        for department in departments:
+            for room, (count, room_departments) in rooms.items():
+                cost = 0 if department in room_departments else self.department_penalty
+                arcs[(department, room)] = network.add_edge(node_of_department[department], node_of_room[room],
+                                                            count, cost)
+
+        flow, _ = network.solve(source, sink)
+
+        # the flow through a department is its least loaded staff, hand them out to the rooms
+        assigned = defaultdict(list)
+        for department in departments:
+            invigilators = iter(offered[department])
+            for room in room_ids:
+                for _ in range(network.flow(arcs[(department, room)])):
+                    invigilator = next(invigilators)
+                    assigned[room].append(invigilator)
+                    self.loads[invigilator] += duration
+                    self.mark_busy(invigilator, start, end)
+
+        return dict(assigned), required - flow
@@ -0,0 +1,110 @@
+import time
+from collections import defaultdict
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from core import caching
+from core.models import Room
+from schedule.models import ExamSchedule
+from schedule.rooms import ExamRoom, ExamSection, RoomAllocator
+
+
+class Command(BaseCommand):
+    help = 'Allocate rooms to the exams of every timetable slot, using as few rooms as possible'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, default=None,
+                            help='Only allocate the slots of this day (YYYY-MM-DD)')
+        parser.add_argument('--time-limit', type=float, default=0.5,
+                            help='Seconds of exact search per slot (0 disables it)')
+        parser.add_argument('--node-limit', type=int, default=200000,
+                            help='Node limit of the exact search of a group of sections')
+        parser.add_argument('--dry-run', action='store_true', help='Allocate but do not save the rooms')
+
+    def handle(self, *args, **kwargs):
+        rooms = [ExamRoom(*row) for row in
+                 Room.objects.values_list('pk', 'capacity', 'room_type', 'campus', 'block')]
+        if not rooms:
+            raise CommandError("There are no rooms to allocate")
+
+        exams = ExamSchedule.objects.all()
+        if kwargs['date']:
+            exams = exams.filter(exam_date=kwargs['date'])
+
+        # the sections of every slot; a section split over rooms by an earlier run has one row per room
+        slots = defaultdict(dict)
+        saved = defaultdict(dict)  # section id -> {room id: (exam id, seats)}
+        removed = []
+        for pk, exam_date, exam_time, section_id, room_id, seats, duration, size, room_type in exams.values_list(
+                'pk', 'exam_date', 'exam_time', 'section_id', 'room_id', 'seats', 'duration',
+                'section__student_count', 'section__course__exam_room_type').iterator():
+            slots[(exam_date, exam_time)][section_id] = (ExamSection(section_id, size, room_type), duration)
+            if room_id in saved[section_id]:
+                # a second row of the same section and room, e.g. two rows still without a room
+                removed.append(pk)
+                continue
+            saved[section_id][room_id] = (pk, seats)
+        if not slots:
+            raise CommandError("There are no exams to allocate, run the timetable command first")
+
+        allocator = RoomAllocator(rooms, Room.EXAM_HALL_TYPES, time_limit=kwargs['time_limit'],
+                                  node_limit=kwargs['node_limit'])
+        started = time.monotonic()
+        # the rows are reconciled by (section, room): an exam staying in its room keeps its row, and
+        # with it its seats, bundle and absentees; only the rooms a section left or entered change
+        changed, new_exams = [], []
+        rooms_used = lower_bound = optimal = split = unseated = 0
+
+        for (exam_date, exam_time), sections in sorted(slots.items()):
+            allocation = allocator.allocate([section for section, _ in sections.values()])
+
+            seated = defaultdict(list)
+            for section_id, room_id, seats in allocation.placements:
+                seated[section_id].append((room_id, seats))
+            for section_id, (section, duration) in sections.items():
+                pieces = seated[section_id]
+                if section_id in allocation.unplaced or not pieces:
+                    # the students without a seat (or an empty section) keep an exam without a room
+                    pieces.append((None, allocation.unplaced.get(section_id, section.size)))
+                rows = saved[section_id]
+                for room_id, seats in pieces:
+                    if room_id not in rows:
+                        new_exams.append(ExamSchedule(section_id=section_id, room_id=room_id, seats=seats,
+                                                      exam_date=exam_date, exam_time=exam_time, duration=duration))
+                        continue
+                    pk, saved_seats = rows.pop(room_id)
+                    if seats != saved_seats:
+                        changed.append(ExamSchedule(pk=pk, seats=seats))
+                removed.extend(pk for pk, _ in rows.values())
+
+            rooms_used += allocation.rooms_used
+            lower_bound += allocation.lower_bound
+            optimal += allocation.optimal
+            split += allocation.split_sections
+            unseated += sum(allocation.unplaced.values())
+            if kwargs['verbosity'] > 1:
+                self.stdout.write(f"{exam_date} {exam_time:%H:%M}: {len(sections)} sections in "
+                                  f"{allocation.rooms_used} rooms (lower bound {allocation.lower_bound})")
+
+        self.stdout.write(f"Allocated {len(slots)} slots in {time.monotonic() - started:.1f}s: "
+                          f"{rooms_used:,} rooms (lower bound {lower_bound:,}, {optimal} slots optimal), "
+                          f"{split} sections split over several rooms")
+        if unseated:
+            self.stdout.write(self.style.WARNING(
+                f"{unseated:,} students have no seat, their exams are saved without a room"))
+
+        if kwargs['dry_run']:
+            return
+
+        with transaction.atomic():
+            # the seats, bundle and absentee links of a room the section left go with its row
+            ExamSchedule.objects.filter(pk__in=removed).delete()
+            ExamSchedule.objects.bulk_update(changed, ['seats'], batch_size=1000)
+            ExamSchedule.objects.bulk_create(new_exams, batch_size=1000)
+
+        # bulk_create/bulk_update send no signals
+        caching.invalidate()
+        self.stdout.write(self.style.SUCCESS(f"Saved the exam rooms: {len(new_exams):,} added, "
+                                             f"{len(changed):,} changed, {len(removed):,} removed"))
+        if new_exams or changed:
+            self.stdout.write("Run the assignseats command to seat the students of the new and changed rooms")
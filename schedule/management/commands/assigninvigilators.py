@@ -0,0 +1,118 @@
+import math
+import statistics
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Sum
+from core import caching
+from core.models import User, CourseRegistration
+from schedule.invigilation import InvigilationPlanner
+from schedule.models import ExamSchedule, Invigilation
+
+
+class Command(BaseCommand):
+    help = 'Assign invigilators to every room of the exam timetable, balancing their minutes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, default=None,
+                            help='Only assign the slots of this day (YYYY-MM-DD), the other days count '
+                                 'towards the workload')
+        parser.add_argument('--students-per-invigilator', type=int, default=30,
+                            help='Students one invigilator watches over, every room gets at least one')
+        parser.add_argument('--department-penalty', type=int, default=240,
+                            help='Extra minutes of workload worth trading for an invigilator of the '
+                                 'department of the course')
+        parser.add_argument('--dry-run', action='store_true', help='Assign but do not save the invigilations')
+
+    def handle(self, *args, **kwargs):
+        if kwargs['students_per_invigilator'] < 1:
+            raise CommandError("--students-per-invigilator must be at least 1")
+
+        staff = dict(User.objects.filter(is_invigilator=True, is_active=True).values_list('pk', 'department_id'))
+        if not staff:
+            raise CommandError("There are no invigilators")
+
+        exams = ExamSchedule.objects.filter(room__isnull=False)
+        invigilations = Invigilation.objects.all()
+        if kwargs['date']:
+            exams = exams.filter(exam_date=kwargs['date'])
+            invigilations = invigilations.filter(exam_date=kwargs['date'])
+
+        # rooms in use per slot: seated students and departments of the courses, plus who teaches the slot
+        slots = defaultdict(lambda: {'rooms': defaultdict(lambda: [0, set()]), 'duration': 0,
+                                     'lecturers': set(), 'sections': set()})
+        for exam_date, exam_time, duration, room_id, seats, section_id, department_id, lecturer_id in \
+                exams.values_list('exam_date', 'exam_time', 'duration', 'room_id', 'seats', 'section_id',
+                                  'section__course__department_id', 'section__lecturer_id').iterator():
+            slot = slots[(exam_date, exam_time)]
+            slot['rooms'][room_id][0] += seats or 0
+            slot['rooms'][room_id][1].add(department_id)
+            slot['duration'] = max(slot['duration'], duration)
+            slot['lecturers'].add(lecturer_id)
+            slot['sections'].add(section_id)
+        if not slots:
+            raise CommandError("There are no exams with a room, run the allocaterooms command first")
+
+        # staff registered as students in a section of the slot sit an exam themselves
+        sitting = defaultdict(set)
+        for student_id, section_id in (CourseRegistration.objects.filter(student_id__in=staff)
+                                       .values_list('student_id', 'section_id')):
+            sitting[section_id].add(student_id)
+
+        # the days not being assigned still count towards the workload
+        loads = dict(Invigilation.objects.exclude(pk__in=invigilations).values('invigilator')
+                     .annotate(minutes=Sum('duration')).order_by().values_list('invigilator', 'minutes'))
+        planner = InvigilationPlanner(staff, department_penalty=kwargs['department_penalty'], loads=loads)
+
+        # lecturers and sitting staff are busy for the whole exam, so they are not offered for any slot
+        # overlapping it, not only for the slot starting at the same time
+        for (exam_date, exam_time), slot in slots.items():
+            start = datetime.combine(exam_date, exam_time)
+            end = start + timedelta(minutes=slot['duration'])
+            busy = set(slot['lecturers'])
+            for section_id in slot['sections']:
+                busy |= sitting[section_id]
+            for invigilator in busy & staff.keys():
+                planner.mark_busy(invigilator, start, end)
+
+        started = time.monotonic()
+        new_invigilations = []
+        missing = matched = 0
+        for (exam_date, exam_time), slot in sorted(slots.items()):
+            rooms = {
+                room_id: (max(1, math.ceil(seats / kwargs['students_per_invigilator'])), departments)
+                for room_id, (seats, departments) in slot['rooms'].items()
+            }
+            assigned, slot_missing = planner.assign(datetime.combine(exam_date, exam_time), slot['duration'], rooms)
+            missing += slot_missing
+            for room_id, invigilators in assigned.items():
+                matched += sum(1 for invigilator in invigilators if staff[invigilator] in rooms[room_id][1])
+                new_invigilations.extend(
+                    Invigilation(invigilator_id=invigilator, room_id=room_id, exam_date=exam_date,
+                                 exam_time=exam_time, duration=slot['duration'])
+                    for invigilator in invigilators
+                )
+
+        minutes = [planner.loads[invigilator] for invigilator in staff]
+        self.stdout.write(
+            f"Assigned {len(new_invigilations):,} invigilations over {len(slots)} slots in "
+            f"{time.monotonic() - started:.1f}s, {matched:,} from the department of the course\n"
+            f"Minutes per invigilator: {min(minutes)} to {max(minutes)} "
+            f"(mean {statistics.mean(minutes):.0f}, std dev {statistics.pstdev(minutes):.0f})"
+        )
+        if missing:
+            self.stdout.write(self.style.WARNING(f"{missing:,} invigilators are missing, there is not "
+                                                 f"enough available staff in some slots"))
+
+        if kwargs['dry_run']:
+            return
+
+        with transaction.atomic():
+            invigilations.delete()
+            Invigilation.objects.bulk_create(new_invigilations, batch_size=1000)
+
+        # bulk_create sends no signals
+        caching.invalidate()
+        self.stdout.write(self.style.SUCCESS(f"Saved {len(new_invigilations):,} invigilations"))
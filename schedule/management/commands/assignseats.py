@@ -0,0 +1,77 @@
+import time
+from collections import defaultdict
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from core.models import CourseRegistration
+from schedule import seating
+from schedule.models import ExamSchedule, Seat
+
+
+class Command(BaseCommand):
+    help = 'Seat the students of every exam room, keeping the students of a course apart'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, default=None,
+                            help='Only seat the exams of this day (YYYY-MM-DD)')
+        parser.add_argument('--dry-run', action='store_true', help='Seat but do not save the seats')
+
+    def handle(self, *args, **kwargs):
+        exams = ExamSchedule.objects.filter(room__isnull=False)
+        if kwargs['date']:
+            exams = exams.filter(exam_date=kwargs['date'])
+
+        # the rooms of every section, a split section fills its rooms in turn
+        rows = defaultdict(list)
+        for exam_id, section_id, room_id, capacity, seats, code, exam_date, exam_time in (
+                exams.order_by('pk').values_list('pk', 'section_id', 'room_id', 'room__capacity', 'seats',
+                                                 'section__course__code', 'exam_date', 'exam_time').iterator()):
+            rows[section_id].append((exam_id, (exam_date, exam_time, room_id), capacity, seats, code))
+        if not rows:
+            raise CommandError("There are no exams with a room, run the allocaterooms command first")
+
+        students = defaultdict(list)
+        for section_id, student_id in (CourseRegistration.objects.filter(section_id__in=rows)
+                                       .order_by('student__username').values_list('section_id', 'student_id')
+                                       .iterator()):
+            students[section_id].append(student_id)
+
+        # {(date, time, room id): (capacity, {course: [(exam id, student id)]})}
+        rooms = {}
+        unseated = 0
+        for section_id, section_rows in rows.items():
+            section_students = students[section_id]
+            start = 0
+            for exam_id, key, capacity, seats, code in section_rows:
+                # rows allocated before the seat counts existed take the whole section
+                count = len(section_students) - start if seats is None else seats
+                _, groups = rooms.setdefault(key, (capacity, defaultdict(list)))
+                groups[code].extend((exam_id, student_id) for student_id in section_students[start:start + count])
+                start += count
+            unseated += max(0, len(section_students) - start)
+
+        started = time.monotonic()
+        new_seats = []
+        adjacent = overfull = 0
+        for capacity, groups in rooms.values():
+            seated = seating.assign(capacity, groups)
+            overfull += sum(len(group) for group in groups.values()) - len(seated)
+            adjacent += seating.adjacent_pairs(seated)
+            new_seats.extend(Seat(exam_id=exam_id, student_id=student_id, row=row, column=column)
+                             for row, column, _, (exam_id, student_id) in seated)
+
+        self.stdout.write(
+            f"Seated {len(new_seats):,} students in {len(rooms):,} rooms in {time.monotonic() - started:.1f}s, "
+            f"{adjacent:,} pairs of neighbours sit the same course"
+        )
+        if unseated or overfull:
+            self.stdout.write(self.style.WARNING(
+                f"{unseated + overfull:,} students have no seat, allocate the rooms again after registration changes"))
+
+        if kwargs['dry_run']:
+            return
+
+        with transaction.atomic():
+            Seat.objects.filter(exam__in=exams).delete()
+            Seat.objects.bulk_create(new_seats, batch_size=1000)
+        self.stdout.write(self.style.SUCCESS(f"Saved {len(new_seats):,} seats"))
@@ -0,0 +1,75 @@
+import random
+import time
+from django.core.management.base import BaseCommand
+from core.models import Room
+from schedule.rooms import ExamRoom, ExamSection, RoomAllocator
+
+# (room type, capacity, rooms per block) of the synthetic room inventory
+BLOCK_LAYOUT = (
+    (Room.CLASS_ROOM, 30, 6),
+    (Room.CLASS_ROOM, 40, 6),
+    (Room.CLASS_ROOM, 60, 3),
+    (Room.LECTURE_HALL, 120, 1),
+    (Room.COMPUTER_LAB, 25, 2),
+)
+
+
+class Command(BaseCommand):
+    help = 'Time the room allocator on a synthetic room inventory and exam week (the database is not used)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--blocks', type=int, default=4, help='Blocks per campus')
+        parser.add_argument('--slots', type=int, default=15, help='Exam slots (5 days of 3 sessions by default)')
+        parser.add_argument('--sections', type=int, default=40, help='Average sections sitting a slot')
+        parser.add_argument('--practical', type=float, default=0.1,
+                            help='Share of the sections needing a computer lab')
+        parser.add_argument('--time-limit', type=float, default=0.5,
+                            help='Seconds of exact search per slot (0 disables it)')
+        parser.add_argument('--node-limit', type=int, default=200000,
+                            help='Node limit of the exact search of a group of sections')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **kwargs):
+        rng = random.Random(kwargs['seed'])
+        rooms = self.room_inventory(kwargs['blocks'])
+        slots = [self.slot_sections(rng, kwargs['sections'], kwargs['practical']) for _ in range(kwargs['slots'])]
+        seats = sum(room.capacity for room in rooms)
+        self.stdout.write(f"{len(rooms)} rooms ({seats:,} seats) on {len(Room.CAMPUS_CHOICES)} campuses, "
+                          f"{len(slots)} slots, {sum(len(sections) for sections in slots):,} sections")
+
+        for label, time_limit in (('heuristic', 0), ('with exact fallback', kwargs['time_limit'])):
+            allocator = RoomAllocator(rooms, Room.EXAM_HALL_TYPES, time_limit=time_limit,
+                                      node_limit=kwargs['node_limit'])
+            started = time.perf_counter()
+            allocations = [allocator.allocate(sections) for sections in slots]
+            elapsed = time.perf_counter() - started
+
+            self.stdout.write(
+                f"  {label:<20} {elapsed * 1000:9.1f} ms, "
+                f"{sum(allocation.rooms_used for allocation in allocations):,} rooms "
+                f"(lower bound {sum(allocation.lower_bound for allocation in allocations):,}), "
+                f"{sum(allocation.optimal for allocation in allocations)}/{len(slots)} slots optimal "
+                f"(exact search in {sum(allocation.searched for allocation in allocations)}), "
+                f"{sum(allocation.split_sections for allocation in allocations)} split sections, "
+                f"{sum(sum(allocation.unplaced.values()) for allocation in allocations):,} students unseated"
+            )
+
+    @staticmethod
+    def room_inventory(blocks):
+        rooms = []
+        for campus, _ in Room.CAMPUS_CHOICES:
+            for block in range(blocks):
+                for room_type, capacity, count in BLOCK_LAYOUT:
+                    rooms.extend(ExamRoom(len(rooms), capacity, room_type, campus, f"B{block}")
+                                 for _ in range(count))
+        return rooms
+
+    @staticmethod
+    def slot_sections(rng, average, practical):
+        sections = []
+        for i in range(max(1, round(rng.gauss(average, average / 4)))):
+            room_type = Room.COMPUTER_LAB if rng.random() < practical else None
+            # mostly small sections and the odd large one that needs splitting
+            size = rng.randint(15, 45) if room_type else int(rng.lognormvariate(3.3, 0.6)) + 5
+            sections.append(ExamSection(i, size, room_type))
+        return sections
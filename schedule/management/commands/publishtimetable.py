@@ -0,0 +1,18 @@
+import time
+from django.core.management.base import BaseCommand
+from schedule import snapshots
+
+
+class Command(BaseCommand):
+    help = 'Publish the exam timetable as per student, lecturer, room and day snapshot files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--root', type=str, default=None,
+                            help='Snapshot directory (default: settings.TIMETABLE_SNAPSHOT_ROOT)')
+
+    def handle(self, *args, **kwargs):
+        started = time.monotonic()
+        version, written, linked = snapshots.publish(kwargs['root'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Published version {version} in {time.monotonic() - started:.1f}s: {written:,} slices written, "
+            f"{linked:,} unchanged slices reused"))
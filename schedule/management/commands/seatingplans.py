@@ -0,0 +1,29 @@
+import time
+from datetime import date
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from schedule import sheets
+
+
+class Command(BaseCommand):
+    help = 'Write the attendance sheets and door lists of every exam room to a ZIP archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', type=str, help='The ZIP archive to write')
+        parser.add_argument('--date', type=date.fromisoformat, default=None,
+                            help='Only the rooms of this day (YYYY-MM-DD)')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Processes rendering the sheets (default: one per CPU)')
+
+    def handle(self, *args, **kwargs):
+        started = time.monotonic()
+        plans = sheets.collect(kwargs['date'])
+        if not plans:
+            raise CommandError("There are no seats, run the assignseats command first")
+
+        with open(Path(kwargs['output']), 'wb') as f:
+            for chunk in sheets.stream_zip(plans, kwargs['workers']):
+                f.write(chunk)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {len(plans) * 2:,} sheets of {len(plans):,} rooms in {time.monotonic() - started:.1f}s"))
@@ -0,0 +1,125 @@
+from datetime import date, datetime, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Sum
+from core import caching
+from core.models import Room, Section
+from schedule.conflicts import get_matrix
+from schedule.models import ExamSchedule, Seat
+from schedule.timetabling import Timetabler
+
+
+class Command(BaseCommand):
+    help = 'Assign an exam slot to every course so that no student has two exams at once'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', type=date.fromisoformat, required=True,
+                            help='First exam day (YYYY-MM-DD)')
+        parser.add_argument('--days', type=int, default=10, help='Number of exam days')
+        parser.add_argument('--sessions', type=str, default='08:00,11:00,14:00',
+                            help='Comma separated start times of the daily exam sessions')
+        parser.add_argument('--duration', type=int, default=120, help='Exam duration in minutes')
+        parser.add_argument('--weekend', type=str, default='4,5',
+                            help='Comma separated weekdays without exams (Monday is 0)')
+        parser.add_argument('--capacity', type=int, default=None,
+                            help='Seats available per session (default: the capacity of all rooms)')
+        parser.add_argument('--time-budget', type=float, default=50.0,
+                            help='Seconds the solver may spend improving the timetable')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed of the local search')
+        parser.add_argument('--dry-run', action='store_true', help='Solve but do not save the timetable')
+
+    def handle(self, *args, **kwargs):
+        slots = self.exam_slots(kwargs['start_date'], kwargs['days'], kwargs['sessions'], kwargs['weekend'])
+        capacity = kwargs['capacity']
+        if capacity is None:
+            capacity = Room.objects.aggregate(seats=Sum('capacity'))['seats']
+
+        # sections grouped by course, every section of a course sits the same exam
+        sections = {}
+        for section_id, course_id in Section.objects.values_list('pk', 'course_id').iterator():
+            sections.setdefault(course_id, []).append(section_id)
+        if not sections:
+            raise CommandError("There are no sections to schedule")
+
+        # shared students per course pair from the (incrementally refreshed) conflict matrix
+        graph, sizes = get_matrix().graph()
+        self.stdout.write(f"{len(sections):,} courses, {sum(sizes.values()):,} registrations, "
+                          f"{sum(len(edges) for edges in graph.values()) // 2:,} conflicting course pairs, "
+                          f"{len(slots)} slots")
+
+        slot_days = [slot_date.toordinal() for slot_date, _ in slots]
+        timetabler = Timetabler(graph, sorted(sections), slot_days, sizes=sizes, slot_capacity=capacity,
+                                seed=kwargs['seed'])
+        result = timetabler.solve(time_budget=kwargs['time_budget'])
+
+        self.stdout.write(f"Solved in {result.elapsed:.1f}s ({result.iterations:,} local search moves): "
+                          f"{result.clashes} clashes, {result.back_to_back} back-to-back exams, "
+                          f"{result.overflow} seats over capacity")
+        if not result.feasible:
+            self.stdout.write(self.style.WARNING(
+                "The timetable is not clash free, consider more days/sessions or a larger time budget"))
+
+        if kwargs['dry_run']:
+            return
+
+        # the saved rows of a section are updated in place. A section moved to another slot loses its
+        # rooms and seats (they may be taken in the new slot), allocaterooms and assignseats give it new
+        # ones; its first row is kept for the bundles and absentees linked to it
+        saved = {}
+        for pk, section_id, exam_date, exam_time, duration in ExamSchedule.objects.order_by('pk').values_list(
+                'pk', 'section_id', 'exam_date', 'exam_time', 'duration').iterator():
+            saved.setdefault(section_id, []).append((pk, (exam_date, exam_time, duration)))
+
+        changed, moved, new_exams, removed = [], [], [], []
+        for course_id, slot in result.assignment.items():
+            exam_date, exam_time = slots[slot]
+            for section_id in sections[course_id]:
+                rows = saved.pop(section_id, None)
+                if rows is None:
+                    new_exams.append(ExamSchedule(section_id=section_id, exam_date=exam_date, exam_time=exam_time,
+                                                  duration=kwargs['duration']))
+                elif any(current[:2] != (exam_date, exam_time) for _, current in rows):
+                    moved.append(ExamSchedule(pk=rows[0][0], exam_date=exam_date, exam_time=exam_time,
+                                              duration=kwargs['duration'], room=None, seats=None))
+                    removed.extend(pk for pk, _ in rows[1:])
+                else:
+                    changed.extend(ExamSchedule(pk=pk, duration=kwargs['duration'])
+                                   for pk, current in rows if current[2] != kwargs['duration'])
+        # the rows of sections left out of the timetable
+        removed.extend(pk for rows in saved.values() for pk, _ in rows)
+
+        with transaction.atomic():
+            ExamSchedule.objects.filter(pk__in=removed).delete()
+            Seat.objects.filter(exam_id__in=[exam.pk for exam in moved]).delete()
+            ExamSchedule.objects.bulk_update(moved, ['exam_date', 'exam_time', 'duration', 'room', 'seats'],
+                                             batch_size=1000)
+            ExamSchedule.objects.bulk_update(changed, ['duration'], batch_size=1000)
+            ExamSchedule.objects.bulk_create(new_exams, batch_size=1000)
+
+        # bulk_create/bulk_update send no signals
+        caching.invalidate()
+        self.stdout.write(self.style.SUCCESS(f"Saved the section exams: {len(new_exams):,} added, "
+                                             f"{len(moved):,} moved to another slot, {len(removed):,} removed"))
+        if new_exams or moved:
+            self.stdout.write("Run the allocaterooms command to allocate the rooms of the new and moved sections")
+
+    @staticmethod
+    def exam_slots(start_date, days, sessions, weekend):
+        """The (date, time) slots of the exam period in chronological order."""
+        try:
+            times = sorted(datetime.strptime(value.strip(), '%H:%M').time() for value in sessions.split(','))
+            weekend = {int(value) for value in weekend.split(',') if value.strip()}
+        except ValueError as e:
+            raise CommandError(e)
+
+        if days < 1 or not times or len(weekend) >= 7:
+            raise CommandError("At least one exam day and one session are needed")
+
+        slots = []
+        day = start_date
+        while len(slots) < days * len(times):
+            if day.weekday() not in weekend:
+                slots.extend((day, session) for session in times)
+            day += timedelta(days=1)
+
+        return slots
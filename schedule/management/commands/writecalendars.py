@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from schedule import calendars, snapshots
+
+
+class Command(BaseCommand):
+    help = 'Write the iCalendar feeds of every student, lecturer and room of the published timetable to files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', type=str, default=None,
+                            help='Feed directory (default: settings.CALENDAR_FEED_ROOT)')
+
+    def handle(self, *args, **kwargs):
+        current = snapshots.current_manifest()
+        if current is None:
+            raise CommandError("The timetable is not published yet, run the publishtimetable command first")
+        _, manifest = current
+
+        root = Path(kwargs['output'] or settings.CALENDAR_FEED_ROOT)
+        root.mkdir(parents=True, exist_ok=True)
+
+        # digests of the feeds on disk, unchanged feeds are not written again
+        index_path = root / 'digests.json'
+        try:
+            index = json.loads(index_path.read_bytes())
+        except (FileNotFoundError, ValueError):
+            index = {}
+
+        started = time.monotonic()
+        written = unchanged = removed = 0
+        new_index = {}
+        for kind in calendars.FEED_KINDS:
+            new_index[kind] = {}
+            for key, digest in manifest['slices'][kind].items():
+                path = root / kind / key / f"{calendars.feed_signature(kind, key)}.ics"
+                new_index[kind][key] = digest
+                if index.get(kind, {}).get(key) == digest and path.exists():
+                    unchanged += 1
+                    continue
+
+                lines, snapshot = calendars.read_feed(kind, key)
+                self.write(path, lines, snapshot.modified.timestamp())
+                written += 1
+
+            # feeds of users and rooms no longer in the timetable
+            if (root / kind).exists():
+                for path in (root / kind).iterdir():
+                    if path.name not in new_index[kind]:
+                        shutil.rmtree(path, ignore_errors=True)
+                        removed += 1
+
+        index_path.write_text(json.dumps(new_index))
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written:,} feeds in {time.monotonic() - started:.1f}s, {unchanged:,} unchanged, "
+            f"{removed:,} removed"))
+
+    @staticmethod
+    def write(path, lines, modified):
+        """Replace the feed in one step, any older feed of the key (other signature) is removed."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.feed-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                f.writelines(lines)
+            # the web server sends the file time as Last-Modified
+            os.utime(tmp_path, (modified, modified))
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        for other in path.parent.glob('*.ics'):
+            if other != path:
+                other.unlink()
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:02
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('core', '0007_section_student_count_courseregistration_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('exam_date', models.DateField()),
+                ('exam_time', models.TimeField()),
+                ('duration', models.PositiveIntegerField(default=120, help_text='Exam duration in minutes', validators=[django.core.validators.MinValueValidator(1)])),
+                ('room', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='exams', to='core.room')),
+                ('section', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exams', to='core.section')),
+            ],
+            options={
+                'ordering': ['exam_date', 'exam_time'],
+                'indexes': [models.Index(fields=['exam_date', 'exam_time'], name='exam_slot_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examschedule',
+            name='seats',
+            field=models.PositiveIntegerField(blank=True, help_text='Students of the section seated in this room', null=True),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:10
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_course_exam_room_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('schedule', '0002_examschedule_seats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Invigilation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('exam_date', models.DateField()),
+                ('exam_time', models.TimeField()),
+                ('duration', models.PositiveIntegerField(default=120, help_text='Invigilation duration in minutes', validators=[django.core.validators.MinValueValidator(1)])),
+                ('invigilator', models.ForeignKey(limit_choices_to={'is_invigilator': True}, on_delete=django.db.models.deletion.CASCADE, related_name='invigilations', to=settings.AUTH_USER_MODEL)),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='invigilations', to='core.room')),
+            ],
+            options={
+                'ordering': ['exam_date', 'exam_time'],
+                'indexes': [models.Index(fields=['exam_date', 'exam_time'], name='invigilation_slot_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='invigilation',
+            constraint=models.UniqueConstraint(fields=('invigilator', 'exam_date', 'exam_time'), name='unique_invigilation_invigilator_slot'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_course_exam_room_type'),
+        ('schedule', '0003_invigilation_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Seat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row', models.PositiveSmallIntegerField()),
+                ('column', models.PositiveSmallIntegerField()),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_assignments', to='schedule.examschedule')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seats', to='core.student')),
+            ],
+            options={
+                'ordering': ['exam', 'row', 'column'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='seat',
+            constraint=models.UniqueConstraint(fields=('exam', 'student'), name='unique_seat_exam_student'),
+        ),
+    ]
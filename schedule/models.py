@@ -1,3 +1,80 @@
 from django.db import models
+from django.core.validators import MinValueValidator
 
-# Create your models here.
+
+class ExamSchedule(models.Model):
+    """
+    The exam of one section: when it is sat and (once rooms are allocated)
+    where. All the sections of a course sit their exam in the same slot. A
+    section too large for one room has one row per room, `seats` tells how
+    many of its students sit in each.
+    """
+    section = models.ForeignKey('core.Section', on_delete=models.CASCADE, related_name='exams')
+    room = models.ForeignKey('core.Room', on_delete=models.SET_NULL, null=True, blank=True,
+                             related_name='exams')
+    exam_date = models.DateField()
+    exam_time = models.TimeField()
+    duration = models.PositiveIntegerField(default=120, validators=[MinValueValidator(1)],
+                                           help_text='Exam duration in minutes')
+    seats = models.PositiveIntegerField(null=True, blank=True,
+                                        help_text='Students of the section seated in this room')
+
+    class Meta:
+        ordering = ['exam_date', 'exam_time']
+        indexes = [
+            # everything sat in a slot (room allocation, invigilation, daily lists)
+            models.Index(fields=['exam_date', 'exam_time'], name='exam_slot_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.section} @ {self.exam_date} {self.exam_time:%H:%M}"
+
+
+class Invigilation(models.Model):
+    """An invigilator watching over the exams sat in a room during an exam slot."""
+    invigilator = models.ForeignKey('core.User', on_delete=models.CASCADE, related_name='invigilations',
+                                    limit_choices_to={'is_invigilator': True})
+    room = models.ForeignKey('core.Room', on_delete=models.CASCADE, related_name='invigilations')
+    exam_date = models.DateField()
+    exam_time = models.TimeField()
+    duration = models.PositiveIntegerField(default=120, validators=[MinValueValidator(1)],
+                                           help_text='Invigilation duration in minutes')
+
+    class Meta:
+        ordering = ['exam_date', 'exam_time']
+        # one room at a time; the index also serves the per-invigilator schedule
+        constraints = [
+            models.UniqueConstraint(fields=['invigilator', 'exam_date', 'exam_time'],
+                                    name='unique_invigilation_invigilator_slot')
+        ]
+        indexes = [
+            models.Index(fields=['exam_date', 'exam_time'], name='invigilation_slot_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.invigilator.username} in {self.room} @ {self.exam_date} {self.exam_time:%H:%M}"
+
+
+class Seat(models.Model):
+    """
+    Where a student sits their exam: a row and column of the room's seat
+    grid (see schedule.seating). Rebuilt by the assignseats command.
+    """
+    exam = models.ForeignKey('ExamSchedule', on_delete=models.CASCADE, related_name='seat_assignments')
+    student = models.ForeignKey('core.Student', on_delete=models.CASCADE, related_name='seats')
+    row = models.PositiveSmallIntegerField()
+    column = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ['exam', 'row', 'column']
+        # the index also serves the seating list of an exam
+        constraints = [
+            models.UniqueConstraint(fields=['exam', 'student'], name='unique_seat_exam_student')
+        ]
+
+    def __str__(self):
+        return f"{self.student.username} at {self.label}"
+
+    @property
+    def label(self):
+        return f"R{self.row}-S{self.column}"
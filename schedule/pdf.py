@@ -0,0 +1,72 @@
+import zlib
+
+# A minimal PDF writer for the printed exam sheets: pages of text in the
+# standard Helvetica fonts and straight lines, nothing else. The standard
+# fonts need no embedding, so the documents stay small and are rendered
+# without any PDF library.
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+
+FONTS = {'regular': 'F1', 'bold': 'F2'}
+
+# average glyph width of Helvetica as a fraction of the font size, to cut overlong cells
+CHAR_WIDTH = 0.5
+
+
+def escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def fit(text, width, size):
+    """text cut to about width points at the given font size."""
+    limit = max(1, int(width / (size * CHAR_WIDTH)))
+    return text if len(text) <= limit else text[:limit - 1] + '…'
+
+
+class Document:
+    def __init__(self, title=''):
+        self.title = title
+        self.pages = []
+        self.page = None
+
+    def add_page(self):
+        self.page = []
+        self.pages.append(self.page)
+
+    def text(self, x, y, text, size=10, font='regular'):
+        """Text with its baseline at (x, y), y from the top of the page."""
+        self.page.append(f"BT /{FONTS[font]} {size} Tf {x:.1f} {PAGE_HEIGHT - y:.1f} Td ({escape(text)}) Tj ET")
+
+    def line(self, x1, y1, x2, y2, width=0.5):
+        self.page.append(f"{width} w {x1:.1f} {PAGE_HEIGHT - y1:.1f} m {x2:.1f} {PAGE_HEIGHT - y2:.1f} l S")
+
+    def render(self):
+        """The document as PDF bytes, the page contents are compressed."""
+        objects = [
+            b'<< /Type /Catalog /Pages 2 0 R >>',
+            None,  # the page tree, once the page objects are numbered
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>',
+            b'<< /Title (' + escape(self.title).encode('cp1252', 'replace') + b') >>',
+        ]
+        kids = []
+        for page in self.pages:
+            content = zlib.compress('\n'.join(page).encode('cp1252', 'replace'))
+            objects.append(b'<< /Length %d /Filter /FlateDecode >>\nstream\n' % len(content) + content
+                           + b'\nendstream')
+            objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R '
+                           b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> >>'
+                           % (PAGE_WIDTH, PAGE_HEIGHT, len(objects)))
+            kids.append(b'%d 0 R' % len(objects))
+        objects[1] = b'<< /Type /Pages /Kids [' + b' '.join(kids) + b'] /Count %d >>' % len(kids)
+
+        out = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(len(out))
+            out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+        xref = len(out)
+        out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+        out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+        out += b'trailer\n<< /Size %d /Root 1 0 R /Info 5 0 R >>\nstartxref\n%d\n%%EOF\n' % (len(objects) + 1, xref)
+        return bytes(out)
@@ -0,0 +1,343 @@
+import time
+from collections import defaultdict, namedtuple
+
+# Exam room allocation: seat the sections sitting an exam slot in rooms.
+#
+# It is a bin packing problem with the rooms (of different sizes) as the
+# bins, the goal is to use as few rooms as possible:
+#
+#   - a section only goes to rooms of the type its course requires, or to
+#     classrooms and lecture halls when it requires none
+#   - a room takes several sections up to its capacity
+#   - a section only spreads over several rooms when it fits in none of
+#     them, those rooms are on one campus and preferably in one block
+#
+# RoomAllocator runs a best fit decreasing heuristic and, where it does not
+# reach the lower bound, a branch and bound search bounded by a node and a
+# time limit. The sections whose room types do not overlap (say the ones
+# needing a computer lab) share no room, each such group is searched on its
+# own. This module does not touch the database, see the `allocaterooms`
+# command.
+
+ExamRoom = namedtuple('ExamRoom', 'id capacity room_type campus block')
+ExamSection = namedtuple('ExamSection', 'id size room_type')  # room_type None: any exam hall
+
+
+class SearchLimit(Exception):
+    pass
+
+
+class Allocation:
+    def __init__(self, placements, unplaced, lower_bound, optimal=False):
+        self.placements = placements  # [(section id, room id, seats)]
+        self.unplaced = unplaced  # {section id: students without a seat}
+        self.lower_bound = lower_bound  # no allocation uses fewer rooms
+        self.optimal = optimal  # the lower bound is reached, or the exact search found no better allocation
+        self.searched = False  # the exact search ran on some of the sections
+
+    @property
+    def rooms_used(self):
+        return len({room for _, room, _ in self.placements})
+
+    @property
+    def split_sections(self):
+        rooms_of = defaultdict(int)
+        for section, _, _ in self.placements:
+            rooms_of[section] += 1
+        return sum(1 for rooms in rooms_of.values() if rooms > 1)
+
+
+class RoomAllocator:
+    """
+    rooms are ExamRoom tuples, exam_hall_types the room types of the rooms
+    sections without a required type can use.
+
+        allocator = RoomAllocator(rooms, exam_hall_types=Room.EXAM_HALL_TYPES)
+        allocation = allocator.allocate(sections)
+    """
+
+    def __init__(self, rooms, exam_hall_types, time_limit=0.5, node_limit=200000):
+        # largest first, the order the heuristic opens new rooms in
+        self.rooms = sorted(rooms, key=lambda room: (-room.capacity, room.campus, room.block, room.id))
+        self.exam_hall_types = frozenset(exam_hall_types)
+        self.time_limit = time_limit  # seconds of exact search per slot, 0 disables it
+        self.node_limit = node_limit  # nodes per group of sections
+
+    def allowed(self, section):
+        return self.exam_hall_types if section.room_type is None else frozenset([section.room_type])
+
+    def allocate(self, sections):
+        sections = [section for section in sections if section.size > 0]
+        lower_bound = self.lower_bound(sections)
+        allocation = self.heuristic(sections, lower_bound)
+        if allocation.optimal or allocation.unplaced or not self.time_limit:
+            return allocation
+
+        # the groups share no room, the heuristic placements of each are improved on their own
+        deadline = time.monotonic() + self.time_limit
+        groups = [members for _, members in self.groups(sections)]
+        group_of = {section.id: number for number, members in enumerate(groups) for section in members}
+
+        placements, optimal = [], True
+        for number, members in enumerate(groups):
+            incumbent = Allocation([placement for placement in allocation.placements
+                                    if group_of[placement[0]] == number], {}, self.lower_bound(members))
+            if incumbent.rooms_used > incumbent.lower_bound:
+                allocation.searched = True
+                incumbent = self.search(members, incumbent, deadline) or incumbent
+            else:
+                incumbent.optimal = True
+            placements.extend(incumbent.placements)
+            optimal = optimal and incumbent.optimal
+
+        result = Allocation(placements, {}, lower_bound, optimal)
+        result.searched = allocation.searched
+        return result
+
+    def groups(self, sections):
+        """Split the sections into groups whose room types do not overlap: [(room types, sections)]."""
+        groups = []
+        for section in sections:
+            types = self.allowed(section)
+            overlapping = [group for group in groups if group[0] & types]
+            merged = (types.union(*(group[0] for group in overlapping)),
+                      [section] + [member for group in overlapping for member in group[1]])
+            groups = [group for group in groups if not group[0] & types] + [merged]
+        return groups
+
+    def lower_bound(self, sections):
+        """
+        Fewest rooms that could hold the students, filling the largest rooms
+        first. Sections whose room types overlap are bounded together.
+        """
+        bound = 0
+        for types, members in self.groups(sections):
+            seats = defaultdict(int)
+            for section in members:
+                seats[self.allowed(section)] += section.size
+            bound += max([self.rooms_needed(sum(seats.values()), types)]
+                         + [self.rooms_needed(count, member) for member, count in seats.items()])
+        return bound
+
+    def rooms_needed(self, seats, types):
+        count = 0
+        for room in self.rooms:
+            if seats <= 0:
+                break
+            if room.room_type in types:
+                seats -= room.capacity
+                count += 1
+        return count
+
+    # heuristic
+
+    def heuristic(self, sections, lower_bound):
+        """
+        Best fit decreasing: the most constrained and largest sections first,
+        each into the fullest room in use it fits in, else into the largest
+        unused room (its spare seats take the smaller sections that follow),
+        else spread over the rooms of one block or campus. The emptiest rooms
+        are then closed when their sections fit in the spare seats of others.
+        """
+        free = {}  # room index -> free seats, for the rooms in use
+        contents = defaultdict(list)  # room index -> [(section, seats)]
+        unplaced = {}
+
+        for section in sorted(sections, key=lambda section: (section.room_type is None, -section.size, section.id)):
+            types = self.allowed(section)
+            candidates = [i for i, room in enumerate(self.rooms)
+                          if room.room_type in types and free.get(i, room.capacity) > 0]
+
+            in_use = [i for i in candidates if i in free and free[i] >= section.size]
+            unused = [i for i in candidates if i not in free and self.rooms[i].capacity >= section.size]
+            if in_use:
+                chosen = [min(in_use, key=lambda i: (free[i], i))]
+            elif unused:
+                chosen = unused[:1]
+            else:
+                chosen = self.spread(section.size, candidates, free)
+
+            seats = section.size
+            for i in chosen:
+                taken = min(seats, free.get(i, self.rooms[i].capacity))
+                free[i] = free.get(i, self.rooms[i].capacity) - taken
+                contents[i].append((section, taken))
+                seats -= taken
+            if seats:
+                unplaced[section.id] = seats
+
+        self.close_rooms(free, contents)
+
+        placements = [(section.id, self.rooms[i].id, seats)
+                      for i, seated in sorted(contents.items()) for section, seats in seated]
+        allocation = Allocation(placements, unplaced, lower_bound)
+        allocation.optimal = not unplaced and allocation.rooms_used == lower_bound
+        return allocation
+
+    def close_rooms(self, free, contents):
+        """Empty the least used rooms into the free seats of the other rooms in use, where possible."""
+        rooms_of = defaultdict(int)
+        for seated in contents.values():
+            for section, _ in seated:
+                rooms_of[section.id] += 1
+
+        for i in sorted(free, key=lambda i: (self.rooms[i].capacity - free[i], i)):
+            # pieces of a split section stay where they are, moving them could break up its campus
+            if any(rooms_of[section.id] > 1 for section, _ in contents[i]):
+                continue
+
+            trial, moves = {j: seats for j, seats in free.items() if j != i}, []
+            for section, seats in sorted(contents[i], key=lambda item: -item[1]):
+                types = self.allowed(section)
+                targets = [j for j, spare in trial.items() if spare >= seats and self.rooms[j].room_type in types]
+                if not targets:
+                    break
+                j = min(targets, key=lambda j: (trial[j], j))
+                trial[j] -= seats
+                moves.append((j, section, seats))
+            else:
+                for j, section, seats in moves:
+                    contents[j].append((section, seats))
+                free.clear()
+                free.update(trial)
+                del contents[i]
+
+    def spread(self, seats, candidates, free):
+        """The fewest rooms (largest free first) of one block, else of one campus, to seat a large section."""
+        def free_seats(i):
+            return free.get(i, self.rooms[i].capacity)
+
+        def take(group):
+            chosen, left = [], seats
+            for i in sorted(group, key=lambda i: (-free_seats(i), i)):
+                if left <= 0:
+                    break
+                chosen.append(i)
+                left -= free_seats(i)
+            return chosen, left
+
+        options = []
+        for key in (lambda room: (room.campus, room.block), lambda room: room.campus):
+            groups = defaultdict(list)
+            for i in candidates:
+                groups[key(self.rooms[i])].append(i)
+            options = [take(group) for group in groups.values()]
+            fitting = [chosen for chosen, left in options if left <= 0]
+            if fitting:
+                return min(fitting, key=lambda chosen: (len(chosen), sum(free_seats(i) for i in chosen)))
+
+        # fits on no campus, seat as many as possible on one
+        return min(options, key=lambda option: (option[1], len(option[0])))[0] if options else []
+
+    # exact search
+
+    def search(self, sections, incumbent, deadline=None):
+        """
+        Branch and bound on the number of rooms, then on the extra blocks a
+        split section uses. A section goes whole into a room in use or into a
+        new room; when a new room is too small it is filled and the rest of
+        the section continues on the same campus. Rooms that only differ by
+        their id are tried once.
+
+        Returns the best allocation found when it beats the incumbent or the
+        search completes (no allocation of this kind uses fewer rooms), None
+        when the node limit or the deadline (a time.monotonic() value) is
+        reached without an improvement.
+        """
+        items = sorted(sections, key=lambda section: (section.room_type is None, -section.size, section.id))
+        rooms = self.rooms
+        index_of = {room.id: i for i, room in enumerate(rooms)}
+        # one room more always outweighs any block spread
+        room_weight = len(items) * len(rooms) + 1
+
+        blocks_of = defaultdict(set)
+        for section, room, _ in incumbent.placements:
+            room = rooms[index_of[room]]
+            blocks_of[section].add((room.campus, room.block))
+        spread = sum(len(blocks) - 1 for blocks in blocks_of.values())
+
+        best = {'cost': incumbent.rooms_used * room_weight + spread, 'placements': None}
+        target = incumbent.lower_bound * room_weight
+        remaining = [sum(section.size for section in items[k:]) for k in range(len(items) + 1)]
+        usable = frozenset().union(*(self.allowed(section) for section in items))
+        largest = max((room.capacity for room in rooms if room.room_type in usable), default=1)
+        free, placed = {}, []
+        nodes, limited = [0], [False]
+
+        def place(k, seats, campus, blocks, spread):
+            if k == len(items):
+                cost = len(free) * room_weight + spread
+                if cost < best['cost']:
+                    best['cost'], best['placements'] = cost, list(placed)
+                    if cost <= target:
+                        raise SearchLimit  # nothing can do better
+                return
+
+            nodes[0] += 1
+            if nodes[0] > self.node_limit or (deadline is not None and not nodes[0] % 1000
+                                              and time.monotonic() > deadline):
+                limited[0] = True
+                raise SearchLimit
+
+            # the seats still to place beyond the free ones need new rooms
+            missing = seats + remaining[k + 1] - sum(free.values())
+            new_rooms = max(0, -(-missing // largest))
+            if (len(free) + new_rooms) * room_weight + spread >= best['cost']:
+                return
+
+            section = items[k]
+            types = self.allowed(section)
+
+            def descend(i, taken):
+                room = rooms[i]
+                block = (room.campus, room.block)
+                extra = 1 if blocks and block not in blocks else 0
+                placed.append((section.id, room.id, taken))
+                if taken < seats:
+                    place(k, seats - taken, room.campus, blocks | {block}, spread + extra)
+                else:
+                    place(k + 1, items[k + 1].size if k + 1 < len(items) else 0, None, frozenset(), spread + extra)
+                placed.pop()
+
+            # whole into a room in use, fullest first
+            tried = set()
+            for i in sorted(free, key=lambda i: (free[i], i)):
+                room = rooms[i]
+                signature = (room.room_type, room.campus, room.block, free[i])
+                if (free[i] < seats or room.room_type not in types or signature in tried
+                        or (campus is not None and room.campus != campus)):
+                    continue
+                tried.add(signature)
+                free[i] -= seats
+                descend(i, seats)
+                free[i] += seats
+
+            # into a new room, filling it when the section is larger
+            tried = set()
+            for i, room in enumerate(rooms):
+                signature = (room.room_type, room.campus, room.block, room.capacity)
+                if (i in free or room.room_type not in types or signature in tried
+                        or (campus is not None and room.campus != campus)):
+                    continue
+                tried.add(signature)
+                taken = min(seats, room.capacity)
+                free[i] = room.capacity - taken
+                descend(i, taken)
+                del free[i]
+
+        try:
+            if items:
+                place(0, items[0].size, None, frozenset(), 0)
+        except SearchLimit:
+            pass
+        completed = not limited[0]
+
+        if best['placements'] is None:
+            if completed:
+                incumbent.optimal = True
+                return incumbent
+            return None
+
+        allocation = Allocation(best['placements'], {}, incumbent.lower_bound)
+        allocation.optimal = completed
+        return allocation
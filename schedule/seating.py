@@ -0,0 +1,59 @@
+import math
+
+# Exam seating: place the students sitting in a room on its seat grid.
+#
+# The grid is derived from the room capacity (rooms are a bit wider than
+# deep) and seats are numbered from 1, row 1 at the front. Students of the
+# same course are kept apart:
+#
+#   - when they fill at most half of the room, only every other seat (a
+#     checkerboard) is used, so nobody has a neighbour in front, behind or
+#     beside them
+#   - otherwise the seats are filled row by row, each one with the course
+#     with the most students left that differs from the neighbours to the
+#     left and in front, so courses alternate as long as there are several
+#
+# This module does not touch the database, see the `assignseats` command.
+
+
+def grid(capacity):
+    """(rows, columns) of the seat grid of a room."""
+    columns = max(1, round(math.sqrt(capacity * 4 / 3)))
+    return math.ceil(capacity / columns), columns
+
+
+def positions(capacity, students):
+    """The (row, column) of the seats to use for the students, front to back, left to right."""
+    rows, columns = grid(capacity)
+    cells = [(row, column) for row in range(1, rows + 1) for column in range(1, columns + 1)][:capacity]
+    spread = [(row, column) for row, column in cells if (row + column) % 2 == 0]
+    return spread[:students] if students <= len(spread) else cells[:students]
+
+
+def assign(capacity, groups):
+    """
+    Seat the students of a room. groups is {course: [students]}, each list
+    in the order the seats are handed out. Returns [(row, column, course,
+    student)]. Students beyond the capacity get no seat.
+    """
+    remaining = {course: list(reversed(students)) for course, students in groups.items() if students}
+    total = sum(len(students) for students in remaining.values())
+    seated, taken = [], {}
+    for row, column in positions(capacity, total):
+        neighbours = {taken.get((row, column - 1)), taken.get((row - 1, column))}
+        # most students left first, the course key breaks the ties so a plan can be reproduced
+        candidates = sorted(remaining, key=lambda course: (-len(remaining[course]), course))
+        course = next((course for course in candidates if course not in neighbours), candidates[0])
+
+        seated.append((row, column, course, remaining[course].pop()))
+        taken[(row, column)] = course
+        if not remaining[course]:
+            del remaining[course]
+    return seated
+
+
+def adjacent_pairs(seated):
+    """Pairs of students of the same course sitting side by side or one behind the other."""
+    courses = {(row, column): course for row, column, course, _ in seated}
+    return sum(1 for (row, column), course in courses.items()
+               for neighbour in ((row, column + 1), (row + 1, column)) if courses.get(neighbour) == course)
@@ -0,0 +1,129 @@
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from schedule.pdf import Document, PAGE_WIDTH, fit
+
+# Printed seating plans: per room and exam slot an attendance sheet (the
+# students in seat order, with a column to sign) and a door list (the
+# students by number, with their seat).
+#
+# collect() reads the seats from the database in the parent process, the
+# PDFs are rendered by a process pool from plain data and written to a ZIP
+# archive as they come, so a download starts with the first room instead
+# of after the whole exam week.
+
+MARGIN = 40
+LINE_HEIGHT = 18
+ROWS_PER_PAGE = 38
+
+ATTENDANCE_COLUMNS = [('Seat', 55), ('Student no.', 85), ('Name', 190), ('Course', 90), ('Signature', 95)]
+DOOR_COLUMNS = [('Student no.', 90), ('Name', 250), ('Course', 100), ('Seat', 75)]
+
+
+def collect(exam_date=None):
+    """
+    One plan per room and slot: {'room', 'campus', 'block', 'date', 'time',
+    'seats': [(row, column, student no., name, course)]}, in timetable order.
+    """
+    from schedule.models import Seat
+
+    seats = Seat.objects.order_by('exam__exam_date', 'exam__exam_time', 'exam__room__label', 'exam__room_id',
+                                  'row', 'column')
+    if exam_date:
+        seats = seats.filter(exam__exam_date=exam_date)
+
+    plans = {}
+    for (room_id, label, campus, block, seat_date, seat_time, row, column, username, name, code, number) in (
+            seats.values_list('exam__room_id', 'exam__room__label', 'exam__room__campus', 'exam__room__block',
+                              'exam__exam_date', 'exam__exam_time', 'row', 'column', 'student__username',
+                              'student__display_name', 'exam__section__course__code', 'exam__section__number')
+            .iterator()):
+        plan = plans.setdefault((seat_date, seat_time, room_id), {
+            'room': label, 'campus': campus, 'block': block,
+            'date': seat_date.isoformat(), 'time': f"{seat_time:%H:%M}", 'seats': [],
+        })
+        plan['seats'].append((row, column, username, name, f"{code} S{number}"))
+    return list(plans.values())
+
+
+def filename(plan, sheet):
+    return f"{plan['date']}/{plan['time'].replace(':', '')}/{plan['campus']}-{plan['room']}-{sheet}.pdf"
+
+
+def table(document, plan, heading, columns, rows):
+    """Pages of a table with the plan's header on every page."""
+    for start in range(0, max(len(rows), 1), ROWS_PER_PAGE):
+        document.add_page()
+        document.text(MARGIN, MARGIN + 10, heading, size=16, font='bold')
+        document.text(MARGIN, MARGIN + 30, f"Room {plan['room']}, block {plan['block']}, {plan['campus']} campus    "
+                                           f"{plan['date']} {plan['time']}    {len(plan['seats'])} students")
+
+        y = MARGIN + 60
+        x = MARGIN
+        for title, width in columns:
+            document.text(x, y, title, font='bold')
+            x += width
+        document.line(MARGIN, y + 5, PAGE_WIDTH - MARGIN, y + 5, width=1)
+
+        for cells in rows[start:start + ROWS_PER_PAGE]:
+            y += LINE_HEIGHT
+            x = MARGIN
+            for value, (_, width) in zip(cells, columns):
+                document.text(x, y, fit(value, width - 5, 10))
+                x += width
+            document.line(MARGIN, y + 5, PAGE_WIDTH - MARGIN, y + 5)
+
+
+def render(plan):
+    """[(file name, PDF bytes)] of a plan. Runs in the worker processes, plan is plain data."""
+    attendance = Document(f"Attendance {plan['room']} {plan['date']} {plan['time']}")
+    table(attendance, plan, 'Attendance sheet', ATTENDANCE_COLUMNS,
+          [(f"R{row}-S{column}", username, name, course, '') for row, column, username, name, course in plan['seats']])
+
+    door = Document(f"Door list {plan['room']} {plan['date']} {plan['time']}")
+    table(door, plan, 'Door list', DOOR_COLUMNS,
+          sorted((username, name, course, f"R{row}-S{column}")
+                 for row, column, username, name, course in plan['seats']))
+
+    return [(filename(plan, 'attendance'), attendance.render()), (filename(plan, 'door'), door.render())]
+
+
+class Chunks:
+    """A write-only file collecting what zipfile writes, taken by the streaming generator."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data, self.chunks = b''.join(self.chunks), []
+        return data
+
+
+def stream_zip(plans, workers=None):
+    """
+    The ZIP archive of the sheets of the plans, in chunks. The PDFs are
+    already compressed, so the archive stores them as they are. The sheets
+    are rendered by a pool of worker processes, in this process when
+    workers is 1.
+    """
+    out = Chunks()
+    executor = ProcessPoolExecutor(max_workers=workers) if workers != 1 else None
+    try:
+        rendered = executor.map(render, plans, chunksize=16) if executor else map(render, plans)
+        # zipfile writes to an unseekable file with data descriptors, nothing needs to be rewound
+        with zipfile.ZipFile(out, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for files in rendered:
+                for name, data in files:
+                    archive.writestr(name, data)
+                yield out.take()
+        yield out.take()
+    finally:
+        # also when the download is aborted: drop the rooms not rendered yet
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
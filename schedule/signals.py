@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core import caching
+from schedule.models import ExamSchedule, Invigilation
+
+
+@receiver(post_save, sender=ExamSchedule)
+@receiver(post_delete, sender=ExamSchedule)
+@receiver(post_save, sender=Invigilation)
+@receiver(post_delete, sender=Invigilation)
+def invalidate_caches(sender, instance, **kwargs):
+    caching.invalidate_on_commit()
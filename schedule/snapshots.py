@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections import defaultdict, namedtuple
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+from pathlib import Path
+from django.conf import settings
+from django.utils import timezone
+
+# Published timetable snapshots.
+#
+# publish() materializes the timetable into one small JSON file per student,
+# lecturer (the exams of their sections and their invigilations, other
+# invigilators included), room and day under TIMETABLE_SNAPSHOT_ROOT:
+#
+#   versions/<n>/<kind>/<key>.json   kind is one of KINDS
+#   versions/<n>/manifest.json       digest and modification time of every slice
+#   CURRENT                          number of the published version
+#
+# A version directory is complete before CURRENT is switched to it in one
+# step (os.replace) and never changes afterwards, so readers see either the
+# old or the new timetable, and the files can be served as they are.
+#
+# Every slice has a digest of the rows it is built from. A republish only
+# encodes the slices whose digest changed and hard links the others from
+# the previous version.
+
+KINDS = ('students', 'lecturers', 'rooms', 'days')
+
+Snapshot = namedtuple('Snapshot', 'path digest modified')
+
+# published versions kept on disk, older ones are removed by publish()
+KEEP_VERSIONS = 2
+
+
+def get_root(root=None):
+    return Path(root or settings.TIMETABLE_SNAPSHOT_ROOT)
+
+
+def digest(value):
+    return hashlib.blake2b(repr(value).encode(), digest_size=10).hexdigest()
+
+
+def encode(payload):
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def collect():
+    """
+    The exam and invigilation entries of the timetable and, per slice,
+    the entries it holds: {kind: {key: ([section ids], [invigilation indexes])}}.
+    """
+    from core.models import CourseRegistration
+    from schedule.models import ExamSchedule, Invigilation
+
+    # one entry per section, a section split over rooms lists them all
+    exams, lecturers = {}, {}
+    for (section_id, code, name, number, lecturer_id, exam_date, exam_time, duration,
+         room_id, label, campus, block, seats) in (
+            ExamSchedule.objects.order_by('exam_date', 'exam_time', 'section__course__code', 'section_id', 'room_id')
+            .values_list('section_id', 'section__course__code', 'section__course__name', 'section__number',
+                         'section__lecturer_id', 'exam_date', 'exam_time', 'duration', 'room_id', 'room__label',
+                         'room__campus', 'room__block', 'seats').iterator()):
+        entry = exams.setdefault(section_id, {
+            'section_id': section_id, 'course': code, 'name': name, 'section': number,
+            'date': exam_date.isoformat(), 'time': f"{exam_time:%H:%M}", 'duration': duration, 'rooms': [],
+        })
+        if room_id is not None:
+            entry['rooms'].append({'id': room_id, 'room': label, 'campus': campus, 'block': block, 'seats': seats})
+        lecturers[section_id] = lecturer_id
+
+    invigilations = [
+        {'invigilator': username, 'invigilator_id': invigilator_id, 'date': exam_date.isoformat(),
+         'time': f"{exam_time:%H:%M}", 'duration': duration,
+         'room': {'id': room_id, 'room': label, 'campus': campus, 'block': block}}
+        for invigilator_id, username, room_id, label, campus, block, exam_date, exam_time, duration in (
+            Invigilation.objects.order_by('exam_date', 'exam_time', 'room_id', 'invigilator_id')
+            .values_list('invigilator_id', 'invigilator__username', 'room_id', 'room__label', 'room__campus',
+                         'room__block', 'exam_date', 'exam_time', 'duration').iterator())
+    ]
+
+    slices = {kind: defaultdict(lambda: ([], [])) for kind in KINDS}
+    for section_id, entry in exams.items():
+        slices['days'][entry['date']][0].append(section_id)
+        for room in entry['rooms']:
+            slices['rooms'][room['id']][0].append(section_id)
+        if lecturers[section_id] is not None:
+            slices['lecturers'][lecturers[section_id]][0].append(section_id)
+
+    order = {section_id: i for i, section_id in enumerate(exams)}
+    for student_id, section_id in CourseRegistration.objects.values_list('student_id', 'section_id').iterator():
+        if section_id in exams:
+            slices['students'][student_id][0].append(section_id)
+    for sections, _ in slices['students'].values():
+        sections.sort(key=order.__getitem__)
+
+    for i, invigilation in enumerate(invigilations):
+        slices['lecturers'][invigilation['invigilator_id']][1].append(i)
+        slices['rooms'][invigilation['room']['id']][1].append(i)
+        slices['days'][invigilation['date']][1].append(i)
+
+    return exams, invigilations, slices
+
+
+def publish(root=None):
+    """Publish the current timetable as a new version. Returns (version, slices written, slices linked)."""
+    root = get_root(root)
+    versions = root / 'versions'
+    versions.mkdir(parents=True, exist_ok=True)
+
+    previous = current_version(root)
+    old_manifest = load_manifest(str(versions / str(previous))) if previous else {'slices': {}, 'modified': {}}
+    # a number no earlier (possibly failed) publish has used
+    version = max([int(path.name) for path in versions.iterdir() if path.name.isdigit()] + [0]) + 1
+
+    exams, invigilations, slices = collect()
+    exam_digests = {section_id: digest(entry) for section_id, entry in exams.items()}
+    invigilation_digests = [digest(entry) for entry in invigilations]
+
+    staging = Path(tempfile.mkdtemp(dir=versions, prefix='.staging-'))
+    now = timezone.now().replace(microsecond=0)
+    # modified is the publication time (epoch seconds) of the content of the slice
+    manifest = {'version': version, 'published': now.isoformat(), 'slices': {}, 'modified': {}}
+    written = linked = 0
+    try:
+        for kind in KINDS:
+            (staging / kind).mkdir()
+            digests = manifest['slices'][kind] = {}
+            modified = manifest['modified'][kind] = {}
+            for key, (sections, indexes) in slices[kind].items():
+                key = str(key)
+                digests[key] = digest(([exam_digests[section_id] for section_id in sections],
+                                       [invigilation_digests[i] for i in indexes]))
+                path = staging / kind / f"{key}.json"
+
+                if old_manifest['slices'].get(kind, {}).get(key) == digests[key]:
+                    link(versions / str(previous) / kind / f"{key}.json", path)
+                    # manifests published before the modification times count as modified now
+                    modified[key] = old_manifest.get('modified', {}).get(kind, {}).get(key, int(now.timestamp()))
+                    linked += 1
+                    continue
+
+                payload = {'exams': [exams[section_id] for section_id in sections]}
+                if kind != 'students':
+                    payload['invigilations'] = [invigilations[i] for i in indexes]
+                path.write_bytes(encode(payload))
+                modified[key] = int(now.timestamp())
+                written += 1
+
+        (staging / 'manifest.json').write_bytes(encode(manifest))
+        os.rename(staging, versions / str(version))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    # switch readers to the new version in one step
+    fd, tmp_path = tempfile.mkstemp(dir=root, prefix='.current-')
+    with os.fdopen(fd, 'w') as f:
+        f.write(str(version))
+    os.replace(tmp_path, root / 'CURRENT')
+
+    prune(root, version)
+    return version, written, linked
+
+
+def link(source, target):
+    try:
+        os.link(source, target)
+    except OSError:
+        # no hard links on this file system
+        shutil.copyfile(source, target)
+
+
+def prune(root, version):
+    """Remove the versions older than the KEEP_VERSIONS last ones."""
+    for path in (root / 'versions').iterdir():
+        if path.name.isdigit() and int(path.name) <= version - KEEP_VERSIONS:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def current_version(root=None):
+    try:
+        return int((get_root(root) / 'CURRENT').read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=4)
+def load_manifest(version_path):
+    # versions never change, so caching per path is safe
+    with open(Path(version_path) / 'manifest.json', 'rb') as f:
+        return json.load(f)
+
+
+def current_manifest(root=None):
+    """(version directory, manifest) of the published timetable, None before the first publish."""
+    root = get_root(root)
+    version = current_version(root)
+    if version is None:
+        return None
+    version_path = root / 'versions' / str(version)
+    return version_path, load_manifest(str(version_path))
+
+
+def read(kind, key, root=None):
+    """The Snapshot (file, digest, modification time) of a slice of the published timetable, None when there is none."""
+    current = current_manifest(root)
+    if current is None or kind not in KINDS:
+        return None
+
+    version_path, manifest = current
+    slice_digest = manifest['slices'][kind].get(str(key))
+    if slice_digest is None:
+        return None
+    modified = datetime.fromtimestamp(manifest['modified'][kind][str(key)], tz=dt_timezone.utc)
+    return Snapshot(version_path / kind / f"{key}.json", slice_digest, modified)
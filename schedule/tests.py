@@ -1,3 +1,362 @@
-from django.test import TestCase
+import io
+import json
+import tempfile
+import zipfile
+from datetime import date, datetime, time
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from core import caching
+from schedule import calendars, conflicts, invigilation, rooms, seating, snapshots, timetabling
+from core.models import User, Student, Department, Course, Section, Room, CourseRegistration
+from schedule.models import ExamSchedule, Invigilation, Seat
 
-# Create your tests here.
+
+class TimetableTestCase(TestCase):
+    """A student registered in one section with an exam."""
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Information Technology')
+        cls.student = Student.objects.create(username='S1', first_name='Student', last_name='One',
+                                             department=department)
+        course = Course.objects.create(code='IT101', name='Programming', department=department)
+        cls.section = Section.objects.create(course=course, number=1)
+        CourseRegistration.objects.create(student=cls.student, section=cls.section)
+        cls.room = Room.objects.create(label='A101', room_type=Room.CLASS_ROOM, campus=Room.SA,
+                                       capacity=40, block='A')
+        ExamSchedule.objects.create(section=cls.section, room=cls.room, exam_date=date(2026, 12, 7),
+                                    exam_time=time(8))
+
+    def setUp(self):
+        self.client.force_login(self.student)
+
+
+class StudentTimetableTests(TimetableTestCase):
+    """The timetable is revalidated with its ETag/Last-Modified and only rebuilt when it changed."""
+
+    def test_json_lists_the_exams(self):
+        response = self.client.get(reverse('schedule:student_timetable_json'))
+        self.assertEqual(response.status_code, 200)
+        exams = response.json()['exams']
+        self.assertEqual([(exam['course'], exam['date'], exam['rooms'][0]['room']) for exam in exams],
+                         [('IT101', '2026-12-07', 'A101')])
+
+    def test_unchanged_timetable_is_not_modified(self):
+        for name in ('schedule:student_timetable', 'schedule:student_timetable_json'):
+            with self.subTest(view=name):
+                url = reverse(name)
+                response = self.client.get(url)
+                self.assertTrue(response['ETag'].startswith('"'))  # strong
+                self.assertIn('Last-Modified', response)
+
+                with self.assertNumQueries(2):  # loading the user (the session is cached) and the timetable version
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(response.status_code, 304)
+
+    def test_timetable_change_changes_the_etag(self):
+        url = reverse('schedule:student_timetable')
+        etag = self.client.get(url)['ETag']
+
+        ExamSchedule.objects.update(exam_time=time(11))
+        caching.invalidate()  # bulk updates send no signals
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertContains(response, '11:00')
+
+
+class PublishedTimetableTests(TimetableTestCase):
+    """Publishing writes every slice once, a republish only the slices of what changed."""
+
+    def setUp(self):
+        super().setUp()
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        settings = override_settings(TIMETABLE_SNAPSHOT_ROOT=root.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_republish_rebuilds_the_changed_slices(self):
+        self.assertEqual(snapshots.publish(), (1, 3, 0))  # one student, room and day, no lecturer
+        self.assertEqual(snapshots.publish(), (2, 0, 3))
+
+        ExamSchedule.objects.create(section=Section.objects.create(course=self.section.course, number=2),
+                                    room=self.room, exam_date=date(2026, 12, 8), exam_time=time(8))
+        self.assertEqual(snapshots.publish(), (3, 2, 2))  # the room and the new day
+
+    def test_snapshot_is_served_with_its_digest(self):
+        snapshots.publish()
+        url = reverse('schedule:published_timetable', args=['students', self.student.pk])
+        response = self.client.get(url)
+        self.assertEqual(json.loads(response.getvalue())['exams'][0]['course'], 'IT101')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        # students only read their own timetable
+        other = reverse('schedule:published_timetable', args=['rooms', self.room.pk])
+        self.assertEqual(self.client.get(other).status_code, 404)
+
+    def test_calendar_feed_needs_its_signature(self):
+        snapshots.publish()
+        self.client.logout()  # calendar clients do not log in
+        signature = calendars.feed_signature('students', self.student.pk)
+        url = reverse('schedule:calendar_feed', args=['students', self.student.pk, signature])
+
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        feed = response.getvalue().decode()
+        self.assertIn('DTSTART:20261207T080000\r\n', feed)
+        self.assertIn('SUMMARY:Exam IT101 Programming\r\n', feed)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        forged = reverse('schedule:calendar_feed', args=['students', self.student.pk, 'x' + signature[1:]])
+        self.assertEqual(self.client.get(forged).status_code, 404)
+
+
+class SeatingTests(SimpleTestCase):
+    """Students of a course do not sit next to each other while the room allows it."""
+
+    def test_half_full_room_leaves_a_seat_between_students(self):
+        seated = seating.assign(40, {'IT101': list(range(20))})
+        self.assertEqual(len(seated), 20)
+        self.assertEqual(seating.adjacent_pairs(seated), 0)
+
+    def test_courses_alternate_in_a_full_room(self):
+        seated = seating.assign(40, {'IT101': list(range(20)), 'IT102': list(range(20, 40))})
+        self.assertEqual(len({(row, column) for row, column, _, _ in seated}), 40)
+        self.assertEqual(seating.adjacent_pairs(seated), 0)
+
+    def test_students_beyond_the_capacity_get_no_seat(self):
+        self.assertEqual(len(seating.assign(10, {'IT101': list(range(12))})), 10)
+
+
+class RoomAllocatorTests(SimpleTestCase):
+    """The exact search runs on slots of any size, within its limits."""
+
+    def setUp(self):
+        sizes = [(30, 6), (40, 6), (60, 3)]
+        self.rooms = [rooms.ExamRoom(i, capacity, Room.CLASS_ROOM, Room.SA, 'A')
+                      for i, capacity in enumerate(capacity for capacity, count in sizes for _ in range(count))]
+        sizes = [30, 23, 31, 7, 20, 29, 13, 6, 5, 9, 26, 23, 20, 35, 29, 28]
+        self.sections = [rooms.ExamSection(i, size, None) for i, size in enumerate(sizes)]
+
+    def test_search_improves_on_the_heuristic(self):
+        heuristic = rooms.RoomAllocator(self.rooms, Room.EXAM_HALL_TYPES, time_limit=0).allocate(self.sections)
+        self.assertEqual((heuristic.rooms_used, heuristic.searched), (8, False))
+
+        allocation = rooms.RoomAllocator(self.rooms, Room.EXAM_HALL_TYPES, time_limit=5).allocate(self.sections)
+        self.assertEqual((allocation.rooms_used, allocation.lower_bound), (7, 7))
+        self.assertTrue(allocation.optimal and allocation.searched)
+        seated = {}
+        for section, _, seats in allocation.placements:
+            seated[section] = seated.get(section, 0) + seats
+        self.assertEqual(seated, {section.id: section.size for section in self.sections})
+
+    def test_search_stops_at_the_node_limit(self):
+        allocator = rooms.RoomAllocator(self.rooms, Room.EXAM_HALL_TYPES, time_limit=5, node_limit=10)
+        allocation = allocator.allocate(self.sections)
+        self.assertEqual(allocation.rooms_used, 8)
+        self.assertFalse(allocation.optimal)
+
+
+class ConflictMatrixTests(TimetableTestCase):
+    """Only the courses whose registrations changed are reloaded, including rows edited in place."""
+
+    def setUp(self):
+        super().setUp()
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        settings = override_settings(CONFLICT_MATRIX_PATH=f'{root.name}/conflicts.bin')
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_registration_edited_in_place_is_reloaded(self):
+        other = Section.objects.create(course=Course.objects.create(code='IT102', name='Databases',
+                                                                   department=self.section.course.department),
+                                       number=1)
+        CourseRegistration.objects.create(student=self.student, section=other)
+        matrix = conflicts.ConflictMatrix.build()
+        self.assertEqual(matrix.shared(self.section.course_id, other.course_id), 1)
+        self.assertEqual(matrix.refresh(), set())
+
+        # the same number of registrations with the same ids, but another student
+        student = Student.objects.create(username='S2')
+        CourseRegistration.objects.filter(section=other).update(student=student)
+        self.assertEqual(matrix.refresh(), {other.course_id})
+        self.assertEqual(matrix.shared(self.section.course_id, other.course_id), 0)
+
+    def test_graph_matches_the_registrations(self):
+        course = self.section.course
+        enrolments = [(self.student.pk, course.pk)]
+        for code in ('IT102', 'IT103', 'IT104'):
+            other = Course.objects.create(code=code, name=code, department=course.department)
+            section = Section.objects.create(course=other, number=1)
+            for student in (self.student, Student.objects.create(username=f'S{code}')):
+                CourseRegistration.objects.create(student=student, section=section)
+                enrolments.append((student.pk, other.pk))
+
+        matrix = conflicts.get_matrix()
+        self.assertEqual(matrix.graph(), timetabling.build_conflict_graph(enrolments))
+        self.assertEqual(matrix.graph()[0][course.pk], {other: 1 for _, other in enrolments[1::2]})
+
+        # the saved matrix is loaded back as it was
+        self.assertEqual(conflicts.get_matrix().graph(), matrix.graph())
+
+
+class SeatingPlanTests(TimetableTestCase):
+    """The attendance sheets and door lists of a day download as one ZIP, for the exam staff only."""
+
+    def test_plans_of_a_day_download_as_zip(self):
+        call_command('assignseats', stdout=io.StringIO())
+        self.assertEqual(Seat.objects.get().student, self.student)
+
+        url = reverse('schedule:seating_plans', args=['2026-12-07'])
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(User.objects.create(username='admin', is_staff=True))
+        response = self.client.get(url)
+        archive = zipfile.ZipFile(io.BytesIO(response.getvalue()))
+        self.assertEqual(archive.namelist(), ['2026-12-07/0800/SA-A101-attendance.pdf',
+                                              '2026-12-07/0800/SA-A101-door.pdf'])
+        self.assertTrue(archive.read(archive.namelist()[0]).startswith(b'%PDF-1.4'))
+        self.assertEqual(self.client.get(reverse('schedule:seating_plans', args=['2026-12-08'])).status_code, 404)
+
+
+class RoomAllocationTests(TimetableTestCase):
+    """An exam kept in its room keeps its row, and with it its seats."""
+
+    def test_exam_staying_in_its_room_keeps_its_row(self):
+        call_command('assignseats', stdout=io.StringIO())
+        exam = ExamSchedule.objects.get()
+
+        out = io.StringIO()
+        call_command('allocaterooms', stdout=out)
+        self.assertIn('0 added, 1 changed, 0 removed', out.getvalue())
+        self.assertEqual(list(ExamSchedule.objects.values_list('pk', 'room', 'seats')), [(exam.pk, self.room.pk, 1)])
+        self.assertEqual(Seat.objects.get().exam_id, exam.pk)
+
+
+class TimetablerTests(SimpleTestCase):
+    """Courses sharing students get different slots, the slot loads count toward the capacity."""
+
+    def test_triangle_is_clash_free_in_three_slots(self):
+        graph, sizes = timetabling.build_conflict_graph([(1, 'A'), (1, 'B'), (2, 'B'), (2, 'C'), (3, 'C'), (3, 'A'),
+                                                         (4, 'D')])
+        result = timetabling.Timetabler(graph, 'ABCD', [0, 0, 0], sizes=sizes).solve(time_budget=0.1)
+        self.assertTrue(result.feasible)
+        self.assertEqual(len({result.assignment[course] for course in 'ABC'}), 3)
+
+    def test_seats_over_capacity_are_costed(self):
+        timetabler = timetabling.Timetabler({}, 'AB', [0, 1], sizes={'A': 30, 'B': 20}, slot_capacity=40)
+        timetabler.reset([0, 0])
+        self.assertEqual(timetabler.totals(), (0, 0, 10))
+        self.assertEqual(timetabler.cost(), 10 * timetabling.CAPACITY_WEIGHT)
+        self.assertEqual(timetabler.move_delta(1, 1), -10 * timetabling.CAPACITY_WEIGHT)
+
+        result = timetabler.solve(time_budget=0.1)
+        self.assertEqual(result.overflow, 0)
+        self.assertNotEqual(result.assignment['A'], result.assignment['B'])
+
+
+class TimetableCommandTests(TimetableTestCase):
+    """A section moved to another slot gives up its room and seats, a dry run saves nothing."""
+
+    def setUp(self):
+        super().setUp()
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        settings = override_settings(CONFLICT_MATRIX_PATH=f'{root.name}/conflicts.bin')
+        settings.enable()
+        self.addCleanup(settings.disable)
+        call_command('assignseats', stdout=io.StringIO())
+
+    def timetable(self, *options):
+        out = io.StringIO()
+        call_command('timetable', '--start-date', '2027-01-04', '--days', '1', '--sessions', '11:00',
+                     '--time-budget', '0.1', *options, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_saves_nothing(self):
+        exams = list(ExamSchedule.objects.values_list('pk', 'exam_date', 'exam_time', 'room', 'seats'))
+        self.assertIn('0 clashes', self.timetable('--dry-run'))
+        self.assertEqual(list(ExamSchedule.objects.values_list('pk', 'exam_date', 'exam_time', 'room', 'seats')),
+                         exams)
+        self.assertEqual(Seat.objects.count(), 1)
+
+    def test_moved_section_loses_its_room_and_seats(self):
+        exam = ExamSchedule.objects.get()
+        self.assertIn('0 added, 1 moved to another slot, 0 removed', self.timetable())
+        self.assertEqual(list(ExamSchedule.objects.values_list('pk', 'exam_date', 'exam_time', 'room', 'seats')),
+                         [(exam.pk, date(2027, 1, 4), time(11), None, None)])
+        self.assertFalse(Seat.objects.exists())
+
+
+class InvigilationPlannerTests(SimpleTestCase):
+    """The least loaded staff are taken first, the department of the course while the loads allow it."""
+
+    start = datetime(2026, 12, 7, 8)
+
+    def test_least_loaded_invigilator_is_taken(self):
+        planner = invigilation.InvigilationPlanner({1: 'IT', 2: 'IT'}, loads={1: 120})
+        self.assertEqual(planner.assign(self.start, 120, {'A101': (1, {'IT'})}), ({'A101': [2]}, 0))
+        self.assertEqual(planner.loads, {1: 120, 2: 120})
+
+    def test_department_is_worth_its_penalty(self):
+        planner = invigilation.InvigilationPlanner({1: 'IT', 2: 'EN'}, department_penalty=240,
+                                                   loads={1: 200, 2: 0})
+        self.assertEqual(planner.assign(self.start, 120, {'A101': (1, {'IT'})})[0], {'A101': [1]})
+
+        planner = invigilation.InvigilationPlanner({1: 'IT', 2: 'EN'}, department_penalty=240,
+                                                   loads={1: 300, 2: 0})
+        self.assertEqual(planner.assign(self.start, 120, {'A101': (1, {'IT'})})[0], {'A101': [2]})
+
+    def test_excluded_and_overlapping_staff_are_not_offered(self):
+        planner = invigilation.InvigilationPlanner({1: 'IT', 2: 'IT', 3: 'IT'})
+        planner.mark_busy(2, datetime(2026, 12, 7, 9), datetime(2026, 12, 7, 11))
+        self.assertEqual(planner.assign(self.start, 120, {'A101': (2, {'IT'})}, excluded={1}), ({'A101': [3]}, 1))
+
+        # the invigilation ends at 10:00, a slot overlapping it does not take the same invigilator
+        self.assertFalse(planner.available(3, datetime(2026, 12, 7, 9, 30), datetime(2026, 12, 7, 11, 30)))
+        self.assertTrue(planner.available(3, datetime(2026, 12, 7, 10), datetime(2026, 12, 7, 12)))
+
+
+class AssignInvigilatorsTests(TimetableTestCase):
+    """The lecturers and sitting staff of an exam are busy for its whole duration."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        department = cls.section.course.department
+        engineering = Department.objects.create(name='Engineering')
+        cls.lecturer, cls.sitting, cls.busy, cls.free, cls.other = (
+            User.objects.create(username=f'L{i}', user_type=User.ACADEMIC_STAFF, is_invigilator=True,
+                                department=engineering if i == 5 else department)
+            for i in range(1, 6)
+        )
+        Section.objects.filter(pk=cls.section.pk).update(lecturer=cls.lecturer)
+        CourseRegistration.objects.create(student=cls.sitting, section=cls.section)
+
+        # an exam taught by L3 starting an hour later, while the 08:00 exam is still sat
+        course = Course.objects.create(code='IT102', name='Databases', department=department)
+        section = Section.objects.create(course=course, number=1, lecturer=cls.busy)
+        room = Room.objects.create(label='A102', room_type=Room.CLASS_ROOM, campus=Room.SA, capacity=40, block='A')
+        ExamSchedule.objects.create(section=section, room=room, exam_date=date(2026, 12, 7), exam_time=time(9))
+
+    def invigilations(self):
+        return set(Invigilation.objects.values_list('invigilator__username', 'exam_date', 'exam_time'))
+
+    def test_busy_staff_are_not_assigned(self):
+        out = io.StringIO()
+        call_command('assigninvigilators', stdout=out)
+        self.assertIn('Assigned 2 invigilations over 2 slots', out.getvalue())
+        self.assertEqual(self.invigilations(), {('L4', date(2026, 12, 7), time(8)),
+                                                ('L5', date(2026, 12, 7), time(9))})
+
+    def test_other_days_count_towards_the_workload(self):
+        Invigilation.objects.create(invigilator=self.free, room=self.room, exam_date=date(2026, 12, 6),
+                                    exam_time=time(8), duration=600)
+        call_command('assigninvigilators', '--date', '2026-12-07', stdout=io.StringIO())
+        self.assertEqual(self.invigilations(), {('L4', date(2026, 12, 6), time(8)),
+                                                ('L5', date(2026, 12, 7), time(8)),
+                                                ('L4', date(2026, 12, 7), time(9))})
@@ -0,0 +1,271 @@
+import random
+import time
+from collections import defaultdict
+
+# Exam timetabling: assign every course to an exam slot so that no student
+# sits two exams at the same time.
+#
+# The problem is a weighted graph colouring. Courses are the vertices, two
+# courses are joined when they share students (the weight is the number of
+# shared students) and the slots are the colours. An initial timetable is
+# built with DSatur and then improved with a tabu local search until the
+# time budget is used up:
+#
+#   - hard: students with two exams in the same slot (clashes)
+#   - hard: more students in a slot than the seats available (capacity)
+#   - soft: students with exams in two consecutive sessions of the same day
+#
+# This module does not touch the database, see the `timetable` command.
+
+CLASH_WEIGHT = 10000
+CAPACITY_WEIGHT = 100
+BACK_TO_BACK_WEIGHT = 1
+
+
+def build_conflict_graph(enrolments):
+    """
+    Build the course conflict graph from (student, course) pairs.
+    Returns {course: {other_course: shared_students}} and {course: students}.
+    """
+    courses_of = defaultdict(set)
+    for student, course in enrolments:
+        courses_of[student].add(course)
+
+    graph = defaultdict(dict)
+    sizes = defaultdict(int)
+    for courses in courses_of.values():
+        courses = sorted(courses)
+        for i, course in enumerate(courses):
+            sizes[course] += 1
+            edges = graph[course]
+            for other in courses[i + 1:]:
+                edges[other] = edges.get(other, 0) + 1
+                graph[other][course] = edges[other]
+
+    return dict(graph), dict(sizes)
+
+
+class TimetableResult:
+    def __init__(self, assignment, clashes, back_to_back, overflow, iterations, elapsed):
+        self.assignment = assignment  # course -> slot index
+        self.clashes = clashes  # students sitting two exams at once (counted per course pair)
+        self.back_to_back = back_to_back  # students with exams in consecutive sessions
+        self.overflow = overflow  # seats missing over all slots
+        self.iterations = iterations
+        self.elapsed = elapsed
+
+    @property
+    def feasible(self):
+        return self.clashes == 0 and self.overflow == 0
+
+
+class Timetabler:
+    """
+    slot_days gives the day of every slot, in chronological order; two slots
+    that follow each other on the same day are consecutive sessions.
+
+        timetabler = Timetabler(graph, courses, slot_days=[0, 0, 0, 1, 1, 1], sizes=sizes)
+        result = timetabler.solve(time_budget=30)
+    """
+
+    def __init__(self, graph, courses, slot_days, sizes=None, slot_capacity=None, seed=0):
+        self.courses = list(courses)
+        self.index = {course: i for i, course in enumerate(self.courses)}
+        self.num_slots = len(slot_days)
+        self.sizes = [(sizes or {}).get(course, 0) for course in self.courses]
+        self.capacity = slot_capacity
+        self.random = random.Random(seed)
+
+        if not self.num_slots:
+            raise ValueError("At least one exam slot is needed")
+
+        # adjacency as lists of (neighbour index, shared students)
+        self.neighbours = [[] for _ in self.courses]
+        for course, edges in graph.items():
+            if course not in self.index:
+                continue
+            i = self.index[course]
+            self.neighbours[i] = [(self.index[other], weight) for other, weight in edges.items()
+                                  if other in self.index]
+
+        # consecutive sessions of the same day
+        self.adjacent = [
+            [t for t in (s - 1, s + 1) if 0 <= t < self.num_slots and slot_days[t] == slot_days[s]]
+            for s in range(self.num_slots)
+        ]
+
+    # cost bookkeeping
+
+    def reset(self, assignment):
+        """Build the per (course, slot) cost tables for an assignment."""
+        n, slots = len(self.courses), self.num_slots
+        self.slot_of = list(assignment)
+        self.clash = [[0] * slots for _ in range(n)]
+        self.near = [[0] * slots for _ in range(n)]
+        self.load = [0] * slots
+
+        for i, slot in enumerate(self.slot_of):
+            self.load[slot] += self.sizes[i]
+            for j, weight in self.neighbours[i]:
+                self.clash[j][slot] += weight
+                for t in self.adjacent[slot]:
+                    self.near[j][t] += weight
+
+    def overflow(self, load):
+        return max(load - self.capacity, 0) if self.capacity is not None else 0
+
+    def move_delta(self, i, target):
+        source = self.slot_of[i]
+        size = self.sizes[i]
+        delta = (self.clash[i][target] - self.clash[i][source]) * CLASH_WEIGHT
+        delta += (self.near[i][target] - self.near[i][source]) * BACK_TO_BACK_WEIGHT
+        if self.capacity is not None:
+            delta += (self.overflow(self.load[target] + size) - self.overflow(self.load[target])
+                      + self.overflow(self.load[source] - size) - self.overflow(self.load[source])) * CAPACITY_WEIGHT
+        return delta
+
+    def move(self, i, target):
+        source = self.slot_of[i]
+        self.slot_of[i] = target
+        self.load[source] -= self.sizes[i]
+        self.load[target] += self.sizes[i]
+        for j, weight in self.neighbours[i]:
+            self.clash[j][source] -= weight
+            self.clash[j][target] += weight
+            for t in self.adjacent[source]:
+                self.near[j][t] -= weight
+            for t in self.adjacent[target]:
+                self.near[j][t] += weight
+
+    def totals(self):
+        clashes = sum(self.clash[i][slot] for i, slot in enumerate(self.slot_of)) // 2
+        back_to_back = sum(self.near[i][slot] for i, slot in enumerate(self.slot_of)) // 2
+        overflow = sum(self.overflow(load) for load in self.load)
+        return clashes, back_to_back, overflow
+
+    def cost(self):
+        clashes, back_to_back, overflow = self.totals()
+        return clashes * CLASH_WEIGHT + back_to_back * BACK_TO_BACK_WEIGHT + overflow * CAPACITY_WEIGHT
+
+    # construction
+
+    def initial(self):
+        """
+        DSatur: colour the course whose neighbours already use the most
+        distinct slots first (ties: most shared students), giving it the
+        cheapest slot.
+        """
+        n = len(self.courses)
+        # start from an empty timetable, load and costs are built as courses are placed
+        self.load = [0] * self.num_slots
+        self.clash = [[0] * self.num_slots for _ in range(n)]
+        self.near = [[0] * self.num_slots for _ in range(n)]
+
+        degree = [sum(weight for _, weight in self.neighbours[i]) for i in range(n)]
+        used_by_neighbours = [set() for _ in range(n)]
+        placed = [False] * n
+        slot_of = [0] * n
+
+        for _ in range(n):
+            i = max((i for i in range(n) if not placed[i]),
+                    key=lambda i: (len(used_by_neighbours[i]), degree[i], self.sizes[i]))
+
+            def slot_cost(s):
+                cost = self.clash[i][s] * CLASH_WEIGHT + self.near[i][s] * BACK_TO_BACK_WEIGHT
+                if self.capacity is not None:
+                    cost += (self.overflow(self.load[s] + self.sizes[i]) - self.overflow(self.load[s])) * CAPACITY_WEIGHT
+                # spread the load when everything else is equal
+                return cost, self.load[s]
+
+            slot = min(range(self.num_slots), key=slot_cost)
+            placed[i] = True
+            slot_of[i] = slot
+            self.load[slot] += self.sizes[i]
+            for j, weight in self.neighbours[i]:
+                self.clash[j][slot] += weight
+                for t in self.adjacent[slot]:
+                    self.near[j][t] += weight
+                used_by_neighbours[j].add(slot)
+
+        self.slot_of = slot_of
+        return slot_of
+
+    # improvement
+
+    def improve(self, deadline, tenure=10, patience=50000):
+        """
+        Tabu search: move a course to its best non-tabu slot. While there are
+        clashes the courses involved in them are moved first. Keeps the best
+        timetable seen and stops at the deadline or after `patience`
+        iterations without improvement.
+        """
+        n = len(self.courses)
+        best, best_cost = list(self.slot_of), self.cost()
+        current_cost = best_cost
+        tabu = {}
+        iterations = last_improvement = 0
+
+        if n == 0 or self.num_slots < 2:
+            return best, iterations
+
+        clashing = {i for i in range(n) if self.clash[i][self.slot_of[i]]}
+
+        while best_cost > 0 and iterations - last_improvement < patience \
+                and (iterations % 64 or time.monotonic() < deadline):
+            iterations += 1
+
+            # a few candidate courses, the best move among them is made
+            if clashing:
+                pool = list(clashing)
+                candidates = [self.random.choice(pool) for _ in range(4)]
+            else:
+                candidates = [self.random.randrange(n) for _ in range(8)]
+
+            move, move_delta = None, None
+            for i in candidates:
+                for s in range(self.num_slots):
+                    if s == self.slot_of[i]:
+                        continue
+                    delta = self.move_delta(i, s)
+                    # tabu moves are allowed when they beat the best timetable (aspiration)
+                    if tabu.get((i, s), 0) > iterations and current_cost + delta >= best_cost:
+                        continue
+                    if move_delta is None or delta < move_delta or (delta == move_delta and self.random.random() < 0.5):
+                        move, move_delta = (i, s), delta
+
+            if move is None:
+                continue
+
+            i, s = move
+            tabu[(i, self.slot_of[i])] = iterations + tenure + self.random.randrange(tenure)
+            self.move(i, s)
+            current_cost += move_delta
+
+            # only the moved course and its neighbours can change their clash state
+            for j in [i] + [j for j, _ in self.neighbours[i]]:
+                if self.clash[j][self.slot_of[j]]:
+                    clashing.add(j)
+                else:
+                    clashing.discard(j)
+
+            if current_cost < best_cost:
+                best, best_cost = list(self.slot_of), current_cost
+                last_improvement = iterations
+
+        self.reset(best)
+        return best, iterations
+
+    def solve(self, time_budget=30.0):
+        started = time.monotonic()
+        self.initial()
+        assignment, iterations = self.improve(started + time_budget)
+        clashes, back_to_back, overflow = self.totals()
+
+        return TimetableResult(
+            assignment={course: assignment[i] for i, course in enumerate(self.courses)},
+            clashes=clashes,
+            back_to_back=back_to_back,
+            overflow=overflow,
+            iterations=iterations,
+            elapsed=time.monotonic() - started,
+        )
@@ -0,0 +1,14 @@
+from django.urls import path
+from . import views
+
+app_name = 'schedule'
+
+urlpatterns = [
+    path('my-exams/', views.StudentTimetableView.as_view(), name='student_timetable'),
+    path('my-exams.json', views.StudentTimetableView.as_view(as_json=True), name='student_timetable_json'),
+    path('published/<str:kind>/<str:key>.json', views.PublishedTimetableView.as_view(), name='published_timetable'),
+    # the layout of the files written by the writecalendars command, so a web server can serve them instead
+    path('calendar/<str:kind>/<str:key>/<str:signature>.ics', views.CalendarFeedView.as_view(),
+         name='calendar_feed'),
+    path('seating-plans/<str:day>.zip', views.SeatingPlansView.as_view(), name='seating_plans'),
+]
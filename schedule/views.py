@@ -1,3 +1,174 @@
+from datetime import date
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.http import FileResponse, Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from core import caching
+from schedule import calendars, sheets, snapshots
+from schedule.models import ExamSchedule
 
-# Create your views here.
+
+def student_exams(student_id):
+    """
+    The exams of the sections a student is registered in, in chronological
+    order, one entry per section with all its rooms. Cached until the
+    timetable changes.
+    """
+    def exams():
+        entries = {}
+        for exam in (ExamSchedule.objects.filter(section__registrations__student=student_id)
+                     .select_related('section__course', 'room')):
+            entry = entries.setdefault(exam.section_id, {
+                'course': exam.section.course.code,
+                'name': exam.section.course.name,
+                'section': exam.section.number,
+                'date': exam.exam_date,
+                'time': exam.exam_time,
+                'duration': exam.duration,
+                'rooms': [],
+            })
+            if exam.room is not None:
+                entry['rooms'].append({'room': exam.room.label, 'campus': exam.room.campus, 'block': exam.room.block})
+        return list(entries.values())
+
+    return caching.get_or_set(caching.SCHEDULES, ('student', student_id), exams)
+
+
+# The validators only read the timetable version (one primary key lookup), so
+# an unchanged timetable is answered with a 304 before it is queried or rendered.
+
+def timetable_stamp(request):
+    # read once for both validators
+    if not hasattr(request, 'timetable_stamp'):
+        request.timetable_stamp = caching.get_stamp(caching.SCHEDULES)
+    return request.timetable_stamp
+
+
+def timetable_etag(request, *args, **kwargs):
+    if not request.user.is_authenticated:
+        return None
+    generation, modified = timetable_stamp(request)
+    return f"{generation}.{int(modified.timestamp())}.{request.user.pk}"
+
+
+def timetable_last_modified(request, *args, **kwargs):
+    if not request.user.is_authenticated:
+        return None
+    return timetable_stamp(request)[1]
+
+
+@method_decorator(cache_control(private=True, no_cache=True), name='dispatch')
+@method_decorator(condition(etag_func=timetable_etag, last_modified_func=timetable_last_modified), name='get')
+class StudentTimetableView(LoginRequiredMixin, View):
+    """The exam timetable of the logged in student, as a page or as JSON."""
+    as_json = False
+
+    def get(self, request):
+        exams = student_exams(request.user.pk)
+        if self.as_json:
+            return JsonResponse({'student': request.user.username, 'exams': exams})
+        kind = calendars.feed_kind(request.user)
+        calendar_url = reverse('schedule:calendar_feed',
+                               args=[kind, request.user.pk, calendars.feed_signature(kind, request.user.pk)])
+        return render(request, 'schedule/student_timetable.html', {
+            'exams': exams,
+            'calendar_url': request.build_absolute_uri(calendar_url),
+        })
+
+
+def can_read_snapshot(user, kind, key):
+    """Everyone reads their own timetable, staff also those of the other users, rooms and days."""
+    if kind in ('students', 'lecturers') and key == str(user.pk):
+        return True
+    if kind == 'students':
+        return user.is_staff or user.is_exam_committee_member
+    return user.user_type != user.STUDENT
+
+
+def published_snapshot(request, kind, key):
+    if not request.user.is_authenticated or not can_read_snapshot(request.user, kind, key):
+        return None
+    return snapshots.read(kind, key)
+
+
+def snapshot_etag(request, kind, key):
+    snapshot = published_snapshot(request, kind, key)
+    return snapshot.digest if snapshot else None
+
+
+def snapshot_last_modified(request, kind, key):
+    snapshot = published_snapshot(request, kind, key)
+    return snapshot.modified if snapshot else None
+
+
+@method_decorator(cache_control(private=True, no_cache=True), name='dispatch')
+@method_decorator(condition(etag_func=snapshot_etag, last_modified_func=snapshot_last_modified), name='get')
+class PublishedTimetableView(LoginRequiredMixin, View):
+    """A slice of the published timetable, served as it is from the snapshot files."""
+
+    def get(self, request, kind, key):
+        snapshot = published_snapshot(request, kind, key)
+        if snapshot is None:
+            raise Http404
+        return FileResponse(open(snapshot.path, 'rb'), content_type='application/json')
+
+
+# Calendar clients cannot log in, the feeds are checked against the signature in their URL.
+
+def feed_snapshot(request, kind, key, signature):
+    if not calendars.check_signature(kind, key, signature):
+        return None
+    return snapshots.read(kind, key)
+
+
+def feed_etag(request, kind, key, signature):
+    snapshot = feed_snapshot(request, kind, key, signature)
+    return snapshot.digest if snapshot else None
+
+
+def feed_last_modified(request, kind, key, signature):
+    snapshot = feed_snapshot(request, kind, key, signature)
+    return snapshot.modified if snapshot else None
+
+
+@method_decorator(cache_control(private=True, no_cache=True), name='dispatch')
+@method_decorator(condition(etag_func=feed_etag, last_modified_func=feed_last_modified), name='get')
+class CalendarFeedView(View):
+    """iCalendar feed of a student, lecturer or room, streamed from the published timetable."""
+
+    def get(self, request, kind, key, signature):
+        feed = calendars.read_feed(kind, key) if calendars.check_signature(kind, key, signature) else None
+        if feed is None:
+            raise Http404
+
+        lines, _ = feed
+        response = StreamingHttpResponse(lines, content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = f'inline; filename="{kind}-{key}.ics"'
+        return response
+
+
+class SeatingPlansView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """The attendance sheets and door lists of every room of a day, as one ZIP download."""
+
+    def test_func(self):
+        return self.request.user.is_staff or self.request.user.is_exam_committee_member
+
+    def get(self, request, day):
+        try:
+            exam_date = date.fromisoformat(day)
+        except ValueError:
+            raise Http404
+        plans = sheets.collect(exam_date)
+        if not plans:
+            raise Http404
+
+        # the archive is written while the sheets are rendered, its size is not known up front. They are
+        # rendered in the request's own process, a pool per request would fork the server; the seatingplans
+        # command renders a whole exam period in parallel
+        response = StreamingHttpResponse(sheets.stream_zip(plans, workers=1), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="seating-plans-{exam_date}.zip"'
+        return response
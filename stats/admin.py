@@ -0,0 +1,18 @@
+from django.contrib import admin
+from stats.models import DailyStatistics
+
+
+@admin.register(DailyStatistics)
+class DailyStatisticsAdmin(admin.ModelAdmin):
+    list_display = ('date', 'department', 'campus', 'exams', 'students', 'room_slots', 'capacity',
+                    'invigilation_minutes', 'absentees')
+    list_filter = ('campus', 'department')
+    list_select_related = ('department',)  # avoid one query per row
+    date_hierarchy = 'date'
+
+    # rolled up from the other tables, see stats.rollups
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
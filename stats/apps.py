@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class StatsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'stats'
+    verbose_name = 'Statistics'
+
+    def ready(self):
+        # connect the signal receivers
+        from stats import signals  # noqa: F401
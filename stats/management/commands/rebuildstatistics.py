@@ -0,0 +1,13 @@
+import time
+from django.core.management.base import BaseCommand
+from stats import rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the statistics of every day from the timetable, invigilations and absentees'
+
+    def handle(self, *args, **kwargs):
+        started = time.monotonic()
+        rows = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {rows:,} statistics rows in {time.monotonic() - started:.1f}s"))
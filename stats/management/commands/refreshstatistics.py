@@ -0,0 +1,18 @@
+from datetime import date
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from stats import rollups
+
+
+class Command(BaseCommand):
+    help = 'Roll up the statistics of the days that changed since the last refresh, and of today'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, action='append', default=[],
+                            help='Also refresh this day (YYYY-MM-DD), can be repeated')
+
+    def handle(self, *args, **kwargs):
+        # the bulk commands send no signals, today is refreshed whatever changed
+        dates = rollups.refresh_stale(also=[timezone.localdate()] + kwargs['date'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed the statistics of {len(dates)} day(s): {', '.join(map(str, dates))}"))
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('core', '0008_course_exam_room_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StaleDate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('campus', models.CharField(blank=True, default='', help_text='Blank: no room (yet)', max_length=10)),
+                ('exams', models.PositiveIntegerField(default=0, help_text='Sections sitting an exam')),
+                ('students', models.PositiveIntegerField(default=0, help_text='Students seated')),
+                ('room_slots', models.PositiveIntegerField(default=0, help_text='Rooms used, once per exam slot')),
+                ('capacity', models.PositiveIntegerField(default=0, help_text='Seats of the rooms used, once per exam slot')),
+                ('invigilation_minutes', models.PositiveIntegerField(default=0)),
+                ('absentees', models.PositiveIntegerField(default=0)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='statistics', to='core.department')),
+            ],
+            options={
+                'verbose_name_plural': 'daily statistics',
+                'ordering': ['date', 'campus'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailystatistics',
+            constraint=models.UniqueConstraint(fields=('date', 'department', 'campus'), name='unique_statistics_key'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import models
+
+
+class DailyStatistics(models.Model):
+    """
+    Exam statistics of a day, department and campus, rolled up from the
+    timetable, invigilations and absentees (see stats.rollups). The rows of
+    no department hold what belongs to a campus as a whole: the rooms used
+    and their capacity, and the invigilators without a department. A section
+    split over campuses counts as an exam on the campus of its first room
+    only, so the exams of the rows add up to the sections of the day.
+    """
+    date = models.DateField()
+    department = models.ForeignKey('core.Department', on_delete=models.CASCADE, null=True, blank=True,
+                                   related_name='statistics')
+    campus = models.CharField(max_length=10, blank=True, default='', help_text='Blank: no room (yet)')
+
+    exams = models.PositiveIntegerField(default=0, help_text='Sections sitting an exam')
+    students = models.PositiveIntegerField(default=0, help_text='Students seated')
+    room_slots = models.PositiveIntegerField(default=0, help_text='Rooms used, once per exam slot')
+    capacity = models.PositiveIntegerField(default=0, help_text='Seats of the rooms used, once per exam slot')
+    invigilation_minutes = models.PositiveIntegerField(default=0)
+    absentees = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'daily statistics'
+        ordering = ['date', 'campus']
+        # the index of the constraint also serves the per day charts; the rows of
+        # a day are only ever replaced together (see stats.rollups.refresh)
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'department', 'campus'], name='unique_statistics_key')
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.department_id or '-'} {self.campus or '-'}"
+
+
+class StaleDate(models.Model):
+    """A day whose statistics changed since they were rolled up, marked by the signals."""
+    date = models.DateField(unique=True)
+
+    def __str__(self):
+        return str(self.date)
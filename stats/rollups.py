@@ -0,0 +1,124 @@
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from stats.models import DailyStatistics, StaleDate
+
+# Statistics rollups.
+#
+# DailyStatistics has one row per day, department and campus with the
+# totals the statistics pages chart, so they never read the timetable,
+# invigilation or absentee tables. The rows of a day are recomputed as a
+# whole with one grouped query per source table:
+#
+#   - the signals of single edits and the roll calls mark their day stale
+#     (a cascade or queryset delete sends one signal per row), and the stale
+#     days are rolled up once when the transaction commits; the statistics
+#     pages only read the rollups
+#   - the `refreshstatistics` command refreshes the stale days and today,
+#     run it periodically: bulk commands send no signals
+#   - rebuild() recomputes every day, see the `rebuildstatistics` command
+
+
+def aggregate(dates=None):
+    """The statistics rows of the days (every day when None), not saved."""
+    from attendance.models import Absentee
+    from schedule.models import ExamSchedule, Invigilation
+
+    exams = ExamSchedule.objects.all()
+    invigilations = Invigilation.objects.all()
+    absentees = Absentee.objects.all()
+    if dates is not None:
+        exams = exams.filter(exam_date__in=dates)
+        invigilations = invigilations.filter(exam_date__in=dates)
+        absentees = absentees.filter(exam_date__in=dates)
+
+    rows = defaultdict(dict)
+
+    def add(queryset, department_field, campus_field, **aggregates):
+        """Add grouped aggregates to the rows, department_field None for the campus rows."""
+        fields = ['exam_date', campus_field] + ([department_field] if department_field else [])
+        for row in queryset.values(*fields).annotate(**aggregates).order_by().iterator():
+            key = (row.pop('exam_date'), row.pop(department_field) if department_field else None,
+                   row.pop(campus_field) or '')
+            for name, value in row.items():
+                rows[key][name] = rows[key].get(name, 0) + (value or 0)
+
+    # a section counts as one exam on the row of its first room (or of its row without a room), so the
+    # exams add up across campuses too: a section split over campuses, or with students left without
+    # a room, is not counted on every campus it has students on
+    first_room = Subquery(ExamSchedule.objects.filter(section=OuterRef('section'), exam_date=OuterRef('exam_date'))
+                          .order_by(F('room').asc(nulls_last=True), 'pk').values('pk')[:1])
+    add(exams.annotate(first_room=first_room), 'section__course__department', 'room__campus',
+        exams=Count('pk', filter=Q(pk=F('first_room'))), students=Sum('seats'))
+
+    # a room shared by several sections in a slot counts once, on the row of its first exam
+    first = Subquery(ExamSchedule.objects.filter(room=OuterRef('room'), exam_date=OuterRef('exam_date'),
+                                                 exam_time=OuterRef('exam_time')).order_by('pk').values('pk')[:1])
+    add(exams.filter(room__isnull=False).annotate(first=first), None, 'room__campus',
+        room_slots=Count('pk', filter=Q(pk=F('first'))), capacity=Sum('room__capacity', filter=Q(pk=F('first'))))
+
+    add(invigilations, 'invigilator__department', 'room__campus', invigilation_minutes=Sum('duration'))
+
+    add(absentees, 'section__course__department', 'exam__room__campus', absentees=Count('pk'))
+
+    return [DailyStatistics(date=day, department_id=department_id, campus=campus, **counters)
+            for (day, department_id, campus), counters in rows.items()]
+
+
+def mark_stale(*dates):
+    StaleDate.objects.bulk_create([StaleDate(date=day) for day in set(dates) if day], ignore_conflicts=True)
+
+
+def refresh(dates):
+    """Recompute the statistics of the days."""
+    dates = sorted(set(dates))
+    if not dates:
+        return 0
+    with transaction.atomic():
+        rows = aggregate(dates)
+        DailyStatistics.objects.filter(date__in=dates).delete()
+        DailyStatistics.objects.bulk_create(rows, batch_size=1000)
+        StaleDate.objects.filter(date__in=dates).delete()
+    return len(rows)
+
+
+def refresh_stale(also=()):
+    """Recompute the statistics of the stale days and of the days in also. Returns the days refreshed."""
+    dates = set(StaleDate.objects.values_list('date', flat=True)) | set(also)
+    refresh(dates)
+    return sorted(dates)
+
+
+class _PendingRefresh:
+    """The on_commit callback of a transaction refreshing the stale days."""
+
+    def __init__(self):
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        refresh_stale()
+
+
+def refresh_on_commit():
+    """
+    refresh_stale() when the current transaction commits (right away outside
+    of one), once however many days the transaction marks stale.
+    """
+    connection = transaction.get_connection()
+    # one callback per transaction or savepoint: the callbacks of a rolled back savepoint are dropped
+    savepoints = set(connection.savepoint_ids)
+    for callback_savepoints, callback, *_ in connection.run_on_commit:
+        if callback_savepoints == savepoints and isinstance(callback, _PendingRefresh) and not callback.done:
+            return
+    transaction.on_commit(_PendingRefresh())
+
+
+def rebuild():
+    """Recompute the statistics of every day."""
+    with transaction.atomic():
+        rows = aggregate()
+        DailyStatistics.objects.all().delete()
+        DailyStatistics.objects.bulk_create(rows, batch_size=1000)
+        StaleDate.objects.all().delete()
+    return len(rows)
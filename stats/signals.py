@@ -0,0 +1,31 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from attendance.models import Absentee
+from schedule.models import ExamSchedule, Invigilation
+from stats import rollups
+
+
+# the day an exam, invigilation or absentee moves away from goes stale too
+
+@receiver(pre_save, sender=ExamSchedule)
+@receiver(pre_save, sender=Invigilation)
+@receiver(pre_save, sender=Absentee)
+def remember_date(sender, instance, **kwargs):
+    instance.previous_date = (sender.objects.filter(pk=instance.pk).values_list('exam_date', flat=True).first()
+                              if instance.pk else None)
+
+
+@receiver(post_save, sender=ExamSchedule)
+@receiver(post_save, sender=Invigilation)
+@receiver(post_save, sender=Absentee)
+def mark_saved_stale(sender, instance, **kwargs):
+    rollups.mark_stale(instance.exam_date, getattr(instance, 'previous_date', None))
+    rollups.refresh_on_commit()
+
+
+@receiver(post_delete, sender=ExamSchedule)
+@receiver(post_delete, sender=Invigilation)
+@receiver(post_delete, sender=Absentee)
+def mark_deleted_stale(sender, instance, **kwargs):
+    rollups.mark_stale(instance.exam_date)
+    rollups.refresh_on_commit()
@@ -0,0 +1,81 @@
+from datetime import date, time
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from attendance.models import Absentee
+from core.models import User, Student, Department, Course, Section, Room
+from schedule.models import ExamSchedule, Invigilation
+from stats import rollups
+from stats.models import DailyStatistics, StaleDate
+
+
+class StatisticsTests(TestCase):
+    """The rollups match the source tables and the statistics pages only read the rollups."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Information Technology')
+        course = Course.objects.create(code='IT101', name='Programming', department=cls.department)
+        cls.room = Room.objects.create(label='A101', room_type=Room.CLASS_ROOM, campus=Room.SA, capacity=40, block='A')
+        cls.day = date(2026, 12, 7)
+        for number in (1, 2):
+            section = Section.objects.create(course=course, number=number)
+            cls.exam = ExamSchedule.objects.create(section=section, room=cls.room, exam_date=cls.day,
+                                                   exam_time=time(8), seats=15)
+        invigilator = User.objects.create(username='I1', is_invigilator=True, department=cls.department)
+        Invigilation.objects.create(invigilator=invigilator, room=cls.room, exam_date=cls.day, exam_time=time(8))
+        Absentee.objects.create(section=section, student=Student.objects.create(username='S1'), exam=cls.exam,
+                                exam_date=cls.day)
+        cls.viewer = User.objects.create(username='M1', can_view_all_statistics=True)
+
+    def rows(self):
+        return sorted(DailyStatistics.objects.values_list('department', 'campus', 'exams', 'students', 'room_slots',
+                                                          'capacity', 'invigilation_minutes', 'absentees'),
+                      key=lambda row: row[0] or 0)
+
+    def test_rebuild_adds_up_the_day(self):
+        rollups.rebuild()
+        self.assertEqual(self.rows(), [
+            (None, Room.SA, 0, 0, 1, 40, 0, 0),  # the room, once for both sections
+            (self.department.pk, Room.SA, 2, 30, 0, 0, 120, 1),
+        ])
+
+    def test_split_section_counts_once_per_day(self):
+        other = Room.objects.create(label='B101', room_type=Room.CLASS_ROOM, campus=Room.CAMPUS_CHOICES[1][0],
+                                    capacity=40, block='B')
+        ExamSchedule.objects.create(section=self.exam.section, room=other, exam_date=self.day, exam_time=time(8),
+                                    seats=5)
+        ExamSchedule.objects.create(section=self.exam.section, exam_date=self.day, exam_time=time(8), seats=2)
+        rollups.rebuild()
+
+        rows = DailyStatistics.objects.filter(department=self.department)
+        self.assertEqual(sorted(rows.values_list('campus', 'exams', 'students')),
+                         sorted([('', 0, 2), (Room.SA, 2, 30), (other.campus, 0, 5)]))
+
+        self.client.force_login(self.viewer)
+        day = self.client.get(reverse('stats:statistics_json')).json()['days'][0]
+        self.assertEqual((day['exams'], day['students']), (2, 37))
+
+    def test_changes_are_rolled_up_on_commit(self):
+        rollups.rebuild()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.exam.seats = 20
+            self.exam.save()
+            self.exam.save()  # one refresh per transaction
+        self.assertFalse(StaleDate.objects.exists())
+
+        self.client.force_login(self.viewer)
+        response = self.client.get(reverse('stats:statistics_json'))
+        day = response.json()['days'][0]
+        self.assertEqual((day['students'], day['utilization']), (35, 88))
+
+        # reading the statistics neither writes nor reads the source tables
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('stats:statistics'))
+        self.assertFalse([query for query in queries if 'schedule_' in query['sql'] or 'attendance_' in query['sql']
+                          or query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))])
+
+    def test_statistics_need_the_permission(self):
+        self.client.force_login(User.objects.create(username='L1', is_lecturer=True))
+        self.assertEqual(self.client.get(reverse('stats:statistics')).status_code, 403)
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'stats'
+
+urlpatterns = [
+    path('', views.StatisticsView.as_view(), name='statistics'),
+    path('statistics.json', views.StatisticsView.as_view(as_json=True), name='statistics_json'),
+]
@@ -0,0 +1,56 @@
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.db.models import Q, Sum
+from django.http import JsonResponse
+from django.shortcuts import render
+from django.views import View
+from core.models import Room
+from stats.models import DailyStatistics
+
+# named apart from the fields they add up, annotations cannot shadow fields
+TOTALS = {
+    'total_exams': Sum('exams'),
+    'total_students': Sum('students'),
+    # only the students with a room count towards the utilization
+    'total_seated': Sum('students', filter=~Q(campus='')),
+    'total_room_slots': Sum('room_slots'),
+    'total_capacity': Sum('capacity'),
+    'total_invigilation_minutes': Sum('invigilation_minutes'),
+    'total_absentees': Sum('absentees'),
+}
+
+
+def totals(rows, *fields):
+    """The totals of the rollup rows grouped by the fields, with the room utilization in percent."""
+    grouped = [{name.removeprefix('total_'): (value or 0) if name in TOTALS else value for name, value in row.items()}
+               for row in rows.values(*fields).annotate(**TOTALS).order_by(*fields)]
+    for row in grouped:
+        row['utilization'] = round(100 * row['seated'] / row['capacity']) if row['capacity'] else None
+    return grouped
+
+
+class StatisticsView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """Exam statistics per day, department and campus, read from the rollups only."""
+    as_json = False
+
+    def test_func(self):
+        return self.request.user.can_view_all_statistics
+
+    def get(self, request):
+        rows = DailyStatistics.objects.all()
+        campus = request.GET.get('campus', '')
+        if campus in dict(Room.CAMPUS_CHOICES):
+            rows = rows.filter(campus=campus)
+
+        statistics = {
+            'days': totals(rows, 'date'),
+            'departments': totals(rows, 'department', 'department__name'),
+            'campuses': totals(rows, 'campus'),
+        }
+        if self.as_json:
+            return JsonResponse(statistics)
+
+        # the charts scale their bars to the largest day
+        peaks = {field: max([day[field] or 0 for day in statistics['days']] + [1])
+                 for field in ('students', 'invigilation_minutes', 'absentees')}
+        return render(request, 'stats/statistics.html', dict(
+            statistics, peaks=peaks, campus=campus, campus_choices=Room.CAMPUS_CHOICES))